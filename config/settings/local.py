@@ -34,6 +34,10 @@ EMAIL_HOST = 'localhost'
 EMAIL_BACKEND = env('DJANGO_EMAIL_BACKEND',
                     default='django.core.mail.backends.console.EmailBackend')
 
+# Text messages are printed, and the outbox is sent without a worker
+OUTBOX_PROVIDERS = dict(OUTBOX_PROVIDERS, sms='test_bank.outbox.providers.ConsoleProvider')
+OUTBOX_SEND_ON_COMMIT = env.bool('OUTBOX_SEND_ON_COMMIT', default=True)
+
 
 # DATABASE
 # ------------------------------------------------------------------------------
@@ -45,8 +49,21 @@ DATABASES = {
         'NAME': str(APPS_DIR.path('db.sqlite3')),
     }
 }
+# DJANGO_SQLITE_REPLICA=True reads the pages marked with replica_reads from a
+# copy of the database, taken with `cp db.sqlite3 db_replica.sqlite3`
+if env.bool('DJANGO_SQLITE_REPLICA', default=False):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(APPS_DIR.path('db_replica.sqlite3')),
+    }
+    REPLICA_DATABASES = ['replica']
 
 
+# STATIC FILES
+# ------------------------------------------------------------------------------
+# The sources of the asset bundles are served one by one, see ASSET_BUNDLES
+ASSET_BUNDLES_ENABLED = env.bool('ASSET_BUNDLES_ENABLED', default=False)
+
 # CACHING
 # ------------------------------------------------------------------------------
 CACHES = {
@@ -11,10 +11,12 @@ Production Configurations
 from __future__ import absolute_import, unicode_literals
 
 from boto.s3.connection import OrdinaryCallingFormat
+from django.core.exceptions import ImproperlyConfigured
 from django.utils import six
 
 
 from .common import *  # noqa
+from test_bank.contrib.staticheaders import add_immutable_header
 
 # SECRET CONFIGURATION
 # ------------------------------------------------------------------------------
@@ -23,20 +25,26 @@ from .common import *  # noqa
 SECRET_KEY = env('DJANGO_SECRET_KEY')
 
 
+# BUILD CONFIGURATION
+# ------------------------------------------------------------------------------
+# Shared by every worker, or their ETags and cached fragments would differ.
+# Heroku sets HEROKU_SLUG_COMMIT with its dyno metadata enabled
+BUILD_ID = env('BUILD_ID', default=env('HEROKU_SLUG_COMMIT', default=''))
+if not BUILD_ID:
+    raise ImproperlyConfigured("Set BUILD_ID to the deployed revision, e.g. BUILD_ID=$(git rev-parse HEAD)")
+
+
 # This ensures that Django will be able to detect a secure connection
 # properly on Heroku.
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+# The Heroku router appends the client address to X-Forwarded-For
+NUM_PROXIES = env.int('DJANGO_NUM_PROXIES', default=1)
 # Use Whitenoise to serve static files
 # See: https://whitenoise.readthedocs.io/
 WHITENOISE_MIDDLEWARE = ('whitenoise.middleware.WhiteNoiseMiddleware', )
 MIDDLEWARE = WHITENOISE_MIDDLEWARE + MIDDLEWARE
-
-
-# DATABASE
-DATABASES = {
-    'default': env.db('DATABASE_URL', default='postgres:///test_bank'),
-}
-DATABASES['default']['ATOMIC_REQUESTS'] = True
+# the hashed files are served with Cache-Control: immutable
+WHITENOISE_ADD_HEADERS_FUNCTION = add_immutable_header
 
 
 # SECURITY CONFIGURATION
@@ -134,7 +142,35 @@ TEMPLATES[0]['OPTIONS']['loaders'] = [
 
 # Use the Heroku-style specification
 # Raises ImproperlyConfigured exception if DATABASE_URL not in os.environ
-DATABASES['default'] = env.db('DATABASE_URL')
+DATABASES = {
+    'default': env.db('DATABASE_URL'),
+}
+DATABASES['default'].update({
+    # checks the connections idle since the previous request, see
+    # test_bank.contrib.db.backends.postgresql
+    'ENGINE': 'test_bank.contrib.db.backends.postgresql',
+    'HEALTH_CHECK_AFTER': env.int('DATABASE_HEALTH_CHECK_AFTER', default=30),
+    # read only views opt out with transaction.non_atomic_requests
+    'ATOMIC_REQUESTS': env.bool('DJANGO_ATOMIC_REQUESTS', default=True),
+    'CONN_MAX_AGE': env.int('DJANGO_CONN_MAX_AGE', default=60),
+})
+# A greenlet of the gevent worker only lives for a request, persistent
+# connections would pile up: share a pool of DATABASE_POOL_SIZE connections
+# per process instead. 0 keeps a connection per thread for CONN_MAX_AGE,
+# which the backend refuses under gevent
+DATABASE_POOL_SIZE = env.int('DATABASE_POOL_SIZE', default=10)
+if DATABASE_POOL_SIZE:
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 0,
+        'POOL': {'MAX_SIZE': DATABASE_POOL_SIZE, 'TIMEOUT': env.float('DATABASE_POOL_TIMEOUT', default=10)},
+    })
+# Read replicas, as a comma separated list of URLs, named replica_1, replica_2...
+REPLICA_DATABASES = []
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), 1):
+    alias = 'replica_{0}'.format(index)
+    DATABASES[alias] = dict(DATABASES['default'], ATOMIC_REQUESTS=False, TEST={'MIRROR': 'default'})
+    DATABASES[alias].update({key: value for key, value in env.db_url_config(url).items() if key != 'ENGINE'})
+    REPLICA_DATABASES.append(alias)
 
 # CACHING
 # ------------------------------------------------------------------------------
@@ -198,7 +234,12 @@ LOGGING = {
             'level': 'ERROR',
             'handlers': ['console', 'mail_admins'],
             'propagate': True
-        }
+        },
+        'test_bank.querybudget': {
+            'level': 'INFO',
+            'handlers': ['console'],
+            'propagate': False
+        },
     }
 }
 
@@ -29,6 +29,9 @@ EMAIL_PORT = 1025
 # for unit testing purposes
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 
+# Text messages sent from the outbox are kept in test_bank.outbox.providers.sent_messages
+OUTBOX_PROVIDERS = dict(OUTBOX_PROVIDERS, sms='test_bank.outbox.providers.LocmemProvider')
+
 
 # DATABASE
 # ------------------------------------------------------------------------------
@@ -38,7 +41,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': str(APPS_DIR.path('db.sqlite3')),
-    }
+    },
+    # a database of its own rather than a mirror, so that the tests can tell
+    # which one was read: REPLICA_DATABASES = ['replica'] to route to it
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(APPS_DIR.path('db_replica.sqlite3')),
+    },
 }
 
 
@@ -57,6 +66,9 @@ CACHES = {
 # ------------------------------------------------------------------------------
 TEST_RUNNER = 'django.test.runner.DiscoverRunner'
 
+# Views going over their query budget make the tests fail
+QUERY_BUDGET_ACTION = 'raise'
+
 
 # PASSWORD HASHING
 # ------------------------------------------------------------------------------
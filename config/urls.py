@@ -8,9 +8,11 @@ from django.contrib import admin
 from django.views.generic import TemplateView
 from django.views import defaults as default_views
 
+from test_bank.contrib.conditional import conditional_page
+
 urlpatterns = [
-    url(r'^$', TemplateView.as_view(template_name='pages/home.html'), name='home'),
-    url(r'^about/$', TemplateView.as_view(template_name='pages/about.html'), name='about'),
+    url(r'^$', conditional_page()(TemplateView.as_view(template_name='pages/home.html')), name='home'),
+    url(r'^about/$', conditional_page()(TemplateView.as_view(template_name='pages/about.html')), name='about'),
 
     # Django Admin, use {% url 'admin:index' %}
     url(settings.ADMIN_URL, admin.site.urls),
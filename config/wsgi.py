@@ -29,6 +29,10 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 # setting points here.
 application = get_wsgi_application()
 
+# Compile the templates and URL patterns before the first request
+from test_bank.contrib.warmup import warm_up  # noqa
+warm_up()
+
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)
@@ -1,19 +1,77 @@
 # -*- coding: utf-8 -*-
 
 from django.contrib import admin
+from django.db import transaction
+from test_bank.contrib.admin import HighScaleAdminMixin
+from .exports import loan_export_response
 from .models import BorrowerProfile, Business, Loan
+from .notifications import notify_status_change
+from .transitions import TRANSITIONS, transition_loans, reprice_loans
 
 
 class BorrowerProfileAdmin(admin.ModelAdmin):
-    pass
+    list_display = ('user', 'phone_number', 'is_verified', 'has_signed')
+    list_select_related = ('user', )
 
 
-class BusinessAdmin(admin.ModelAdmin):
-    pass
+class BusinessAdmin(HighScaleAdminMixin, admin.ModelAdmin):
+    list_display = (
+        'name', 'company_number', 'owner', 'sector', 'loan_count', 'active_loan_count', 'created_at',
+    )
+    # date ranges rather than date_hierarchy, whose drilldown scans the table
+    list_filter = ('sector', 'created_at')
+    list_select_related = ('owner__user', )
+    # prefix and exact searches only, served by borrowing.indexes on PostgreSQL
+    search_fields = ('^name', '=company_number')
 
 
-class LoanAdmin(admin.ModelAdmin):
-    pass
+class LoanAdmin(HighScaleAdminMixin, admin.ModelAdmin):
+    list_display = (
+        'pk', 'borrower', 'business', 'amount', 'currency', 'duration', 'interest_rate', 'status', 'created_at',
+    )
+    list_filter = ('status', 'currency', 'created_at')
+    list_select_related = ('borrower__user', 'business')
+    search_fields = ('^business__name', '=borrower__user__username')
+    actions = ['approve_loans', 'reject_loans', 'process_loans', 'export_as_csv', 'export_as_jsonl']
+
+    def apply_transition(self, request, queryset, name):
+        """
+        moves the selected loans with chunked guarded UPDATEs, whatever
+        their number, and notifies their borrowers in one batch
+        approved loans are repriced on the current pricing grid
+        """
+        with transaction.atomic(using=queryset.db):
+            moved = transition_loans(queryset, name)
+            if name == 'approve':
+                reprice_loans([row[0] for row in moved], using=queryset.db)
+            notify_status_change(moved, TRANSITIONS[name][1], using=queryset.db)
+        skipped = queryset.count() - len(moved)
+        message = "{0} loans {1}".format(len(moved), dict(Loan.STATUS_CHOICES)[TRANSITIONS[name][1]].lower())
+        if skipped:
+            message += ", {0} skipped as they were not {1}".format(
+                skipped, dict(Loan.STATUS_CHOICES)[TRANSITIONS[name][0]].lower()
+            )
+        self.message_user(request, message)
+
+    def approve_loans(self, request, queryset):
+        self.apply_transition(request, queryset, 'approve')
+    approve_loans.short_description = "Approve selected pending loans"
+
+    def reject_loans(self, request, queryset):
+        self.apply_transition(request, queryset, 'reject')
+    reject_loans.short_description = "Reject selected pending loans"
+
+    def process_loans(self, request, queryset):
+        self.apply_transition(request, queryset, 'process')
+    process_loans.short_description = "Mark selected approved loans as processed"
+
+    def export_as_csv(self, request, queryset):
+        return loan_export_response(queryset, 'csv')
+    export_as_csv.short_description = "Export selected loans as CSV"
+
+    def export_as_jsonl(self, request, queryset):
+        return loan_export_response(queryset, 'jsonl')
+    export_as_jsonl.short_description = "Export selected loans as JSON lines"
 
 
 admin.site.register(BorrowerProfile, BorrowerProfileAdmin)
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+"""
+Read-only JSON API of the borrowing app, serving the data of the current
+borrower, mounted as version 1 under /borrowing/api/v1/.
+See borrowing.api.resources for the query string it understands.
+"""
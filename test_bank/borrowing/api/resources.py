@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+Projections of the borrowing models served by the API.
+
+Rows are fetched with values() and serialized straight from the database
+cursor, no model instance is built:
+    - ?fields=name,sector restricts the fields of the resource listed,
+      ?fields[business]=name those of an included resource
+    - ?include=business joins a parent row in the same query, the way
+      select_related would. Child rows are not included, a business may
+      have any number of loans: they are listed by pages with
+      /loans/?business=<id>
+    - lists are paginated newest first by borrowing.pagination: the `next`
+      cursor of a page is passed as ?after= to get the following one
+"""
+import re
+
+from ..models import BorrowerProfile, Business, Loan
+from ..pagination import keyset_page
+
+
+class ApiError(Exception):
+    """ error reported to the client as {'errors': errors}, errors being {param: [message]} """
+
+    def __init__(self, errors, status=400):
+        super().__init__(errors)
+        self.errors = errors
+        self.status = status
+
+
+class Resource:
+    """
+    read-only projection of a model
+        - fields maps the API field names to ORM lookups
+        - derived maps API field names to (field, function) computing them
+          from another field of the row
+        - related maps includes to (resource, foreign key) of a parent row
+    """
+    name = None
+    model = None
+    fields = {}
+    derived = {}
+    related = {}
+
+    @classmethod
+    def select_fields(cls, value, param='fields'):
+        """ API field names requested in a comma separated list, all if empty """
+        if not value:
+            return sorted(cls.fields) + sorted(cls.derived)
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = set(names) - set(cls.fields) - set(cls.derived)
+        if unknown:
+            raise ApiError({param: ["Unknown {0} fields: {1}".format(cls.name, ', '.join(sorted(unknown)))]})
+        return names
+
+    @classmethod
+    def get_lookups(cls, names, prefix=''):
+        """ ORM lookups to fetch in order to serialize the given fields """
+        return {
+            prefix + cls.fields[cls.derived[name][0] if name in cls.derived else name]
+            for name in names
+        }
+
+    @classmethod
+    def serialize(cls, row, names, prefix=''):
+        item = {}
+        for name in names:
+            if name in cls.derived:
+                field, function = cls.derived[name]
+                item[name] = function(row[prefix + cls.fields[field]])
+            else:
+                item[name] = row[prefix + cls.fields[name]]
+        return item
+
+
+class BusinessResource(Resource):
+    name = 'business'
+    model = Business
+    fields = {
+        'id': 'pk', 'name': 'name', 'address': 'address', 'company_number': 'company_number',
+        'sector': 'sector', 'created_at': 'created_at', 'validated_at': 'validated_at',
+        'loan_count': 'loan_count', 'active_loan_count': 'active_loan_count',
+    }
+    derived = {'sector_display': ('sector', dict(Business._meta.get_field('sector').choices).get)}
+
+
+class LoanResource(Resource):
+    name = 'loan'
+    model = Loan
+    fields = {
+        'id': 'pk', 'business_id': 'business_id', 'amount': 'amount', 'currency': 'currency',
+        'reason': 'reason', 'duration': 'duration', 'interest_rate': 'interest_rate',
+        'status': 'status', 'created_at': 'created_at', 'modified_at': 'modified_at',
+    }
+    derived = {'status_display': ('status', dict(Loan.STATUS_CHOICES).get)}
+    related = {'business': (BusinessResource, 'business')}
+
+
+class BorrowerResource(Resource):
+    name = 'borrower'
+    model = BorrowerProfile
+    fields = {
+        'id': 'pk', 'username': 'user__username', 'name': 'user__name',
+        'first_name': 'user__first_name', 'last_name': 'user__last_name', 'email': 'user__email',
+        'phone_number': 'phone_number', 'is_verified': 'is_verified', 'has_signed': 'has_signed',
+    }
+
+
+FIELDS_PARAM_RE = re.compile(r'^fields\[(\w+)\]$')
+
+
+def get_includes(resource, value):
+    names = [name.strip() for name in (value or '').split(',') if name.strip()]
+    unknown = set(names) - set(resource.related)
+    if unknown:
+        raise ApiError({'include': [
+            "Unknown {0} includes: {1}".format(resource.name, ', '.join(sorted(unknown)))
+        ]})
+    return names
+
+
+def get_sparse_fields(params):
+    """ {name: value} of the fields[name]=value parameters """
+    sparse_fields = {}
+    for param, value in params.items():
+        match = FIELDS_PARAM_RE.match(param)
+        if match:
+            sparse_fields[match.group(1)] = value
+    return sparse_fields
+
+
+def project(resource, queryset, fields=None, include=None, sparse_fields=None, after=None, paginate=True,
+            fields_param='fields'):
+    """
+    returns (items, next_cursor): the given fields of the rows of the
+    queryset, with the included rows, whose fields are looked up by include
+    name in sparse_fields. fields_param names the fields in errors.
+    Only the page older than the `after` cursor is returned if paginate,
+    else all the rows and None.
+    """
+    sparse_fields = sparse_fields or {}
+    names = resource.select_fields(fields, fields_param)
+    includes = get_includes(resource, include)
+    lookups = resource.get_lookups(names)
+    if paginate:
+        # pages are sought on (created_at, pk)
+        lookups |= {'created_at', 'pk'}
+    related = []
+    for include in includes:
+        parent, foreign_key = resource.related[include]
+        parent_names = parent.select_fields(sparse_fields.get(include), 'fields[{0}]'.format(include))
+        lookups |= parent.get_lookups(parent_names, foreign_key + '__')
+        related.append((include, parent, parent_names, foreign_key + '__'))
+
+    queryset = queryset.values(*lookups)
+    if paginate:
+        rows, next_cursor = keyset_page(queryset, after)
+    else:
+        rows, next_cursor = list(queryset), None
+
+    items = []
+    for row in rows:
+        item = resource.serialize(row, names)
+        for include, parent, parent_names, parent_prefix in related:
+            item[include] = parent.serialize(row, parent_names, parent_prefix)
+        items.append(item)
+    return items, next_cursor
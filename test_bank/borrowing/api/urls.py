@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+from django.conf.urls import url
+
+from . import views
+
+app_name = 'api_v1'
+
+urlpatterns = [
+    url(
+        regex=r'^dashboard/$',
+        view=views.dashboard,
+        name='dashboard'
+    ),
+    url(
+        regex=r'^borrower/$',
+        view=views.borrower_detail,
+        name='borrower'
+    ),
+    url(
+        regex=r'^businesses/$',
+        view=views.business_list,
+        name='business_list'
+    ),
+    url(
+        regex=r'^businesses/(?P<pk>[\d]+)/$',
+        view=views.business_detail,
+        name='business_detail'
+    ),
+    url(
+        regex=r'^loans/$',
+        view=views.loan_list,
+        name='loan_list'
+    ),
+    url(
+        regex=r'^loans/(?P<pk>[\d]+)/$',
+        view=views.loan_detail,
+        name='loan_detail'
+    ),
+]
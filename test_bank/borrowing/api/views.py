@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+from functools import wraps
+
+from django.db import transaction
+from django.http.response import HttpResponseNotAllowed, JsonResponse
+from django.utils.translation import ugettext as _
+
+from test_bank.contrib.db.routers import replica_reads
+from ..dashboard import changed_recently
+from ..forms import ApiLoanListForm
+from ..models import BorrowerProfile, Business, Loan
+from ..pagination import InvalidCursor
+from .resources import ApiError, BorrowerResource, BusinessResource, LoanResource, get_sparse_fields, project
+
+
+def api_view(view):
+    """
+    GET only view of the data of the authenticated user: returns as JSON
+    the dict returned by the view, or {'errors': errors} with the status
+    of the ApiError it raised. It reads only, outside of ATOMIC_REQUESTS
+    and from a replica unless the borrower's data just changed
+    """
+    @replica_reads(primary_if=changed_recently)
+    @transaction.non_atomic_requests
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.method == "GET":
+            return HttpResponseNotAllowed(['GET', ])
+        try:
+            if not request.user.is_authenticated:
+                raise ApiError({'__all__': [_("Authentication required")]}, status=401)
+            return JsonResponse(view(request, *args, **kwargs))
+        except InvalidCursor as error:
+            return JsonResponse({'errors': {'after': [str(error)]}}, status=400)
+        except ApiError as error:
+            return JsonResponse({'errors': error.errors}, status=error.status)
+    return wrapper
+
+
+def get_one(resource, queryset, fields, include=None, sparse_fields=None, fields_param='fields'):
+    """ the only row of the queryset, with its includes fetched as for a page """
+    items, next_cursor = project(
+        resource, queryset, fields, include, sparse_fields, paginate=False, fields_param=fields_param
+    )
+    if not items:
+        raise ApiError({'__all__': [_("Not found")]}, status=404)
+    return items[0]
+
+
+def get_page(resource, request, queryset):
+    """ {'results': [...], 'next': cursor} of the page of the queryset requested """
+    items, next_cursor = project(
+        resource, queryset, request.GET.get('fields'), request.GET.get('include'),
+        get_sparse_fields(request.GET), request.GET.get('after'),
+    )
+    return {'results': items, 'next': next_cursor}
+
+
+@api_view
+def dashboard(request):
+    """
+    the borrower with the first pages of their businesses and loans, in a
+    single round trip -- fields are selected with fields[borrower],
+    fields[businesses] and fields[loans]
+    """
+    sparse_fields = get_sparse_fields(request.GET)
+    dashboard = {
+        'borrower': get_one(
+            BorrowerResource, BorrowerProfile.objects.filter(pk=request.user.pk),
+            sparse_fields.get('borrower'), fields_param='fields[borrower]'
+        ),
+    }
+    for name, resource, queryset in (
+            ('businesses', BusinessResource, Business.objects.filter(owner_id=request.user.pk)),
+            ('loans', LoanResource, Loan.objects.filter(borrower_id=request.user.pk))):
+        items, next_cursor = project(
+            resource, queryset, sparse_fields.get(name), fields_param='fields[{0}]'.format(name)
+        )
+        dashboard[name] = {'results': items, 'next': next_cursor}
+    return dashboard
+
+
+@api_view
+def borrower_detail(request):
+    return get_one(BorrowerResource, BorrowerProfile.objects.filter(pk=request.user.pk), request.GET.get('fields'))
+
+
+@api_view
+def business_list(request):
+    return get_page(BusinessResource, request, Business.objects.filter(owner_id=request.user.pk))
+
+
+@api_view
+def business_detail(request, pk):
+    return get_one(
+        BusinessResource, Business.objects.filter(owner_id=request.user.pk, pk=pk), request.GET.get('fields'),
+        request.GET.get('include'), get_sparse_fields(request.GET),
+    )
+
+
+@api_view
+def loan_list(request):
+    """ loans of the borrower, filtered by the ?status= and ?business= given if any """
+    form = ApiLoanListForm(request.GET)
+    if not form.is_valid():
+        raise ApiError(form.errors)
+    loans = Loan.objects.filter(borrower_id=request.user.pk)
+    if form.cleaned_data['status']:
+        loans = loans.filter(status__in=form.cleaned_data['status'])
+    if form.cleaned_data['business'] is not None:
+        loans = loans.filter(business_id=form.cleaned_data['business'])
+    return get_page(LoanResource, request, loans)
+
+
+@api_view
+def loan_detail(request, pk):
+    return get_one(
+        LoanResource, Loan.objects.filter(borrower_id=request.user.pk, pk=pk), request.GET.get('fields'),
+        request.GET.get('include'), get_sparse_fields(request.GET),
+    )
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class BorrowingConfig(AppConfig):
@@ -12,4 +13,6 @@ class BorrowingConfig(AppConfig):
             Users system checks
             Users signal registration
         """
-        pass
+        from . import signals  # noqa
+        from .indexes import create_custom_indexes
+        post_migrate.connect(create_custom_indexes, sender=self)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from .dashboard import invalidate_dashboard
+from .models import Business
+from .seeding import seed_borrower
+
+
+BENCHMARK_SIZES = (1, 10, 100, 1000)
+PERCENTILES = (50, 95, 99)
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def percentile(values, rank):
+    """ nearest-rank percentile of a non empty list of values """
+    values = sorted(values)
+    index = max(0, -(-rank * len(values) // 100) - 1)
+    return values[index]
+
+
+def measure(client, url, repeat, before=None):
+    """
+    requests url `repeat` times with the client after one warm-up request,
+    returns the status code, query count, of which the writes and the
+    queries of django_session, latency percentiles in ms and the peak
+    memory allocated by one request in KiB
+    before() is called ahead of each request, outside of the measures
+    """
+    def get():
+        if before is not None:
+            before()
+        return client.get(url)
+
+    response = get()
+    with CaptureQueriesContext(connection) as context:
+        get()
+    queries = [query['sql'] for query in context.captured_queries]
+
+    timings = []
+    for i in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # tracing slows allocations down, memory is measured on its own request
+    if before is not None:
+        before()
+    tracemalloc.start()
+    try:
+        client.get(url)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        'status': response.status_code,
+        'queries': len(queries),
+        'writes': len([sql for sql in queries if sql.lstrip().upper().startswith(WRITE_STATEMENTS)]),
+        'session_queries': len([sql for sql in queries if 'django_session' in sql]),
+        'latency_ms': {'p{0}'.format(rank): round(percentile(timings, rank), 3) for rank in PERCENTILES},
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+    result['latency_ms']['mean'] = round(sum(timings) / len(timings), 3)
+    return result
+
+
+def get_scenarios(profile):
+    """ (name, url, before) of the pages benchmarked for a seeded borrower """
+    loan = profile.loan_set.order_by('-pk').first()
+    # businesses with loans cannot be edited
+    business = profile.business_set.filter(loan_count=0).order_by('pk').first()
+    scenarios = [
+        ('home', reverse('borrowing:home'), lambda: invalidate_dashboard(profile.pk)),
+        ('home_cached', reverse('borrowing:home'), None),
+        ('create_loan', reverse('borrowing:create_loan'), None),
+        ('loan_list', reverse('borrowing:loan_list'), None),
+        ('api_dashboard', reverse('borrowing:api_v1:dashboard'), None),
+    ]
+    if loan is not None:
+        scenarios.append(('loan_detail', reverse('borrowing:loan_detail', kwargs={'pk': loan.pk}), None))
+    if business is not None:
+        scenarios.append(
+            ('update_business', reverse('borrowing:update_business', kwargs={'pk': business.pk}), None)
+        )
+    return scenarios
+
+
+ADMIN_SCENARIOS = (
+    ('admin_loans', 'admin:borrowing_loan_changelist'),
+    ('admin_businesses', 'admin:borrowing_business_changelist'),
+    ('admin_borrowers', 'admin:borrowing_borrowerprofile_changelist'),
+    ('admin_users', 'admin:users_user_changelist'),
+)
+
+
+# the pages would read from the replicas rather than the seeded database
+@override_settings(REPLICA_DATABASES=[])
+def run_benchmark(sizes=BENCHMARK_SIZES, repeat=20, stdout=None):
+    """
+    seeds for each size one borrower with `size` businesses and `size`
+    loans, plus a business without loans to edit, on top of the borrowers
+    of the previous sizes, and measures the borrower pages then the admin
+    changelists.
+    Returns a list of result dicts, one per (size, page).
+    Expects an empty, disposable default database, every read is made on it.
+    """
+    password_hash = make_password('password')
+    admin = get_user_model().objects.create_superuser('benchmark-admin', 'admin@example.com', 'password')
+    results = []
+    for size in sizes:
+        profile = seed_borrower('benchmark-{0}'.format(size), size, size, password_hash=password_hash)
+        Business.objects.create(
+            owner=profile, name="Editable business", address="1 test street, London",
+            company_number='01234567', sector='R',
+        )
+        client = Client()
+        client.force_login(profile.user)
+        admin_client = Client()
+        admin_client.force_login(admin)
+        scenarios = [(name, url, before, client) for name, url, before in get_scenarios(profile)]
+        scenarios += [(name, reverse(url_name), None, admin_client) for name, url_name in ADMIN_SCENARIOS]
+        for name, url, before, scenario_client in scenarios:
+            result = dict(size=size, view=name, url=url, **measure(scenario_client, url, repeat, before))
+            results.append(result)
+            if stdout is not None:
+                stdout.write(
+                    "{size:>5} {view:<18} {status} {queries:>3} queries {writes:>2} writes "
+                    "p50 {p50:>9.3f}ms p95 {p95:>9.3f}ms {peak_memory_kb:>9.1f}KiB".format(
+                        p50=result['latency_ms']['p50'], p95=result['latency_ms']['p95'], **result
+                    )
+                )
+    return results
+
+
+def compare_results(baseline, results, tolerance=0.2):
+    """
+    compares results with those of a baseline run, returns a list of
+    regressions as strings: more queries or writes, or a p50 latency slower
+    by more than `tolerance`
+    """
+    previous = {(result['size'], result['view']): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result['size'], result['view']))
+        if before is None:
+            continue
+        label = "{0} x{1}".format(result['view'], result['size'])
+        if result['queries'] > before['queries']:
+            regressions.append("{0}: {1} queries, was {2}".format(label, result['queries'], before['queries']))
+        # baselines recorded before writes were counted have none
+        if result.get('writes', 0) > before.get('writes', result.get('writes', 0)):
+            regressions.append("{0}: {1} writes, was {2}".format(label, result['writes'], before['writes']))
+        p50, previous_p50 = result['latency_ms']['p50'], before['latency_ms']['p50']
+        if p50 > previous_p50 * (1 + tolerance):
+            regressions.append("{0}: p50 {1}ms, was {2}ms".format(label, p50, previous_p50))
+    return regressions
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Business, Loan
+from .pagination import keyset_page
+
+
+DASHBOARD_KEY = 'borrowing:dashboard:{0}'
+CHANGED_AT_KEY = 'borrowing:changed-at:{0}'
+# a lost timestamp only costs a full render of the borrower pages
+CHANGED_AT_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def get_dashboard_key(borrower_id):
+    """ cache key holding the dashboard summary of a given borrower """
+    return DASHBOARD_KEY.format(borrower_id)
+
+
+def business_page(borrower_id, cursor=None):
+    """ a page of the businesses of a borrower, newest first, with their number of loans """
+    return keyset_page(
+        Business.objects.filter(owner_id=borrower_id)
+        .annotate(loan_nb=F('loan_count'))
+        .values('pk', 'name', 'address', 'loan_nb', 'created_at'),
+        cursor
+    )
+
+
+def loan_page(borrower_id, cursor=None, statuses=None):
+    """ a page of the loans of a borrower, newest first, optionally of some statuses only """
+    loans = Loan.objects.filter(borrower_id=borrower_id)
+    if statuses:
+        loans = loans.filter(status__in=statuses)
+    rows, next_cursor = keyset_page(loans.values('pk', 'amount', 'currency', 'created_at', 'status'), cursor)
+    status_labels = dict(Loan.STATUS_CHOICES)
+    for loan in rows:
+        loan['status_display'] = status_labels.get(loan['status'], loan['status'])
+    return rows, next_cursor
+
+
+def build_dashboard(borrower_id):
+    """
+    computes the summary displayed on borrowing:home -- the first page of
+    the businesses of the borrower with their number of loans and of the
+    loans themselves, with the cursors of the next pages -- as plain dicts
+    so it can be pickled into the cache
+    """
+    businesses, businesses_next = business_page(borrower_id)
+    loans, loans_next = loan_page(borrower_id)
+    return {
+        'businesses': businesses, 'businesses_next': businesses_next,
+        'loans': loans, 'loans_next': loans_next,
+    }
+
+
+def get_dashboard(borrower_id):
+    """
+    returns the dashboard summary of a borrower, from the cache if it is
+    warm, else computes it and stores it until the next invalidation
+    """
+    key = get_dashboard_key(borrower_id)
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = build_dashboard(borrower_id)
+        cache.set(key, dashboard, settings.BORROWING_DASHBOARD_CACHE_TIMEOUT)
+    return dashboard
+
+
+def get_changed_at(borrower_id):
+    """
+    time of the last change to the data of a borrower, from which the
+    validators of the borrower pages are derived. When it is not known
+    the current time is recorded, so that no page is reported unmodified.
+    """
+    key = CHANGED_AT_KEY.format(borrower_id)
+    changed_at = cache.get(key)
+    if changed_at is None:
+        cache.add(key, timezone.now(), CHANGED_AT_TIMEOUT)
+        changed_at = cache.get(key)
+    return changed_at
+
+
+def get_request_changed_at(request):
+    """ get_changed_at of the borrower making the request, looked up once per request """
+    if not hasattr(request, '_borrower_changed_at'):
+        request._borrower_changed_at = get_changed_at(request.user.pk)
+    return request._borrower_changed_at
+
+
+def changed_recently(request):
+    """
+    whether the data of the borrower making the request changed in the last
+    REPLICA_STICKY_SECONDS: the borrower pages then read from the primary,
+    as the replicas may not have caught up with the borrower's own writes.
+    Without a time of change, when the cache is unavailable, it may have.
+    """
+    if not request.user.is_authenticated:
+        return False
+    changed_at = get_request_changed_at(request)
+    if changed_at is None:
+        return True
+    return timezone.now() - changed_at < timedelta(seconds=settings.REPLICA_STICKY_SECONDS)
+
+
+def _invalidate(borrower_ids):
+    cache.delete_many([get_dashboard_key(borrower_id) for borrower_id in borrower_ids])
+    now = timezone.now()
+    cache.set_many({CHANGED_AT_KEY.format(borrower_id): now for borrower_id in borrower_ids}, CHANGED_AT_TIMEOUT)
+
+
+def invalidate_dashboard(borrower_id):
+    """ drops the cached summary of a borrower, next hit will rebuild it """
+    invalidate_dashboards([borrower_id])
+
+
+def invalidate_dashboards(borrower_ids):
+    """
+    drops the cached summaries of several borrowers and records the time
+    of the change, in two cache round trips. It is done again on commit:
+    a page rendered in between from the rows not yet committed would
+    otherwise be cached, or reported unmodified, until the next change.
+    """
+    if borrower_ids:
+        borrower_ids = list(borrower_ids)
+        _invalidate(borrower_ids)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: _invalidate(borrower_ids))
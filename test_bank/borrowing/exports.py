@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+
+# (column name, lookup from Loan) of the loan book exports
+LOAN_EXPORT_COLUMNS = (
+    ('id', 'pk'),
+    ('created_at', 'created_at'),
+    ('modified_at', 'modified_at'),
+    ('status', 'status'),
+    ('amount', 'amount'),
+    ('currency', 'currency'),
+    ('duration', 'duration'),
+    ('interest_rate', 'interest_rate'),
+    ('reason', 'reason'),
+    ('business_id', 'business_id'),
+    ('business_name', 'business__name'),
+    ('business_company_number', 'business__company_number'),
+    ('business_sector', 'business__sector'),
+    ('borrower_id', 'borrower_id'),
+    ('borrower_username', 'borrower__user__username'),
+    ('borrower_phone_number', 'borrower__phone_number'),
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def iter_loan_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    yields the loans of the queryset as tuples following LOAN_EXPORT_COLUMNS
+    Loans are fetched by chunks seeking on the primary key, so that only
+    one chunk is held in memory whatever the size of the book, and every
+    query stays cheap however far the export goes
+    """
+    lookups = [lookup for column, lookup in LOAN_EXPORT_COLUMNS]
+    queryset = queryset.order_by('pk').values_list(*lookups)
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk[:chunk_size])
+        if not rows:
+            return
+        for row in rows:
+            yield row
+        last_pk = rows[-1][0]
+
+
+class Echo:
+    """ file-like object handing back what is written, to stream csv.writer output """
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([column for column, lookup in LOAN_EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    """ also serializes values such as phone numbers through their string form """
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+def iter_jsonl(rows):
+    columns = [column for column, lookup in LOAN_EXPORT_COLUMNS]
+    encoder = ExportJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+def iter_loan_export(queryset, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """ yields the lines of the export of the queryset in the given format """
+    rows = iter_loan_rows(queryset, chunk_size)
+    if export_format == 'csv':
+        return iter_csv(rows)
+    return iter_jsonl(rows)
+
+
+def loan_export_response(queryset, export_format):
+    """ streams the export of the queryset as an attachment """
+    response = StreamingHttpResponse(
+        iter_loan_export(queryset, export_format), content_type=EXPORT_FORMATS[export_format]
+    )
+    response['Content-Disposition'] = 'attachment; filename="loans-{0}.{1}"'.format(
+        timezone.now().strftime('%Y%m%d-%H%M%S'), export_format
+    )
+    return response
@@ -6,23 +6,25 @@ from django.forms.fields import RegexField
 from phonenumber_field.formfields import PhoneNumberField
 
 from test_bank.users.models import User
-from .models import BorrowerProfile
+from .models import BorrowerProfile, Business
 
-from .helper_functions import send_code_to_user, get_verification_code
+from . import otp
 from test_bank.borrowing.helper_functions import calculate_interest_rate
 from test_bank.borrowing.models import Loan
+from .pagination import decode_cursor, InvalidCursor
 
 
 class VeriFyPhoneForm(forms.Form):
     """
     Form validating the phone number provided and if valid
-    sending the code to the user
+    sending the code to the user, raises otp.RateLimited if too many codes
+    were requested
     """
     phone_number = PhoneNumberField(required=True)
 
-    def process(self):
+    def process(self, user_id, ip_address):
         phone_number = self.cleaned_data.get('phone_number')
-        send_code_to_user(phone_number=phone_number)
+        otp.send_code(phone_number, user_id, ip_address)
 
 
 class UserUpdateForm(forms.ModelForm):
@@ -61,6 +63,7 @@ class BorrowerProfileForm(forms.ModelForm):
         instance = super().save(commit=False)
         instance.user = self.user
         instance.save()
+        otp.revoke_code(instance.phone_number)
         return instance
 
     def clean_phone_number(self):
@@ -71,15 +74,26 @@ class BorrowerProfileForm(forms.ModelForm):
         return phone_number
 
     def clean(self):
-        # The code must correspond to what has been sent by SMS
+        # The code must correspond to what has been sent by SMS, and still be valid
         cleaned_data = super().clean()
         code = cleaned_data.get('code')
         phone_number = cleaned_data.get('phone_number')
-        if code and phone_number and code != get_verification_code(phone_number):
+        if not (code and phone_number):
+            return
+        outcome = otp.check_code(phone_number, code)
+        if outcome == otp.WRONG:
             raise forms.ValidationError(_(
                 "The validation code you entered is not correct."
                 "Please check your number and click \"Verify my number\" again."
             ))
+        if outcome == otp.EXPIRED:
+            raise forms.ValidationError(_(
+                "The validation code has expired. Please click \"Verify my number\" again."
+            ))
+        if outcome == otp.EXHAUSTED:
+            raise forms.ValidationError(_(
+                "Too many incorrect codes were entered. Please click \"Verify my number\" again."
+            ))
 
     class Meta:
         model = BorrowerProfile
@@ -101,16 +115,61 @@ class UserBorrowerForm:
 
 
 class LoanForm(forms.ModelForm):
+
+    def is_priceable(self, field_name, value):
+        """ the rate can only be checked against values accepted by the model validators """
+        try:
+            Loan._meta.get_field(field_name).run_validators(value)
+        except forms.ValidationError:
+            return False
+        return True
+
     def clean(self):
         cleaned_data = super().clean()
         amount = cleaned_data.get('amount')
         duration = cleaned_data.get('duration')
         interest_rate = cleaned_data.get('interest_rate')
-        non_valid = (amount and duration and interest_rate and
-                     interest_rate != calculate_interest_rate(amount, duration))
+        business = cleaned_data.get('business')
+        non_valid = (amount and duration and interest_rate and business and
+                     self.is_priceable('amount', amount) and self.is_priceable('duration', duration) and
+                     interest_rate != calculate_interest_rate(amount, duration, business.sector))
         if non_valid:
             raise forms.ValidationError("There was a problem calculating your interest rate.")
 
     class Meta:
         model = Loan
         fields = ['amount', 'business', 'reason', 'duration', 'interest_rate']
+
+
+class LoanQuoteForm(forms.Form):
+    """
+    Validates the query string of borrowing:quote, the sector can be given
+    directly or through one of the user's businesses
+    """
+    amount = forms.DecimalField(min_value=10000, max_value=100000, decimal_places=2)
+    duration = forms.IntegerField(min_value=1, max_value=10000)
+    sector = forms.ChoiceField(choices=Business._meta.get_field('sector').choices, required=False)
+    business = forms.IntegerField(required=False)
+
+
+class LoanListForm(forms.Form):
+    """
+    Validates the query string of borrowing:loan_list: the statuses to
+    list, all if none, and the cursor of the page
+    """
+    status = forms.TypedMultipleChoiceField(choices=Loan.STATUS_CHOICES, coerce=int, required=False)
+    after = forms.CharField(required=False)
+
+    def clean_after(self):
+        after = self.cleaned_data['after']
+        if after:
+            try:
+                decode_cursor(after)
+            except InvalidCursor:
+                raise forms.ValidationError(_("Invalid page"))
+        return after
+
+
+class ApiLoanListForm(LoanListForm):
+    """ Validates the query string of the loans API, which may list the loans of a single business """
+    business = forms.IntegerField(required=False)
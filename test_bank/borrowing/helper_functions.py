@@ -1,28 +1,31 @@
 # -*- coding: utf-8 -*-
 
+from datetime import timedelta
 from hashlib import sha256
 from django.conf import settings
-from decimal import Decimal
-from builtins import NotImplementedError
+from django.utils import timezone
 
+from test_bank.outbox.models import OutboundMessage
 
-def calculate_interest_rate(amount, duration, *args):
+
+def calculate_interest_rate(amount, duration, sector=None):
     """
     calculates the interest rate based on the characteristics of
-    the loan: amount, duration, etc, as well as other parameters
-    yet to be determined (interbank rate, trust in borrower, etc)
-    (Not yet implemented -> returns always 0.05)
+    the loan: amount, duration and sector of the business. Thin wrapper
+    around pricing.price_loans, use the latter to price many loans at once
     """
-    return Decimal('0.05000')
+    # pricing imports numpy, which the workers only need once they price a loan
+    from .pricing import price_loans, to_decimals
+    return to_decimals(price_loans([amount], [duration], [sector]))[0]
 
 
-def get_verification_code(phone_number):
+def get_verification_code(phone_number, nonce=''):
     """
     calculates in a deterministic way the PIN number by taking the few first
     characters of the sha256 hash of the phone_number appended to a secret key
-    saves the need to a db call with some sort of PhoneActivationLink
+    and to the nonce of the code, stored for a limited time by borrowing.otp
     """
-    to_encode = settings.PHONE_SECRET_KEY + str(phone_number)
+    to_encode = settings.PHONE_SECRET_KEY + str(phone_number) + nonce
     hashed_value = sha256(to_encode.encode('utf-8')).hexdigest()
     list_of_int = [int(x, 16) + int(y, 16) for x, y in zip(hashed_value[0:5], hashed_value[5:10])]
     # alphabet A-Z without the I plus the numbers to make 32 choices
@@ -31,16 +34,12 @@ def get_verification_code(phone_number):
     return code
 
 
-def send_code_to_user(phone_number):
+def send_code_to_user(phone_number, code):
     """
-    sends the validation code to the user, in debug displays to the console
-    in production would use twilio
+    queues the text message carrying the validation code in the outbox, it
+    is dropped if it could not be sent before the code expires
     """
-    if settings.DEBUG:
-        print(
-            "SMS sent to {0}\nYour PIN number is {1}".format(
-                phone_number, get_verification_code(phone_number)
-            )
-        )
-    else:
-        raise NotImplementedError
+    OutboundMessage.objects.enqueue_sms(
+        str(phone_number), "Your PIN number is {0}".format(code),
+        expires_at=timezone.now() + timedelta(seconds=settings.PHONE_CODE_TIMEOUT),
+    )
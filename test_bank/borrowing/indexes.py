@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+"""
+Indexes that cannot be expressed with index_together / db_index.
+
+Partial and expression indexes are created on PostgreSQL once the
+borrowing tables have been migrated. Other backends fall back on the
+composite (status, created_at) index declared in Loan.Meta, which covers
+the same queries at the cost of indexing every status, and have no
+index for the admin searches.
+"""
+from django.db import connections
+
+from test_bank.contrib.db.indexes import create_partial_indexes, create_search_indexes
+
+
+PARTIAL_INDEXES = (
+    # admins triage the pending loans (status 0) by creation date
+    ('borrowing_loan_pending_created_at', 'borrowing_loan', 'created_at', 'status = 0'),
+)
+
+# Prefix and exact searches of the admin
+SEARCH_INDEXES = (
+    ('borrowing_business_name_search', 'borrowing_business', 'name'),
+    ('borrowing_business_company_number_search', 'borrowing_business', 'company_number'),
+)
+
+
+def create_custom_indexes(sender, using, **kwargs):
+    """ post_migrate receiver creating the partial and search indexes if missing """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    create_partial_indexes(connection, PARTIAL_INDEXES)
+    create_search_indexes(connection, SEARCH_INDEXES)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import json
+import platform
+import subprocess
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from test_bank.borrowing.benchmark import BENCHMARK_SIZES, run_benchmark, compare_results
+
+
+def get_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=str(settings.ROOT_DIR), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the borrowing views and the admin changelists against "
+        "borrowers seeded with growing numbers of businesses and loans, in a "
+        "throwaway test database, and writes the results as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', dest='sizes', type=int, nargs='+', default=list(BENCHMARK_SIZES),
+            help="Numbers of businesses and loans of the seeded borrowers",
+        )
+        parser.add_argument(
+            '--repeat', dest='repeat', type=int, default=20,
+            help="Number of timed requests per page",
+        )
+        parser.add_argument(
+            '--output', dest='output', default=None,
+            help="File to write the JSON results to, defaults to the standard output",
+        )
+        parser.add_argument(
+            '--compare', dest='compare', default=None,
+            help="JSON results of a previous run, fails on query count or latency regressions",
+        )
+        parser.add_argument(
+            '--tolerance', dest='tolerance', type=float, default=0.2,
+            help="Relative p50 slowdown tolerated by --compare",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = run_benchmark(options['sizes'], options['repeat'], stdout=self.stderr)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'revision': get_revision(),
+            'date': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output'] is None:
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as output_file:
+                output_file.write(output + '\n')
+
+        if options['compare'] is not None:
+            with open(options['compare'], encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)['results']
+            regressions = compare_results(baseline, results, options['tolerance'])
+            if regressions:
+                raise CommandError("Regressions against {0}:\n{1}".format(
+                    options['compare'], '\n'.join(regressions)
+                ))
+            self.stderr.write(self.style.SUCCESS("No regression against {0}".format(options['compare'])))
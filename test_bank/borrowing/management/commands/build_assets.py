@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+from urllib.error import URLError
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from test_bank.contrib.assets import AssetError, build_bundle, vendor
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the minified bundles of settings.ASSET_BUNDLES into "
+        "static/bundles, to be run before collectstatic"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--vendor', action='store_true', dest='vendor', default=False,
+            help="Download the files of settings.ASSET_VENDOR missing from static/vendor first",
+        )
+        parser.add_argument(
+            '--output', dest='output', default=None,
+            help="Directory the bundles are written to, static/bundles by default",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['vendor']:
+                self.vendor()
+            for name in sorted(settings.ASSET_BUNDLES):
+                size, bundle_size = build_bundle(name, options['output'])
+                self.stdout.write("bundles/{0}: {1} files, {2:.1f}KiB minified to {3:.1f}KiB".format(
+                    name, len(settings.ASSET_BUNDLES[name]), size / 1024, bundle_size / 1024,
+                ))
+        except (AssetError, URLError) as error:
+            raise CommandError(error)
+
+    def vendor(self):
+        for path, (url, integrity) in sorted(settings.ASSET_VENDOR.items()):
+            if finders.find(path) is not None:
+                continue
+            vendor(path)
+            self.stdout.write("{0}: downloaded from {1}".format(path, url))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+from django.core.management.base import BaseCommand
+
+from test_bank.borrowing.exports import iter_loan_export, EXPORT_FORMATS, EXPORT_CHUNK_SIZE
+from test_bank.borrowing.models import Loan
+
+
+class Command(BaseCommand):
+    help = "Streams the loan book, joined with businesses and borrowers, as CSV or JSON lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', dest='format', choices=sorted(EXPORT_FORMATS), default='csv',
+        )
+        parser.add_argument(
+            '--output', dest='output', default=None,
+            help="File to write the export to, defaults to the standard output",
+        )
+        parser.add_argument(
+            '--status', dest='status', type=int, action='append', default=None,
+            help="Only export the loans with this status, can be repeated",
+        )
+        parser.add_argument(
+            '--chunk-size', dest='chunk_size', type=int, default=EXPORT_CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        queryset = Loan.objects.all()
+        if options['status'] is not None:
+            queryset = queryset.filter(status__in=options['status'])
+        lines = iter_loan_export(queryset, options['format'], options['chunk_size'])
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            output.writelines(lines)
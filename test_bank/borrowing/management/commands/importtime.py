@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from test_bank.contrib.importtime import PREFIX, aggregate, parse
+
+
+class Command(BaseCommand):
+    help = (
+        "Starts a fresh interpreter with the current settings, imports the "
+        "WSGI module (or --module) and reports the time spent importing "
+        "modules, per installed app or top level package"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--module', dest='module', default=settings.WSGI_APPLICATION.rsplit('.', 1)[0],
+            help="Module imported once Django is set up, defaults to the WSGI module",
+        )
+        parser.add_argument(
+            '--limit', dest='limit', type=int, default=25,
+            help="Number of rows reported, the slowest first",
+        )
+        parser.add_argument(
+            '--by-module', action='store_true', dest='by_module', default=False,
+            help="Report the slowest modules rather than the slowest apps",
+        )
+
+    def handle(self, *args, **options):
+        command = [sys.executable, '-m', 'test_bank.contrib.importtime', options['module']]
+        if sys.version_info >= (3, 7):
+            command[1:1] = ['-X', 'importtime']
+        environment = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        process = subprocess.run(
+            command, cwd=str(settings.ROOT_DIR), env=environment,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+        )
+        lines = process.stderr.splitlines()
+        if process.returncode:
+            raise CommandError("Importing {0} failed:\n{1}".format(
+                options['module'], '\n'.join(line for line in lines if not line.startswith(PREFIX))
+            ))
+
+        imports = parse(lines)
+        total = sum(imported.cumulative for imported in imports if imported.depth == 0)
+        if options['by_module']:
+            title = 'module'
+            rows = sorted(
+                ((imported.name, 1, imported.self, imported.cumulative) for imported in imports),
+                key=lambda row: row[3], reverse=True,
+            )
+        else:
+            title = 'app or package'
+            # INSTALLED_APPS may list AppConfig classes rather than packages
+            rows = aggregate(imports, [config.name for config in apps.get_app_configs()])
+        width = max([len(title)] + [len(row[0]) for row in rows[:options['limit']]])
+        self.stdout.write("{0:<{1}} {2:>8} {3:>10} {4:>14}".format(title, width, 'modules', 'self ms', 'cumulative ms'))
+        for name, modules, self_time, cumulative in rows[:options['limit']]:
+            self.stdout.write("{0:<{1}} {2:>8} {3:>10.1f} {4:>14.1f}".format(
+                name, width, modules, self_time / 1000, cumulative / 1000
+            ))
+        self.stdout.write("{0} modules imported in {1:.1f} ms".format(len(imports), total / 1000))
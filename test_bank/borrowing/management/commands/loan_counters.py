@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from test_bank.borrowing.models import Business
+
+
+class Command(BaseCommand):
+    help = (
+        "Checks the denormalized loan counters of every business against "
+        "borrowing_loan, and fixes them with --rebuild"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true', dest='rebuild', default=False,
+            help="Overwrite the counters that drifted instead of only reporting them",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, dest='batch_size', default=1000,
+            help="Number of businesses checked per query",
+        )
+
+    def iter_drifted(self, batch_size):
+        """ yields (pk, loan_count, active_loan_count) for each business out of step """
+        last_pk = 0
+        while True:
+            batch = list(
+                Business.objects.filter(pk__gt=last_pk).order_by('pk')
+                .with_actual_loan_counts()
+                .values_list('pk', 'loan_count', 'active_loan_count',
+                             'actual_loan_count', 'actual_active_loan_count')[:batch_size]
+            )
+            if not batch:
+                return
+            for pk, loans, active_loans, actual_loans, actual_active_loans in batch:
+                if (loans, active_loans) != (actual_loans, actual_active_loans):
+                    yield pk, actual_loans, actual_active_loans
+            last_pk = batch[-1][0]
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for pk, loans, active_loans in self.iter_drifted(options['batch_size']):
+            drifted += 1
+            if options['rebuild']:
+                with transaction.atomic():
+                    # recount under lock so concurrent loan writes are not lost
+                    list(Business.objects.select_for_update().filter(pk=pk).values_list('pk'))
+                    loans, active_loans = Business.objects.with_actual_loan_counts().values_list(
+                        'actual_loan_count', 'actual_active_loan_count'
+                    ).get(pk=pk)
+                    Business.objects.filter(pk=pk).update(loan_count=loans, active_loan_count=active_loans)
+            else:
+                self.stdout.write("Business {0}: expected {1} loans, {2} active".format(pk, loans, active_loans))
+        if options['rebuild']:
+            self.stdout.write(self.style.SUCCESS("{0} business counters rebuilt".format(drifted)))
+        elif drifted:
+            raise CommandError("{0} business counters are out of step, run with --rebuild".format(drifted))
+        else:
+            self.stdout.write(self.style.SUCCESS("All business counters are consistent"))
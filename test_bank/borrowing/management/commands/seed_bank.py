@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from test_bank.borrowing.seeding import SEED_BATCH_SIZE, plan_bank, seed_chunk, reset_sequences
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with synthetic borrowers, businesses and loans for "
+        "load testing, with bulk inserts optionally spread over several processes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', dest='users', type=int, default=1000)
+        parser.add_argument(
+            '--businesses-per-user', dest='businesses_per_user', type=float, default=1.6,
+            help="Mean number of businesses of a borrower, at least 1",
+        )
+        parser.add_argument(
+            '--loans-per-business', dest='loans_per_business', type=float, default=2.5,
+            help="Mean number of loans of a business",
+        )
+        parser.add_argument(
+            '--workers', dest='workers', type=int, default=1,
+            help="Number of processes inserting chunks concurrently",
+        )
+        parser.add_argument(
+            '--chunk-users', dest='chunk_users', type=int, default=2000,
+            help="Number of borrowers inserted per transaction",
+        )
+        parser.add_argument('--batch-size', dest='batch_size', type=int, default=SEED_BATCH_SIZE)
+        parser.add_argument(
+            '--seed', dest='seed', type=int, default=0,
+            help="Seed of the random generators, the same seed generates the same rows",
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] > 1 and connection.vendor == 'sqlite':
+            raise CommandError("SQLite does not support concurrent writers, use --workers 1")
+        if options['businesses_per_user'] < 1:
+            raise CommandError("Every borrower owns at least one business")
+
+        self.verbosity = options['verbosity']
+        start = time.perf_counter()
+        chunks = plan_bank(
+            options['users'], options['businesses_per_user'], options['loans_per_business'],
+            options['chunk_users'], seed=options['seed'], batch_size=options['batch_size'],
+        )
+        totals = [0, 0, 0]
+        if options['workers'] > 1:
+            # forked workers must not share the connection of the parent
+            connections.close_all()
+            with multiprocessing.Pool(options['workers']) as pool:
+                for counts in pool.imap_unordered(seed_chunk, chunks):
+                    totals = self.report(totals, counts, start)
+        else:
+            for chunk in chunks:
+                totals = self.report(totals, seed_chunk(chunk), start)
+        reset_sequences()
+        self.stdout.write(self.style.SUCCESS(
+            "{0} users, {1} businesses and {2} loans created in {3:.1f}s".format(
+                *totals, time.perf_counter() - start
+            )
+        ))
+
+    def report(self, totals, counts, start):
+        totals = [total + count for total, count in zip(totals, counts)]
+        if self.verbosity > 1:
+            self.stdout.write("{0} users, {1} businesses, {2} loans ({3:.0f} loans/s)".format(
+                *totals, totals[2] / (time.perf_counter() - start)
+            ))
+        return totals
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+from test_bank.contrib.template_backend import get_render_time, reset_render_time
+
+
+logger = logging.getLogger('test_bank.querybudget')
+
+# literals are replaced so that queries differing only by their parameters
+# share the same fingerprint
+FINGERPRINT_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql):
+    return FINGERPRINT_RE.sub('?', sql)
+
+
+class QueryBudgetMiddleware:
+    """
+    Records for every request the number of SQL queries, the time spent in
+    the database, the queries repeated with different parameters (typical of
+    N+1 patterns) and the time spent rendering templates, then:
+        - adds them as X-Query-* response headers when DEBUG is on
+        - logs them as a single key=value line on 'test_bank.querybudget'
+        - checks them against settings.QUERY_BUDGETS, keyed by URL name
+          (e.g. 'borrowing:home'), and either logs a warning or raises
+          QueryBudgetExceeded depending on settings.QUERY_BUDGET_ACTION
+    Django 1.10 has no execute_wrapper, queries are captured by forcing
+    the debug cursor for the duration of the request. Rendering is timed by
+    the template backend of test_bank.contrib.template_backend.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        states = []
+        for connection in connections.all():
+            states.append((connection, connection.force_debug_cursor, len(connection.queries_log)))
+            connection.force_debug_cursor = True
+        reset_render_time()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            elapsed = time.perf_counter() - start
+            queries = []
+            for connection, forced, offset in states:
+                connection.force_debug_cursor = forced
+                queries.extend(list(connection.queries_log)[offset:])
+
+        stats = self.get_stats(request, queries, elapsed)
+        if settings.DEBUG:
+            response['X-Query-Count'] = stats['queries']
+            response['X-Query-Time-Ms'] = stats['sql_ms']
+            response['X-Query-Duplicates'] = stats['duplicates']
+            response['X-Render-Time-Ms'] = stats['render_ms']
+            response['X-View-Time-Ms'] = stats['total_ms']
+        logger.info(' '.join('{0}={1}'.format(key, value) for key, value in stats.items()))
+        self.check_budget(stats)
+        return response
+
+    def get_stats(self, request, queries, elapsed):
+        resolver_match = getattr(request, 'resolver_match', None)
+        fingerprints = Counter(fingerprint(query['sql']) for query in queries)
+        return {
+            'view': resolver_match.view_name if resolver_match else None,
+            'method': request.method,
+            'queries': len(queries),
+            'sql_ms': round(sum(float(query['time']) for query in queries) * 1000, 2),
+            'duplicates': sum(count - 1 for count in fingerprints.values()),
+            'render_ms': round(get_render_time() * 1000, 2),
+            'total_ms': round(elapsed * 1000, 2),
+        }
+
+    def check_budget(self, stats):
+        budget = settings.QUERY_BUDGETS.get(stats['view'])
+        if not budget:
+            return
+        exceeded = [
+            '{0}={1} > {2}'.format(metric, stats[metric], limit)
+            for metric, limit in sorted(budget.items()) if stats[metric] > limit
+        ]
+        if not exceeded:
+            return
+        message = "Query budget of {0} exceeded: {1}".format(stats['view'], ', '.join(exceeded))
+        if settings.QUERY_BUDGET_ACTION == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
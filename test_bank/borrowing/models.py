@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from django.db import router, transaction
 from django.db.models import (
-    Model, ForeignKey, CharField, BooleanField, DecimalField,
-    OneToOneField, DateTimeField, PositiveSmallIntegerField,
+    Model, QuerySet, ForeignKey, CharField, BooleanField, DecimalField,
+    OneToOneField, DateTimeField, PositiveSmallIntegerField, PositiveIntegerField,
+    Case, When, Sum, Value, IntegerField, F,
 )
 from django.conf import settings
 from phonenumber_field.modelfields import PhoneNumberField
@@ -18,7 +20,7 @@ class BorrowerProfile(Model):
     and conditions
     """
     user = OneToOneField(settings.AUTH_USER_MODEL, primary_key=True)
-    phone_number = PhoneNumberField(blank=True)
+    phone_number = PhoneNumberField(blank=True, db_index=True)
     is_verified = BooleanField(default=False)
     has_signed = BooleanField(
         verbose_name=_(
@@ -33,10 +35,39 @@ class BorrowerProfile(Model):
         return "profile of {0}".format(self.user.username)
 
 
+class BusinessQuerySet(QuerySet):
+
+    def adjust_loan_counters(self, business_id, loans=0, active_loans=0):
+        """
+        shifts the denormalized loan counters of a business in a single
+        UPDATE relying on F expressions, safe against concurrent writers
+        """
+        if not (loans or active_loans):
+            return
+        self.filter(pk=business_id).update(
+            loan_count=F('loan_count') + loans,
+            active_loan_count=F('active_loan_count') + active_loans,
+        )
+
+    def with_actual_loan_counts(self):
+        """ annotates each business with the counters computed from borrowing_loan """
+        return self.annotate(
+            actual_loan_count=Sum(Case(
+                When(loan__isnull=False, then=Value(1)), default=Value(0), output_field=IntegerField()
+            )),
+            actual_active_loan_count=Sum(Case(
+                When(loan__status__in=Loan.ACTIVE_STATUSES, then=Value(1)),
+                default=Value(0), output_field=IntegerField()
+            )),
+        )
+
+
 class Business(Model):
     """
     A business belonging to a borrower, with a name, address and
     activity sector
+    loan_count and active_loan_count are maintained by Loan.save and
+    borrowing.signals, rebuild them with ./manage.py loan_counters --rebuild
     """
 
     company_number_validator = RegexValidator(
@@ -50,16 +81,25 @@ class Business(Model):
     sector = CharField(
         max_length=1,
         choices=(('R', 'Retail'), ('P', 'Professional Services'),
-                 ('F', 'Food & Drink'), ('E', 'Entertainment'),)
+                 ('F', 'Food & Drink'), ('E', 'Entertainment'),),
+        db_index=True,
     )
-    created_at = DateTimeField(default=timezone.now, blank=True, null=True)
+    created_at = DateTimeField(default=timezone.now, blank=True, null=True, db_index=True)
     validated_at = DateTimeField(default=timezone.now, blank=True, null=True)
+    loan_count = PositiveIntegerField(default=0, editable=False)
+    active_loan_count = PositiveIntegerField(default=0, editable=False)
+
+    objects = BusinessQuerySet.as_manager()
 
     def __str__(self):
         return "{0} -- {1}".format(self.name, self.company_number)
 
     class Meta:
         verbose_name_plural = "businesses"
+        # borrowing:home lists the businesses of a borrower by date
+        index_together = [
+            ('owner', 'created_at'),
+        ]
 
 
 class Loan(Model):
@@ -67,6 +107,15 @@ class Loan(Model):
     A loan, defined by amount, currency, reason, duration and interest rate
     It relates to a business and a borrower
     """
+    PENDING, APPROVED, PROCESSED, REJECTED, CANCELLED, REPAID = range(6)
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'), (APPROVED, 'Approved'),
+        (PROCESSED, 'Processed'), (REJECTED, 'Rejected'),
+        (CANCELLED, 'Cancelled'), (REPAID, 'Repaid'),
+    )
+    # statuses counted in Business.active_loan_count
+    ACTIVE_STATUSES = (PENDING, APPROVED, PROCESSED, REJECTED, REPAID)
+
     amount = DecimalField(
         max_digits=9, decimal_places=2,
         validators=[MinValueValidator(10000), MaxValueValidator(100000)],
@@ -78,7 +127,7 @@ class Loan(Model):
 
     business = ForeignKey(Business)
 
-    currency = CharField(max_length=3, default='GBP')
+    currency = CharField(max_length=3, default='GBP', db_index=True)
 
     reason = CharField(
         max_length=256,
@@ -97,18 +146,69 @@ class Loan(Model):
         verbose_name=_("AER interest rate"),
     )
 
-    created_at = DateTimeField(default=timezone.now, blank=True, null=True)
+    created_at = DateTimeField(default=timezone.now, blank=True, null=True, db_index=True)
 
     modified_at = DateTimeField(default=timezone.now, blank=True, null=True)
 
-    status = PositiveSmallIntegerField(
-        default=0,
-        choices=(
-            (0, 'Pending'), (1, 'Approved'),
-            (2, 'Processed'), (3, 'Rejected'),
-            (4, 'Cancelled'), (5, 'Repaid'),
-        )
-    )
+    status = PositiveSmallIntegerField(default=PENDING, choices=STATUS_CHOICES)
 
     def __str__(self):
         return "{1} {0} for {2}".format(self.amount, self.currency, self.business)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_counter_state = instance.get_counter_state()
+        return instance
+
+    def get_counter_state(self):
+        """
+        (business_id, is_active) as seen by the Business loan counters,
+        None if either field is deferred
+        """
+        if 'business_id' not in self.__dict__ or 'status' not in self.__dict__:
+            return None
+        return self.business_id, self.status in self.ACTIVE_STATUSES
+
+    def get_stored_counter_state(self, using):
+        """ counter state of the row currently in database, None for a new loan """
+        if self._state.adding:
+            return None
+        state = getattr(self, '_loaded_counter_state', None)
+        if state is None:
+            row = type(self)._base_manager.using(using).filter(pk=self.pk).values_list(
+                'business_id', 'status'
+            ).first()
+            state = row and (row[0], row[1] in self.ACTIVE_STATUSES)
+        return state
+
+    def save(self, *args, **kwargs):
+        """
+        saves the loan and shifts the loan counters of the business(es)
+        involved within the same transaction
+        """
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'status', 'business', 'business_id'} & set(update_fields):
+            return super().save(*args, **kwargs)
+        with transaction.atomic(using=using):
+            previous = self.get_stored_counter_state(using)
+            super().save(*args, **kwargs)
+            current = self.get_counter_state() or previous
+            if previous != current:
+                businesses = Business.objects.db_manager(using)
+                if previous:
+                    businesses.adjust_loan_counters(previous[0], loans=-1, active_loans=-int(previous[1]))
+                businesses.adjust_loan_counters(current[0], loans=1, active_loans=int(current[1]))
+        self._loaded_counter_state = current
+
+    class Meta:
+        # borrower views filter on (borrower, pk) and list loans by date,
+        # optionally of some statuses, the admins triage pending loans by
+        # date -- see also borrowing.indexes
+        index_together = [
+            ('borrower', 'id'),
+            ('borrower', 'created_at'),
+            ('borrower', 'status', 'created_at'),
+            ('status', 'created_at'),
+        ]
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.template.loader import render_to_string
+
+from test_bank.outbox.models import OutboundMessage
+from .models import Loan
+
+
+# Borrowers looked up per query, within the 999 variables allowed by SQLite
+NOTIFY_CHUNK_SIZE = 500
+
+
+def build_status_messages(loans, status, using=DEFAULT_DB_ALIAS):
+    """
+    returns one unsaved OutboundMessage email per borrower of the loans,
+    given as (pk, business_id, borrower_id) rows, telling them their loans
+    moved to `status`
+    """
+    loan_ids = defaultdict(list)
+    for pk, business_id, borrower_id in loans:
+        loan_ids[borrower_id].append(pk)
+    borrower_ids = sorted(loan_ids)
+    users = get_user_model().objects.using(using)
+    status_display = dict(Loan.STATUS_CHOICES)[status]
+    messages = []
+    for start in range(0, len(borrower_ids), NOTIFY_CHUNK_SIZE):
+        recipients = users.filter(pk__in=borrower_ids[start:start + NOTIFY_CHUNK_SIZE]).exclude(email='')
+        for pk, email, first_name in recipients.values_list('pk', 'email', 'first_name'):
+            context = {'first_name': first_name, 'loan_ids': sorted(loan_ids[pk]), 'status': status_display}
+            messages.append(OutboundMessage(
+                channel=OutboundMessage.EMAIL,
+                recipient=email,
+                subject=render_to_string('borrowing/email/loan_status_subject.txt', context).strip(),
+                body=render_to_string('borrowing/email/loan_status_message.txt', context),
+                sender=settings.DEFAULT_FROM_EMAIL,
+            ))
+    return messages
+
+
+def notify_status_change(loans, status, using=DEFAULT_DB_ALIAS):
+    """
+    emails the borrowers of the loans moved to `status`, one email per
+    borrower, queued in the outbox within the transaction of the change
+    """
+    messages = build_status_messages(loans, status, using)
+    if messages:
+        OutboundMessage.objects.using(using).enqueue(*messages)
+    return len(messages)
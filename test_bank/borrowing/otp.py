@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""
+One-time codes verifying the phone number of a borrower, kept in the
+cache shared by all the workers.
+
+A code is valid for settings.PHONE_CODE_TIMEOUT seconds and for
+settings.PHONE_CODE_MAX_ATTEMPTS guesses, sending a new one revokes it.
+Sending codes is limited per user, client IP and phone number by the
+sliding windows of settings.PHONE_CODE_RATE_LIMITS. Counters rely on the
+atomic cache.incr of Redis, memcached and the locmem backend.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, get_random_string
+
+from .helper_functions import get_verification_code, send_code_to_user
+
+
+CODE_KEY = 'borrowing:phone-code:{0}'
+ATTEMPTS_KEY = 'borrowing:phone-code-attempts:{0}'
+RATE_KEY = 'borrowing:rate:{0}:{1}:{2}'
+
+# outcomes of check_code
+EXPIRED, EXHAUSTED, WRONG, VALID = range(4)
+
+
+class RateLimited(Exception):
+    """ raised when too many codes were requested, retry_after is in seconds """
+
+    def __init__(self, scope, retry_after):
+        super().__init__("Too many codes requested by {0}".format(scope))
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+def increment(key, timeout):
+    """ atomically increments a counter of the cache, created with the timeout """
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # the counter expired between add and incr
+        cache.add(key, 1, timeout)
+        return 1
+
+
+def hit(scope, identifier, limit, period, now=None):
+    """
+    counts a request of identifier, returns whether it is over the limit
+    of requests in the last `period` seconds: the count of the current
+    fixed window plus the count of the previous one, weighted by its part
+    still within the sliding window
+    """
+    now = time.time() if now is None else now
+    window, elapsed = divmod(now, period)
+    current = increment(RATE_KEY.format(scope, identifier, int(window)), 2 * period)
+    previous = cache.get(RATE_KEY.format(scope, identifier, int(window) - 1), 0)
+    return previous * (1 - elapsed / period) + current > limit
+
+
+def send_code(phone_number, user_id, ip_address):
+    """
+    sends a new code to the phone number, revoking the previous one
+    raises RateLimited if too many codes were requested for the user, the
+    IP address or the phone number. Without the address of the client, its
+    limit does not apply.
+    """
+    identifiers = {'user': user_id, 'ip': ip_address, 'phone': phone_number}
+    limited = [
+        (scope, period) for scope, (limit, period) in sorted(settings.PHONE_CODE_RATE_LIMITS.items())
+        if identifiers[scope] is not None and hit(scope, identifiers[scope], limit, period)
+    ]
+    if limited:
+        raise RateLimited(limited[0][0], max(period for scope, period in limited))
+    send_code_to_user(phone_number, issue_code(phone_number))
+
+
+def issue_code(phone_number):
+    """ stores a new code for the phone number and returns it """
+    nonce = get_random_string(16)
+    cache.set(CODE_KEY.format(phone_number), nonce, settings.PHONE_CODE_TIMEOUT)
+    cache.delete(ATTEMPTS_KEY.format(phone_number))
+    return get_verification_code(phone_number, nonce)
+
+
+def check_code(phone_number, code):
+    """
+    checks a code sent to the phone number, returns VALID, WRONG, EXPIRED
+    when there is no code, or EXHAUSTED once the attempts are spent -- the
+    code is then revoked
+    """
+    nonce = cache.get(CODE_KEY.format(phone_number))
+    if nonce is None:
+        return EXPIRED
+    attempts = increment(ATTEMPTS_KEY.format(phone_number), settings.PHONE_CODE_TIMEOUT)
+    if attempts > settings.PHONE_CODE_MAX_ATTEMPTS:
+        revoke_code(phone_number)
+        return EXHAUSTED
+    if constant_time_compare(code, get_verification_code(phone_number, nonce)):
+        return VALID
+    return WRONG
+
+
+def revoke_code(phone_number):
+    """ revokes the code of the phone number, once it has been used """
+    cache.delete_many([CODE_KEY.format(phone_number), ATTEMPTS_KEY.format(phone_number)])
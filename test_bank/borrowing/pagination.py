@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+Keyset (cursor) pagination on (created_at, pk), newest first.
+
+A page is fetched by seeking past the last row of the previous page
+rather than with OFFSET, so that every page costs an index range scan of
+the page size, however deep it is. Cursors are opaque strings such as
+'20170312094510123456.42' (created_at in UTC, then the primary key).
+Rows without created_at are listed where the database sorts NULLs, first
+on PostgreSQL and last on SQLite, newest primary key first, with cursors
+such as 'null.42'.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+
+CURSOR_DATE_FORMAT = '%Y%m%d%H%M%S%f'
+NULL_CURSOR_DATE = 'null'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk):
+    if created_at is None:
+        return '{0}.{1}'.format(NULL_CURSOR_DATE, pk)
+    return '{0}.{1}'.format(timezone.localtime(created_at, timezone.utc).strftime(CURSOR_DATE_FORMAT), pk)
+
+
+def decode_cursor(cursor):
+    """ returns (created_at, pk) from a cursor, raises InvalidCursor if it is malformed """
+    try:
+        created_at, pk = cursor.split('.')
+        if created_at == NULL_CURSOR_DATE:
+            return None, int(pk)
+        return datetime.strptime(created_at, CURSOR_DATE_FORMAT).replace(tzinfo=timezone.utc), int(pk)
+    except (AttributeError, ValueError):
+        raise InvalidCursor("Invalid page cursor {0!r}".format(cursor))
+
+
+def keyset_page(queryset, cursor=None, size=None):
+    """
+    returns (rows, next_cursor): the `size` newest rows of a values()
+    queryset, which must include 'pk' and 'created_at', older than the
+    cursor, and the cursor of the next page or None on the last one
+    """
+    size = size or settings.BORROWING_PAGE_SIZE
+    queryset = queryset.order_by('-created_at', '-pk')
+    if cursor:
+        queryset = queryset.filter(seek_after(*decode_cursor(cursor), nulls_first=nulls_first(queryset)))
+    rows = list(queryset[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(rows[-1]['created_at'], rows[-1]['pk'])
+
+
+def nulls_first(queryset):
+    """ whether the NULL created_at come first in the newest first order of the database """
+    return connections[queryset.db].features.nulls_order_largest
+
+
+def seek_after(created_at, pk, nulls_first):
+    """ filter of the rows following (created_at, pk) in the newest first order """
+    if created_at is None:
+        undated = Q(created_at__isnull=True, pk__lt=pk)
+        return undated | Q(created_at__isnull=False) if nulls_first else undated
+    # the redundant created_at bound keeps the seek an index range scan
+    dated = Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    return dated if nulls_first else dated | Q(created_at__isnull=True)
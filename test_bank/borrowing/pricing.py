@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+from decimal import Decimal
+
+import numpy as np
+
+
+# Grid nodes, covering the range allowed by the Loan validators
+AMOUNT_NODES = np.array([10000, 25000, 50000, 75000, 100000], dtype=np.float64)
+DURATION_NODES = np.array([1, 30, 90, 180, 365, 730, 1825, 3650, 10000], dtype=np.float64)
+
+# Base AER for each (amount, duration) node: large loans are cheaper, and
+# rates are lowest around one year then rise with the duration
+BASE_RATES = np.array([
+    [0.0900, 0.0850, 0.0800, 0.0775, 0.0750, 0.0775, 0.0825, 0.0900, 0.1000],
+    [0.0800, 0.0750, 0.0700, 0.0675, 0.0650, 0.0675, 0.0725, 0.0800, 0.0900],
+    [0.0700, 0.0650, 0.0600, 0.0575, 0.0550, 0.0575, 0.0625, 0.0700, 0.0800],
+    [0.0650, 0.0600, 0.0550, 0.0525, 0.0500, 0.0525, 0.0575, 0.0650, 0.0750],
+    [0.0600, 0.0550, 0.0500, 0.0475, 0.0450, 0.0475, 0.0525, 0.0600, 0.0700],
+], dtype=np.float64)
+
+# Risk premium of each Business.sector, unknown sectors get the highest one
+SECTOR_SPREADS = (('P', 0.000), ('R', 0.010), ('F', 0.015), ('E', 0.020))
+SECTOR_CODES = np.array([code for code, spread in SECTOR_SPREADS])
+DEFAULT_SECTOR_INDEX = len(SECTOR_SPREADS)
+
+# RATE_GRID[sector, amount, duration], the last sector being the default one
+_spreads = np.array([spread for code, spread in SECTOR_SPREADS] + [max(s for c, s in SECTOR_SPREADS)])
+RATE_GRID = BASE_RATES[np.newaxis, :, :] + _spreads[:, np.newaxis, np.newaxis]
+
+RATE_DECIMALS = 5
+
+
+def _locate(nodes, values):
+    """
+    returns for each value the index of the grid cell it falls in and its
+    relative position within that cell, values outside the grid are clamped
+    """
+    values = np.clip(values, nodes[0], nodes[-1])
+    index = np.clip(np.searchsorted(nodes, values, side='right') - 1, 0, len(nodes) - 2)
+    weight = (values - nodes[index]) / (nodes[index + 1] - nodes[index])
+    return index, weight
+
+
+def sector_indexes(sectors):
+    """ maps an array of Business.sector codes to their row in RATE_GRID """
+    sectors = np.asarray(sectors, dtype=object)
+    indexes = np.full(sectors.shape, DEFAULT_SECTOR_INDEX, dtype=np.intp)
+    for index, code in enumerate(SECTOR_CODES):
+        indexes[sectors == code] = index
+    return indexes
+
+
+def price_loans(amounts, durations, sectors=None):
+    """
+    prices a batch of loans in one pass: amounts, durations (in days) and
+    sectors are sequences of the same length, returns a float array of AER
+    interest rates rounded to RATE_DECIMALS, interpolated bilinearly on
+    RATE_GRID
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    durations = np.asarray(durations, dtype=np.float64)
+    if sectors is None:
+        sectors = np.full(amounts.shape, DEFAULT_SECTOR_INDEX, dtype=np.intp)
+    else:
+        sectors = sector_indexes(sectors)
+
+    i, u = _locate(AMOUNT_NODES, amounts)
+    j, v = _locate(DURATION_NODES, durations)
+    rates = (
+        RATE_GRID[sectors, i, j] * (1 - u) * (1 - v) +
+        RATE_GRID[sectors, i + 1, j] * u * (1 - v) +
+        RATE_GRID[sectors, i, j + 1] * (1 - u) * v +
+        RATE_GRID[sectors, i + 1, j + 1] * u * v
+    )
+    return np.round(rates, RATE_DECIMALS)
+
+
+def to_decimals(rates):
+    """ converts an array returned by price_loans to Decimal, as stored in Loan.interest_rate """
+    return [Decimal('{0:.{1}f}'.format(rate, RATE_DECIMALS)) for rate in rates]
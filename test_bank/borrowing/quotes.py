@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .helper_functions import calculate_interest_rate
+
+
+PENNY = Decimal('0.01')
+# Size of the per-process memo sitting in front of the shared cache
+QUOTE_MEMO_SIZE = 4096
+
+
+@lru_cache(maxsize=None)
+def get_grid_version():
+    """
+    hash of the pricing grid, so that the shared cache entries are dropped
+    whenever it changes. Computed on the first quote rather than when the
+    views are imported, as pricing imports numpy
+    """
+    from .pricing import RATE_GRID
+    return sha1(RATE_GRID.tobytes()).hexdigest()[:8]
+
+
+def get_quote_key(amount, duration, sector):
+    return 'borrowing:quote:{0}:{1}:{2}:{3}'.format(get_grid_version(), amount, duration, sector)
+
+
+def quantize_quote_inputs(amount, duration, sector=None):
+    """ normalizes the inputs so that equivalent requests share the same memo entry """
+    return Decimal(amount).quantize(PENNY, ROUND_HALF_UP), int(duration), sector or ''
+
+
+def compute_quote(amount, duration, sector=None):
+    """
+    prices a loan and summarizes its amortization schedule, values are
+    serialized as strings for JSON
+    """
+    from .schedule import schedule_summary
+    rate = calculate_interest_rate(amount, duration, sector or None)
+    summary = schedule_summary(amount, duration, rate)
+    return {
+        'amount': str(amount),
+        'duration': duration,
+        'interest_rate': str(rate),
+        'installments': summary['installments'],
+        'installment_amount': str(summary['payment']),
+        'last_installment_amount': str(summary['last_payment']),
+        'total_repayable': str(summary['total_repayable']),
+        'total_interest': str(summary['total_interest']),
+    }
+
+
+@lru_cache(maxsize=QUOTE_MEMO_SIZE)
+def _memoized_quote(amount, duration, sector):
+    key = get_quote_key(amount, duration, sector)
+    quote = cache.get(key)
+    if quote is None:
+        quote = compute_quote(amount, duration, sector)
+        cache.set(key, quote, settings.BORROWING_QUOTE_CACHE_TIMEOUT)
+    return quote
+
+
+def get_quote(amount, duration, sector=None):
+    """
+    returns the quote of a loan, memoized in process then in the shared
+    cache, keyed on the quantized inputs
+    """
+    return dict(_memoized_quote(*quantize_quote_inputs(amount, duration, sector)))
+
+
+clear_quote_memo = _memoized_quote.cache_clear
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+from decimal import Decimal
+
+import numpy as np
+
+
+# Loans are repaid by installments every INSTALLMENT_DAYS days, the last
+# one falling on the loan's duration
+INSTALLMENT_DAYS = 30
+
+
+def to_pence(amounts):
+    """ converts amounts in pounds (Decimal, float or str) to an int64 array of pence """
+    return np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64)
+
+
+def to_pounds(pence):
+    """ converts an amount in pence back to Decimal pounds """
+    return Decimal(int(pence)).scaleb(-2)
+
+
+def installment_counts(durations):
+    """ number of installments of loans lasting the given durations in days """
+    durations = np.asarray(durations, dtype=np.int64)
+    return np.maximum(1, -(-durations // INSTALLMENT_DAYS))
+
+
+def period_rates(rates, durations, installments):
+    """ converts AER rates into the compound rate of a single installment period """
+    rates = np.asarray(rates, dtype=np.float64)
+    years = np.asarray(durations, dtype=np.float64) / 365
+    return np.power(1 + rates, years / installments) - 1
+
+
+def annuity_payments(principal, installments, rates):
+    """ constant installment in pence repaying principal (pence) over the periods """
+    principal = principal.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payments = np.where(
+            rates > 0,
+            principal * rates / (1 - np.power(1 + rates, -installments.astype(np.float64))),
+            principal / installments,
+        )
+    return np.floor(payments + 0.5).astype(np.int64)
+
+
+def amortize(amounts, durations, rates, on_installment=None):
+    """
+    computes the amortization of many loans at once, all arithmetic on
+    money being done on integer pence. Interest of each period is rounded
+    half up to the penny and the last installment clears the balance, so
+    the principal parts always add up to the amount borrowed.
+
+    Loans are processed sorted by decreasing number of installments, so
+    that period k only touches the loans still running at that period.
+    on_installment(k, loan_indexes, principal, interest, balance) is called
+    for every period k with the indexes (in the input order) of the loans
+    still running and their int64 pence figures for that period.
+
+    Returns a dict of arrays in the input order: installments, payment (the
+    regular installment), last_payment, total_interest, total_repayable,
+    all amounts in pence.
+    """
+    principal = to_pence(amounts)
+    installments = installment_counts(durations)
+    rates = period_rates(rates, durations, installments)
+
+    order = np.argsort(-installments, kind='mergesort')
+    principal, installments, rates = principal[order], installments[order], rates[order]
+    payments = annuity_payments(principal, installments, rates)
+    balance = principal.copy()
+    total_interest = np.zeros_like(principal)
+    last_payment = np.zeros_like(principal)
+
+    max_installments = int(installments[0]) if len(installments) else 0
+    for k in range(1, max_installments + 1):
+        # installments are sorted in decreasing order, the first `running`
+        # loans are those with at least k installments
+        running = np.searchsorted(-installments, -k, side='right')
+        current = balance[:running]
+        interest = np.floor(current * rates[:running] + 0.5).astype(np.int64)
+        is_last = installments[:running] == k
+        repaid = np.where(is_last, current, np.clip(payments[:running] - interest, 0, current))
+        balance[:running] = current - repaid
+        total_interest[:running] += interest
+        last_payment[:running][is_last] = (repaid + interest)[is_last]
+        if on_installment is not None:
+            on_installment(k, order[:running], repaid, interest, balance[:running])
+
+    result = {
+        'installments': installments,
+        'payment': payments,
+        'last_payment': last_payment,
+        'total_interest': total_interest,
+        'total_repayable': principal + total_interest,
+    }
+    unsorted = {}
+    for name, values in result.items():
+        unsorted[name] = np.empty_like(values)
+        unsorted[name][order] = values
+    return unsorted
+
+
+def amortization_schedule(amount, duration, rate):
+    """
+    returns the schedule of a single loan as a list of dicts, one per
+    installment, with Decimal amounts in pounds
+    """
+    rows = []
+
+    def add_row(k, loan_indexes, principal, interest, balance):
+        rows.append({
+            'number': k,
+            'due_day': min(k * INSTALLMENT_DAYS, duration) if duration else 0,
+            'payment': to_pounds(principal[0] + interest[0]),
+            'principal': to_pounds(principal[0]),
+            'interest': to_pounds(interest[0]),
+            'balance': to_pounds(balance[0]),
+        })
+
+    amortize([amount], [duration], [rate], on_installment=add_row)
+    return rows
+
+
+def schedule_summary(amount, duration, rate):
+    """ totals of the schedule of a single loan, in Decimal pounds """
+    result = amortize([amount], [duration], [rate])
+    return {
+        'installments': int(result['installments'][0]),
+        'payment': to_pounds(result['payment'][0]),
+        'last_payment': to_pounds(result['last_payment'][0]),
+        'total_interest': to_pounds(result['total_interest'][0]),
+        'total_repayable': to_pounds(result['total_repayable'][0]),
+    }
+
+
+def loan_book_summary(queryset, chunk_size=100000):
+    """
+    amortizes every loan of the queryset, fetched by chunks of primary
+    keys, and returns the totals of the book in Decimal pounds along with
+    the number of loans
+    """
+    totals = {'loans': 0, 'principal': 0, 'total_interest': 0, 'total_repayable': 0}
+    last_pk = None
+    queryset = queryset.order_by('pk')
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list('pk', 'amount', 'duration', 'interest_rate')[:chunk_size])
+        if not rows:
+            break
+        pks, amounts, durations, rates = zip(*rows)
+        result = amortize(amounts, durations, rates)
+        totals['loans'] += len(rows)
+        totals['principal'] += int(to_pence(amounts).sum())
+        totals['total_interest'] += int(result['total_interest'].sum())
+        totals['total_repayable'] += int(result['total_repayable'].sum())
+        last_pk = pks[-1]
+    for name in ('principal', 'total_interest', 'total_repayable'):
+        totals[name] = to_pounds(totals[name])
+    return totals
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+import math
+import random
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+from django.db.models import Max
+from django.utils import timezone
+
+import numpy as np
+
+from .models import BorrowerProfile, Business, Loan
+from .pricing import price_loans, to_decimals
+
+
+# Relative frequencies of the generated values, the defaults of the test
+# factories being the most common ones
+SECTOR_WEIGHTS = (('R', 40), ('F', 25), ('P', 25), ('E', 10))
+DURATION_WEIGHTS = ((30, 5), (90, 10), (180, 20), (365, 35), (730, 15), (1095, 10), (1825, 5))
+STATUS_WEIGHTS = (
+    (Loan.PENDING, 20), (Loan.APPROVED, 10), (Loan.PROCESSED, 40),
+    (Loan.REJECTED, 10), (Loan.CANCELLED, 10), (Loan.REPAID, 10),
+)
+# Amounts are log-normal around MEDIAN_AMOUNT, rounded to AMOUNT_STEP and
+# clamped to the bounds of the Loan validators
+MEDIAN_AMOUNT = 30000
+AMOUNT_SIGMA = 0.6
+AMOUNT_STEP = 500
+# Businesses and loans are created over the last HISTORY_DAYS days
+HISTORY_DAYS = 3 * 365
+FIRST_NAMES = ("John", "Jane", "Amir", "Olivia", "Kwame", "Mei", "Lucas", "Priya")
+LAST_NAMES = ("Doe", "Smith", "Khan", "Jones", "Mensah", "Wang", "Martin", "Patel")
+
+SEED_BATCH_SIZE = 1000
+
+
+def weighted(rng, weights, count):
+    values, frequencies = zip(*weights)
+    return rng.choices(values, frequencies, k=count)
+
+
+def random_amount(rng):
+    amount = rng.lognormvariate(math.log(MEDIAN_AMOUNT), AMOUNT_SIGMA)
+    return Decimal(min(max(int(amount) // AMOUNT_STEP * AMOUNT_STEP, 10000), 100000))
+
+
+def next_pks(*models, using=DEFAULT_DB_ALIAS):
+    """ first free primary key of each model, to insert rows with explicit keys """
+    return [(model.objects.using(using).aggregate(last=Max('pk'))['last'] or 0) + 1 for model in models]
+
+
+def reset_sequences(using=DEFAULT_DB_ALIAS):
+    """ moves the sequences past the rows inserted with explicit primary keys """
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), [get_user_model(), Business, Loan])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def bulk_insert(model, rows, batch_size=SEED_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """ bulk_create within the limits of the backend, e.g. 999 variables per query on SQLite """
+    limit = connections[using].ops.bulk_batch_size(model._meta.concrete_fields, rows)
+    model.objects.using(using).bulk_create(rows, batch_size=max(1, min(batch_size, limit)))
+
+
+def build_portfolio(rng, owner_id, loans_per_business, business_pk, loan_pk, now):
+    """
+    returns the unsaved businesses of a borrower, with the given numbers of
+    loans each, and these loans, with primary keys allocated from
+    business_pk and loan_pk. bulk_create bypasses Loan.save, so the loan
+    counters are set on the businesses here.
+    """
+    businesses, loans = [], []
+    for loan_count in loans_per_business:
+        sector = weighted(rng, SECTOR_WEIGHTS, 1)[0]
+        created_at = now - timedelta(days=rng.uniform(0, HISTORY_DAYS))
+        statuses = weighted(rng, STATUS_WEIGHTS, loan_count)
+        businesses.append(Business(
+            pk=business_pk, owner_id=owner_id, name="Business {0}".format(business_pk),
+            address="{0} test street, London".format(rng.randrange(1, 500)),
+            company_number='{0:08d}'.format(rng.randrange(10 ** 8)), sector=sector,
+            created_at=created_at, validated_at=created_at,
+            loan_count=loan_count, active_loan_count=sum(status in Loan.ACTIVE_STATUSES for status in statuses),
+        ))
+        for status, duration in zip(statuses, weighted(rng, DURATION_WEIGHTS, loan_count)):
+            loan_created_at = created_at + (now - created_at) * rng.random()
+            loans.append(Loan(
+                pk=loan_pk, borrower_id=owner_id, business_id=business_pk, amount=random_amount(rng),
+                reason="Seeded loan {0}".format(loan_pk), duration=duration, status=status,
+                created_at=loan_created_at, modified_at=loan_created_at,
+            ))
+            loan_pk += 1
+        business_pk += 1
+    return businesses, loans
+
+
+def price_portfolio(businesses, loans):
+    """ sets the interest rate of the loans built by build_portfolio, in one pass """
+    if not loans:
+        return
+    sectors = {business.pk: business.sector for business in businesses}
+    rates = to_decimals(price_loans(
+        [loan.amount for loan in loans], [loan.duration for loan in loans],
+        [sectors[loan.business_id] for loan in loans],
+    ))
+    for loan, rate in zip(loans, rates):
+        loan.interest_rate = rate
+
+
+def seed_borrower(username, businesses, loans, password_hash=None, rng=None, batch_size=SEED_BATCH_SIZE):
+    """
+    creates a verified borrower owning `businesses` businesses and `loans`
+    loans spread evenly across them, with bulk inserts.
+    Returns the BorrowerProfile.
+    """
+    rng = rng or random.Random(username)
+    user = get_user_model().objects.create(
+        username=username, email='{0}@example.com'.format(username),
+        password=password_hash or make_password('password'),
+        first_name="John", last_name="Doe",
+    )
+    profile = BorrowerProfile.objects.create(
+        user=user, phone_number="+447123567890", has_signed=True, is_verified=True,
+    )
+    if not businesses:
+        return profile
+
+    loans_per_business = [loans // businesses + (i < loans % businesses) for i in range(businesses)]
+    business_pk, loan_pk = next_pks(Business, Loan)
+    owned, owned_loans = build_portfolio(
+        rng, profile.pk, loans_per_business, business_pk, loan_pk, timezone.now()
+    )
+    price_portfolio(owned, owned_loans)
+    bulk_insert(Business, owned, batch_size)
+    bulk_insert(Loan, owned_loans, batch_size)
+    reset_sequences()
+    return profile
+
+
+SeedChunk = namedtuple('SeedChunk', (
+    'seed', 'index', 'user_pk', 'business_pk', 'loan_pk',
+    'businesses_per_user', 'loans_per_business', 'password_hash', 'batch_size',
+))
+
+
+def plan_bank(users, businesses_per_user, loans_per_business, chunk_users, seed=0,
+              password_hash=None, batch_size=SEED_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """
+    splits the generation of `users` borrowers in chunks of `chunk_users`
+    borrowers, each with its own disjoint ranges of primary keys, so that
+    chunks can be inserted concurrently.
+    Borrowers own 1 + Poisson(businesses_per_user - 1) businesses, which
+    get Poisson(loans_per_business) loans each: both arguments are means.
+    """
+    state = np.random.RandomState(seed)
+    business_counts = 1 + state.poisson(max(businesses_per_user - 1, 0), users)
+    loan_counts = state.poisson(loans_per_business, int(business_counts.sum()))
+    user_pk, business_pk, loan_pk = next_pks(get_user_model(), Business, Loan, using=using)
+    password_hash = password_hash or make_password('password')
+
+    chunks = []
+    business_offset = 0
+    for index, start in enumerate(range(0, users, chunk_users)):
+        chunk_businesses = business_counts[start:start + chunk_users].tolist()
+        chunk_loans = loan_counts[business_offset:business_offset + sum(chunk_businesses)].tolist()
+        chunks.append(SeedChunk(
+            seed, index, user_pk + start, business_pk + business_offset, loan_pk,
+            chunk_businesses, chunk_loans, password_hash, batch_size,
+        ))
+        business_offset += sum(chunk_businesses)
+        loan_pk += sum(chunk_loans)
+    return chunks
+
+
+def seed_chunk(chunk, using=DEFAULT_DB_ALIAS):
+    """
+    generates and inserts the borrowers of a chunk planned by plan_bank in
+    a single transaction, returns the numbers of users, businesses and
+    loans created
+    """
+    User = get_user_model()
+    rng = random.Random('{0}:{1}'.format(chunk.seed, chunk.index))
+    now = timezone.now()
+    users, profiles, businesses, loans = [], [], [], []
+    business_pk, loan_pk = chunk.business_pk, chunk.loan_pk
+    loan_counts = iter(chunk.loans_per_business)
+    for user_pk, business_count in enumerate(chunk.businesses_per_user, chunk.user_pk):
+        username = 'seed-{0}'.format(user_pk)
+        users.append(User(
+            pk=user_pk, username=username, email='{0}@example.com'.format(username),
+            password=chunk.password_hash, first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+            date_joined=now - timedelta(days=rng.uniform(0, HISTORY_DAYS)),
+        ))
+        profiles.append(BorrowerProfile(
+            user_id=user_pk, phone_number='+447{0:09d}'.format(rng.randrange(10 ** 9)),
+            has_signed=True, is_verified=True,
+        ))
+        owned, owned_loans = build_portfolio(
+            rng, user_pk, [next(loan_counts) for i in range(business_count)], business_pk, loan_pk, now
+        )
+        businesses.extend(owned)
+        loans.extend(owned_loans)
+        business_pk += len(owned)
+        loan_pk += len(owned_loans)
+    price_portfolio(businesses, loans)
+
+    with transaction.atomic(using=using):
+        for model, rows in ((User, users), (BorrowerProfile, profiles), (Business, businesses), (Loan, loans)):
+            bulk_insert(model, rows, chunk.batch_size, using)
+    return len(users), len(businesses), len(loans)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .dashboard import invalidate_dashboard
+from .models import BorrowerProfile, Business, Loan
+
+
+@receiver(post_save, sender=BorrowerProfile)
+@receiver(post_delete, sender=BorrowerProfile)
+def invalidate_profile_dashboard(sender, instance, **kwargs):
+    invalidate_dashboard(instance.pk)
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+def invalidate_business_dashboard(sender, instance, **kwargs):
+    invalidate_dashboard(instance.owner_id)
+
+
+@receiver(post_save, sender=Loan)
+@receiver(post_delete, sender=Loan)
+def invalidate_loan_dashboard(sender, instance, **kwargs):
+    invalidate_dashboard(instance.borrower_id)
+
+
+@receiver(post_delete, sender=Loan)
+def decrement_loan_counters(sender, instance, using, **kwargs):
+    """
+    post_delete is sent within the deletion transaction, including for
+    cascades, so the counters are kept in step with the rows removed
+    """
+    state = getattr(instance, '_loaded_counter_state', None) or instance.get_counter_state()
+    if state:
+        Business.objects.db_manager(using).adjust_loan_counters(
+            state[0], loans=-1, active_loans=-int(state[1])
+        )
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core import mail
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from test_plus.test import TestCase
+
+from test_bank.outbox.dispatch import drain
+from test_bank.outbox.models import OutboundMessage
+from test_bank.users.tests.factories import UserFactory
+from ..admin import LoanAdmin
+from ..helper_functions import calculate_interest_rate
+from ..models import Business, Loan
+from ..notifications import build_status_messages
+from .factories import BusinessFactory, LoanFactory
+
+
+class AdminTestMixin:
+
+    def setUp(self):
+        admin = UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=admin.username, password='password')
+        self.url = reverse('admin:borrowing_loan_changelist')
+        self.business = BusinessFactory(sector='P')
+        self.loans = [
+            LoanFactory(business=self.business, borrower=self.business.owner, amount=Decimal(amount))
+            for amount in ('20000', '50000', '80000')
+        ]
+
+    def run_action(self, action, loans):
+        return self.client.post(self.url, {
+            'action': action, ACTION_CHECKBOX_NAME: [loan.pk for loan in loans],
+        }, follow=True)
+
+
+class TestLoanAdmin(AdminTestMixin, TestCase):
+
+    def test_changelist_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        for i in range(10):
+            LoanFactory()
+        with self.assertNumQueries(len(context.captured_queries)):
+            self.client.get(self.url)
+
+    def test_date_filter(self):
+        """ the dates are filtered by ranges, not listed from the table """
+        LoanFactory(
+            business=self.business, borrower=self.business.owner, created_at=timezone.now() - timedelta(days=60)
+        )
+        # the link of the "Past 7 days" choice of the DateFieldListFilter
+        today = timezone.localtime(timezone.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        since = today - timedelta(days=7)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {'created_at__gte': str(since)})
+        self.assertEqual(len(response.context['cl'].result_list), 3)
+        self.assertFalse([query for query in context.captured_queries if '_trunc' in query['sql'].lower()])
+
+    @mock.patch.object(LoanAdmin, 'list_per_page', 2)
+    def test_keyset_pagination(self):
+        self.loans += [LoanFactory(business=self.business, borrower=self.business.owner) for i in range(2)]
+        pages = []
+        url = self.url
+        while url:
+            response = self.client.get(url)
+            self.assertContains(response, "about 5 loans")
+            cl = response.context['cl']
+            pages.append([loan.pk for loan in cl.result_list])
+            url = cl.next_cursor and self.url + cl.get_next_page_url()
+        self.assertEqual(pages, [[5, 4], [3, 2], [1]])
+        self.assertNotContains(response, "Next page")
+        self.assertContains(response, "First page")
+
+    @mock.patch.object(LoanAdmin, 'list_per_page', 2)
+    def test_keyset_pagination_fallback(self):
+        # sorting on another column falls back on numbered pages
+        response = self.client.get(self.url, {'o': '4'})
+        self.assertFalse(response.context['cl'].keyset)
+        self.assertEqual(response.context['cl'].paginator.num_pages, 2)
+        response = self.client.get(self.url, {'cursor': 'nope'})
+        self.assertRedirects(response, self.url + '?e=1')
+
+    def test_approve_loans(self):
+        Loan.objects.filter(pk=self.loans[2].pk).update(status=Loan.CANCELLED)
+        response = self.run_action('approve_loans', self.loans)
+        self.assertContains(response, "2 loans approved, 1 skipped as they were not pending")
+        statuses = dict(Loan.objects.values_list('pk', 'status'))
+        self.assertEqual(
+            [statuses[loan.pk] for loan in self.loans], [Loan.APPROVED, Loan.APPROVED, Loan.CANCELLED]
+        )
+        # approved loans are repriced
+        for loan in self.loans[:2]:
+            loan.refresh_from_db()
+            self.assertEqual(loan.interest_rate, calculate_interest_rate(loan.amount, loan.duration, 'P'))
+        self.assertEqual(Loan.objects.get(pk=self.loans[2].pk).interest_rate, Decimal('0.05'))
+
+    def test_reject_and_process_loans(self):
+        self.run_action('reject_loans', self.loans[:1])
+        self.run_action('approve_loans', self.loans[1:])
+        self.run_action('process_loans', self.loans)
+        statuses = dict(Loan.objects.values_list('pk', 'status'))
+        self.assertEqual(
+            [statuses[loan.pk] for loan in self.loans], [Loan.REJECTED, Loan.PROCESSED, Loan.PROCESSED]
+        )
+        business = Business.objects.get(pk=self.business.pk)
+        self.assertEqual((business.loan_count, business.active_loan_count), (3, 3))
+
+    def test_status_messages(self):
+        other = LoanFactory()
+        rows = [(loan.pk, loan.business_id, loan.borrower_id) for loan in self.loans + [other]]
+        messages = build_status_messages(rows, Loan.APPROVED)
+        self.assertEqual(len(messages), 2)
+        subjects = {message.recipient: message.subject for message in messages}
+        self.assertEqual(subjects[self.business.owner.user.email], "Your loan requests have been approved")
+        self.assertEqual(subjects[other.borrower.user.email], "Your loan request has been approved")
+
+    def test_notifications_queued(self):
+        self.run_action('approve_loans', self.loans)
+        # queued in the outbox within the transaction of the change, sent by the worker
+        self.assertEqual(OutboundMessage.objects.filter(status=OutboundMessage.PENDING).count(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(drain(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.business.owner.user.email])
+        for loan in self.loans:
+            self.assertIn("Loan #{0}".format(loan.pk), mail.outbox[0].body)
@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.db import connection
+from test_plus.test import TestCase
+
+from test_bank.users.tests.factories import UserFactory
+from .factories import BorrowerProfileFactory, BusinessFactory, LoanFactory
+from ..models import Loan
+
+
+class BaseApiTestCase(TestCase):
+
+    def setUp(self):
+        UserFactory.reset_sequence()
+        cache.clear()
+        self.user = UserFactory()
+        self.borrower = BorrowerProfileFactory(user=self.user)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def get_json(self, url_name, data=None, status=200, **kwargs):
+        response = self.client.get(reverse('borrowing:api_v1:' + url_name, kwargs=kwargs), data or {})
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+
+class TestApiViews(BaseApiTestCase):
+
+    def test_authentication_required(self):
+        response = Client().get(reverse('borrowing:api_v1:loan_list'))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('errors', response.json())
+
+    def test_get_only(self):
+        response = self.client.post(reverse('borrowing:api_v1:loan_list'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_borrower(self):
+        borrower = self.get_json('borrower')
+        self.assertEqual(borrower['id'], self.user.pk)
+        self.assertEqual(borrower['username'], self.user.username)
+        self.assertEqual(borrower['phone_number'], '+447123567890')
+        self.assertEqual(self.get_json('borrower', {'fields': 'username'}), {'username': self.user.username})
+        self.borrower.delete()
+        self.get_json('borrower', status=404)
+
+    def test_sparse_fields(self):
+        loan = LoanFactory(borrower=self.borrower, business__owner=self.borrower)
+        loans = self.get_json('loan_list', {'fields': 'amount,status_display'})
+        self.assertEqual(loans, {'results': [{'amount': '20000.00', 'status_display': 'Pending'}], 'next': None})
+        errors = self.get_json('loan_list', {'fields': 'amount,owner'}, status=400)['errors']
+        self.assertEqual(list(errors), ['fields'])
+        loan_detail = self.get_json('loan_detail', {'fields': 'id,interest_rate'}, pk=loan.pk)
+        self.assertEqual(loan_detail, {'id': loan.pk, 'interest_rate': '0.05000'})
+
+    def test_include_parent(self):
+        business = BusinessFactory(owner=self.borrower, name="Parent")
+        LoanFactory.create_batch(3, borrower=self.borrower, business=business)
+        with CaptureQueriesContext(connection) as context:
+            loans = self.get_json('loan_list', {'fields': 'id', 'include': 'business', 'fields[business]': 'name'})
+        self.assertEqual([loan['business'] for loan in loans['results']], [{'name': "Parent"}] * 3)
+        # user and the loans joined with their business, the session is cached
+        self.assertEqual(len(context.captured_queries), 2)
+        self.get_json('loan_list', {'include': 'borrower'}, status=400)
+
+    def test_business_loans(self):
+        """ the loans of a business are listed by pages, they cannot be included in the businesses """
+        businesses = BusinessFactory.create_batch(2, owner=self.borrower)
+        loans = [LoanFactory(borrower=self.borrower, business=business) for business in businesses]
+        with CaptureQueriesContext(connection) as context:
+            page = self.get_json('loan_list', {'fields': 'id', 'business': businesses[0].pk})
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertEqual(page, {'results': [{'id': loans[0].pk}], 'next': None})
+        self.get_json('business_list', {'include': 'loans'}, status=400)
+        self.get_json('business_detail', {'include': 'loans'}, pk=businesses[0].pk, status=400)
+        self.get_json('loan_list', {'business': 'nope'}, status=400)
+
+    def test_only_own_data(self):
+        other_loan = LoanFactory()
+        self.get_json('loan_detail', pk=other_loan.pk, status=404)
+        self.get_json('business_detail', pk=other_loan.business_id, status=404)
+        self.assertEqual(self.get_json('loan_list')['results'], [])
+        self.assertEqual(self.get_json('business_list')['results'], [])
+
+    @override_settings(BORROWING_PAGE_SIZE=2)
+    def test_pages(self):
+        business = BusinessFactory(owner=self.borrower)
+        pending = [LoanFactory(borrower=self.borrower, business=business) for i in range(3)]
+        LoanFactory(borrower=self.borrower, business=business, status=Loan.REPAID)
+        page = self.get_json('loan_list', {'fields': 'id', 'status': Loan.PENDING})
+        self.assertEqual(page['results'], [{'id': pending[2].pk}, {'id': pending[1].pk}])
+        page = self.get_json('loan_list', {'fields': 'id', 'status': Loan.PENDING, 'after': page['next']})
+        self.assertEqual(page, {'results': [{'id': pending[0].pk}], 'next': None})
+        self.get_json('loan_list', {'after': 'nope'}, status=400)
+        self.get_json('business_list', {'after': 'nope'}, status=400)
+
+    def test_dashboard(self):
+        business = BusinessFactory(owner=self.borrower)
+        loan = LoanFactory(borrower=self.borrower, business=business)
+        with CaptureQueriesContext(connection) as context:
+            dashboard = self.get_json('dashboard', {'fields[loans]': 'id,amount', 'fields[businesses]': 'name'})
+        self.assertEqual(len(context.captured_queries), 4)
+        self.assertEqual(dashboard['borrower']['id'], self.user.pk)
+        self.assertEqual(dashboard['businesses'], {'results': [{'name': business.name}], 'next': None})
+        self.assertEqual(dashboard['loans'], {'results': [{'id': loan.pk, 'amount': '20000.00'}], 'next': None})
+        errors = self.get_json('dashboard', {'fields[loans]': 'nope'}, status=400)['errors']
+        self.assertEqual(list(errors), ['fields[loans]'])
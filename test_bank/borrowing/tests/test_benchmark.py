@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from test_plus.test import TestCase
+
+from ..benchmark import percentile, run_benchmark, compare_results
+from ..models import Business, Loan
+from ..seeding import seed_borrower
+
+
+class TestSeeding(TestCase):
+
+    def test_seed_borrower(self):
+        profile = seed_borrower('seeded', 3, 7)
+        self.assertTrue(profile.is_verified)
+        self.assertEqual(Loan.objects.filter(borrower=profile).count(), 7)
+        # bulk inserted loans are accounted for in the counters
+        counters = Business.objects.filter(owner=profile).with_actual_loan_counts().values_list(
+            'loan_count', 'active_loan_count', 'actual_loan_count', 'actual_active_loan_count'
+        )
+        self.assertEqual(sorted(loans for loans, active, actual, actual_active in counters), [2, 2, 3])
+        for loans, active_loans, actual_loans, actual_active_loans in counters:
+            self.assertEqual((loans, active_loans), (actual_loans, actual_active_loans))
+
+
+class TestBenchmark(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3], 95), 3)
+
+    def test_run_benchmark(self):
+        results = run_benchmark(sizes=[2], repeat=2)
+        views = {result['view']: result for result in results}
+        self.assertEqual(set(views), {
+            'home', 'home_cached', 'create_loan', 'loan_list', 'api_dashboard', 'loan_detail', 'update_business',
+            'admin_loans', 'admin_businesses', 'admin_borrowers', 'admin_users',
+        })
+        for result in results:
+            self.assertEqual(result['status'], 200, result['view'])
+            self.assertEqual(set(result['latency_ms']), {'p50', 'p95', 'p99', 'mean'})
+        self.assertLess(views['home_cached']['queries'], views['home']['queries'])
+        # sessions are cached and only saved when they change
+        for name in ('home', 'home_cached', 'loan_list', 'api_dashboard', 'loan_detail'):
+            self.assertEqual(views[name]['writes'], 0, name)
+            self.assertEqual(views[name]['session_queries'], 0, name)
+        self.assertEqual(compare_results(results, results), [])
+        slower = [dict(result, queries=result['queries'] + 1) for result in results[:1]]
+        self.assertEqual(len(compare_results(results, slower)), 1)
+        writing = [dict(result, writes=result['writes'] + 1) for result in results[:1]]
+        self.assertEqual(len(compare_results(results, writing)), 1)
+
+
+class TestBenchmarkReplicas(TestCase):
+    multi_db = True
+
+    @override_settings(REPLICA_DATABASES=['replica'])
+    def test_reads_seeded_database(self):
+        """ the replicas are not seeded, the pages and changelists must not read from them """
+        cache.clear()
+        with CaptureQueriesContext(connections['replica']) as context:
+            results = run_benchmark(sizes=[2], repeat=1)
+        self.assertEqual(context.captured_queries, [])
+        self.assertEqual({result['status'] for result in results}, {200})
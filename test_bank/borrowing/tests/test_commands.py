@@ -0,0 +1,50 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from test_plus.test import TestCase
+
+from test_bank.users.tests.factories import UserFactory
+from ..models import BorrowerProfile, Business, Loan
+from ..seeding import plan_bank
+from .factories import BusinessFactory, LoanFactory
+
+
+class TestLoanCountersCommand(TestCase):
+
+    def setUp(self):
+        self.business = BusinessFactory()
+        LoanFactory(business=self.business, borrower=self.business.owner)
+        # simulates a drift, e.g. after a raw SQL import
+        Business.objects.filter(pk=self.business.pk).update(loan_count=5, active_loan_count=0)
+
+    def test_check_reports_drift(self):
+        with self.assertRaises(CommandError):
+            call_command('loan_counters', stdout=StringIO())
+
+    def test_rebuild(self):
+        call_command('loan_counters', rebuild=True, stdout=StringIO())
+        self.business.refresh_from_db()
+        self.assertEqual((self.business.loan_count, self.business.active_loan_count), (1, 1))
+        call_command('loan_counters', stdout=StringIO())
+
+
+class TestSeedBankCommand(TestCase):
+
+    def test_seed_bank(self):
+        UserFactory()
+        call_command('seed_bank', users=20, chunk_users=7, stdout=StringIO())
+        self.assertEqual(BorrowerProfile.objects.count(), 20)
+        self.assertEqual(Loan.objects.count(), sum(Business.objects.values_list('loan_count', flat=True)))
+        call_command('loan_counters', stdout=StringIO())
+        # sequences are moved past the generated rows
+        LoanFactory()
+
+    def test_plan_is_disjoint(self):
+        chunks = plan_bank(25, 2, 3, chunk_users=10, password_hash='hash')
+        self.assertEqual([len(chunk.businesses_per_user) for chunk in chunks], [10, 10, 5])
+        for chunk, following in zip(chunks, chunks[1:]):
+            self.assertEqual(chunk.user_pk + len(chunk.businesses_per_user), following.user_pk)
+            self.assertEqual(chunk.business_pk + len(chunk.loans_per_business), following.business_pk)
+            self.assertEqual(chunk.loan_pk + sum(chunk.loans_per_business), following.loan_pk)
+        self.assertEqual(plan_bank(25, 2, 3, chunk_users=10, password_hash='hash'), chunks)
@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from test_plus.test import TestCase
+
+from ..dashboard import get_dashboard, get_dashboard_key
+from .factories import BorrowerProfileFactory, BusinessFactory, LoanFactory
+
+
+class TestDashboard(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.borrower = BorrowerProfileFactory()
+        self.business = BusinessFactory(owner=self.borrower)
+        self.loan = LoanFactory(borrower=self.borrower, business=self.business)
+
+    def test_summary(self):
+        """ the summary lists the businesses with their loan count and the loans """
+        dashboard = get_dashboard(self.borrower.pk)
+        self.assertEqual(dashboard['businesses'][0]['loan_nb'], 1)
+        self.assertEqual(dashboard['loans'][0]['pk'], self.loan.pk)
+        self.assertEqual(dashboard['loans'][0]['status_display'], 'Pending')
+
+    def test_warm_hit_no_query(self):
+        get_dashboard(self.borrower.pk)
+        with self.assertNumQueries(0):
+            get_dashboard(self.borrower.pk)
+
+    def test_invalidation_on_save_and_delete(self):
+        """ saving or deleting a related object drops the cached summary """
+        key = get_dashboard_key(self.borrower.pk)
+        for instance in (self.loan, self.business, self.borrower):
+            get_dashboard(self.borrower.pk)
+            instance.save()
+            self.assertIsNone(cache.get(key))
+        get_dashboard(self.borrower.pk)
+        self.loan.delete()
+        self.assertIsNone(cache.get(key))
@@ -0,0 +1,59 @@
+import csv
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from test_plus.test import TestCase
+
+from ..exports import iter_loan_rows, iter_loan_export, LOAN_EXPORT_COLUMNS
+from ..models import Loan
+from .factories import LoanFactory
+
+
+class TestLoanExport(TestCase):
+
+    def setUp(self):
+        self.loans = [LoanFactory() for _ in range(5)]
+
+    def test_rows_chunked(self):
+        """ chunking on the primary key neither skips nor repeats loans """
+        rows = list(iter_loan_rows(Loan.objects.all(), chunk_size=2))
+        self.assertEqual([row[0] for row in rows], [loan.pk for loan in self.loans])
+        self.assertEqual(len(rows[0]), len(LOAN_EXPORT_COLUMNS))
+
+    def test_csv(self):
+        lines = list(iter_loan_export(Loan.objects.filter(pk=self.loans[0].pk), 'csv'))
+        header, row = list(csv.reader(lines))
+        self.assertEqual(header[0], 'id')
+        record = dict(zip(header, row))
+        self.assertEqual(record['amount'], '20000.00')
+        self.assertEqual(record['business_name'], 'Test Business')
+        self.assertEqual(record['borrower_username'], self.loans[0].borrower.user.username)
+
+    def test_jsonl(self):
+        lines = list(iter_loan_export(Loan.objects.all(), 'jsonl', chunk_size=3))
+        self.assertEqual(len(lines), 5)
+        record = json.loads(lines[0])
+        self.assertEqual(record['id'], self.loans[0].pk)
+        self.assertEqual(record['interest_rate'], '0.05000')
+        self.assertEqual(record['borrower_phone_number'], '+447123567890')
+
+    def test_admin_action(self):
+        admin_user = self.make_user('root')
+        admin_user.is_staff = admin_user.is_superuser = True
+        admin_user.save()
+        self.client.login(username='root', password='password')
+        response = self.client.post(reverse('admin:borrowing_loan_changelist'), {
+            'action': 'export_as_csv',
+            '_selected_action': [self.loans[1].pk, self.loans[3].pk],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('export_loans', format='jsonl', status=[0], stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
@@ -1,6 +1,6 @@
 from test_plus.test import TestCase
 from ..forms import BorrowerProfileForm, UserUpdateForm, UserBorrowerForm, LoanForm
-from ..helper_functions import get_verification_code
+from ..otp import issue_code
 from test_bank.borrowing.tests.factories import BusinessFactory,\
     BorrowerProfileFactory
 from test_bank.borrowing.helper_functions import calculate_interest_rate
@@ -13,7 +13,7 @@ class TestBorrowerProfileForm(TestCase):
         self.user = self.make_user()
         self.valid_data = {
             'phone_number': '+447123456789',
-            'code': get_verification_code("+447123456789"),
+            'code': issue_code("+447123456789"),
             'has_signed': 'on',
         }
 
@@ -132,7 +132,7 @@ class TestUserBorrowerForm(TestCase):
         user = self.make_user()
         valid_data = {
             'phone_number': '+447123456789',
-            'code': get_verification_code("+447123456789"),
+            'code': issue_code("+447123456789"),
             'has_signed': 'on',
             'first_name': 'John',
             'last_name': 'Doe',
@@ -149,7 +149,7 @@ class TestLoanForm(TestCase):
             'business': self.business.pk,
             'reason': "Test",
             'duration': 5,
-            'interest_rate': '0.05',
+            'interest_rate': calculate_interest_rate(15000, 5, self.business.sector),
             'amount': 15000
         }
 
@@ -193,7 +193,8 @@ class TestLoanForm(TestCase):
         data = self.valid_data
         data['interest_rate'] = Decimal('0.1') + calculate_interest_rate(
             amount=data['amount'],
-            duration=data['duration']
+            duration=data['duration'],
+            sector=self.business.sector,
         )
         form = LoanForm(data=data)
         self.assertFalse(form.is_valid())
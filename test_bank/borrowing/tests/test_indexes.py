@@ -0,0 +1,85 @@
+import re
+
+from django.db import connection, transaction
+from test_plus.test import TestCase
+
+from ..models import BorrowerProfile, Business, Loan
+from .factories import LoanFactory
+
+
+def explain(queryset):
+    """ returns the query plan of a queryset, one line per plan node """
+    sql, params = queryset.query.sql_with_params()
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # tables are tiny in tests: forbid sequential scans so the planner
+            # only falls back on them if no index can serve the query
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql, params)
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    """ plan lines reading a borrowing table without any index """
+    if connection.vendor == 'postgresql':
+        return [line for line in plan if 'Seq Scan on borrowing_' in line]
+    return [
+        line for line in plan
+        if re.match(r'SCAN (TABLE )?borrowing_', line) and 'USING' not in line
+    ]
+
+
+class TestAccessPathIndexes(TestCase):
+    """
+    every query issued by the borrower views and the admin triage
+    should be served by an index
+    """
+
+    def setUp(self):
+        self.loan = LoanFactory()
+        self.borrower = self.loan.borrower
+
+    def assertIndexed(self, queryset):
+        plan = explain(queryset)
+        self.assertEqual(full_scans(plan), [], "\n".join(plan))
+
+    def test_home(self):
+        self.assertIndexed(Business.objects.filter(owner_id=self.borrower.pk))
+        self.assertIndexed(Loan.objects.filter(borrower_id=self.borrower.pk))
+
+    def test_loan_detail_and_cancel(self):
+        self.assertIndexed(Loan.objects.filter(borrower=self.borrower, pk=self.loan.pk))
+        self.assertIndexed(Loan.objects.filter(borrower__user=self.borrower.user, pk=self.loan.pk))
+
+    def test_borrower_status(self):
+        self.assertIndexed(Loan.objects.filter(borrower=self.borrower, status=Loan.PENDING))
+
+    def test_business_loans(self):
+        self.assertIndexed(Loan.objects.filter(business=self.loan.business))
+
+    def test_pending_triage(self):
+        self.assertIndexed(Loan.objects.filter(status=Loan.PENDING).order_by('created_at'))
+
+    def test_phone_number_lookup(self):
+        self.assertIndexed(BorrowerProfile.objects.filter(phone_number='+447123567890'))
+
+    def test_admin_filters(self):
+        self.assertIndexed(Loan.objects.filter(currency='GBP'))
+        self.assertIndexed(Loan.objects.filter(created_at__gte=self.loan.created_at))
+        self.assertIndexed(Business.objects.filter(sector='R'))
+        self.assertIndexed(Business.objects.filter(created_at__gte=self.loan.business.created_at))
+
+    def test_borrower_listings(self):
+        created_at = self.loan.created_at
+        seek = {'created_at__lte': created_at}
+        self.assertIndexed(
+            Loan.objects.filter(borrower=self.borrower, **seek).order_by('-created_at', '-pk')[:21]
+        )
+        self.assertIndexed(
+            Loan.objects.filter(borrower=self.borrower, status__in=[0, 1], **seek).order_by('-created_at')[:21]
+        )
+        self.assertIndexed(
+            Business.objects.filter(owner=self.borrower, **seek).order_by('-created_at', '-pk')[:21]
+        )
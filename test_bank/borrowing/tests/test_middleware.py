@@ -0,0 +1,89 @@
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from test_plus.test import TestCase
+
+from test_bank.contrib.sessions import TOUCHED_KEY
+from test_bank.users.tests.factories import UserFactory
+from ..middleware import fingerprint, QueryBudgetExceeded
+from .factories import BorrowerProfileFactory, LoanFactory
+
+
+class TestQueryBudgetMiddleware(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.loan = LoanFactory(borrower=BorrowerProfileFactory(user=self.user))
+        self.url = reverse('borrowing:loan_detail', kwargs={'pk': self.loan.pk})
+        self.client = Client()
+        self.client.login(username=self.user.username, password='password')
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 12 AND name = 'it''s' AND rate = 0.05"),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND rate = ?",
+        )
+
+    def test_debug_headers(self):
+        with self.settings(DEBUG=True):
+            response = self.client.get(self.url)
+        # user, borrower profile, loan joined with its business, the session is cached
+        self.assertEqual(response['X-Query-Count'], '3')
+        self.assertEqual(response['X-Query-Duplicates'], '0')
+        self.assertIn('X-Render-Time-Ms', response)
+
+    def test_render_time(self):
+        """ templates rendered by function views are timed too """
+        with self.settings(DEBUG=True):
+            for url in (self.url, reverse('borrowing:home')):
+                response = self.client.get(url)
+                self.assertGreater(float(response['X-Render-Time-Ms']), 0)
+                self.assertLess(float(response['X-Render-Time-Ms']), float(response['X-View-Time-Ms']))
+
+    def test_no_headers_in_production(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('X-Query-Count', response)
+
+    def test_budget_exceeded(self):
+        budgets = {'borrowing:loan_detail': {'queries': 1}}
+        with self.settings(QUERY_BUDGETS=budgets, QUERY_BUDGET_ACTION='raise'):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(self.url)
+        with self.settings(QUERY_BUDGETS=budgets, QUERY_BUDGET_ACTION='warn'):
+            with self.assertLogs('test_bank.querybudget', level='WARNING'):
+                self.client.get(self.url)
+
+
+class TestSessionTouchMiddleware(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.loan = LoanFactory(borrower=BorrowerProfileFactory(user=self.user))
+        self.url = reverse('borrowing:loan_detail', kwargs={'pk': self.loan.pk})
+        self.client = Client()
+        self.client.login(username=self.user.username, password='password')
+
+    def get_session_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in context.captured_queries if 'django_session' in query['sql']]
+
+    def test_login_touches(self):
+        self.assertIn(TOUCHED_KEY, self.client.session)
+        self.assertEqual(self.get_session_queries(), [])
+
+    def test_touch_after_interval(self):
+        touched_at = self.client.session[TOUCHED_KEY]
+        # saving the session is outside of the query budgets of the views, once an hour
+        with self.settings(SESSION_TOUCH_INTERVAL=0, QUERY_BUDGETS={}):
+            self.assertTrue(self.get_session_queries())
+        self.assertGreaterEqual(self.client.session[TOUCHED_KEY], touched_at)
+        self.assertEqual(self.get_session_queries(), [])
+
+    def test_anonymous(self):
+        self.client.logout()
+        response = self.client.get(reverse('about'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('sessionid', response.cookies)
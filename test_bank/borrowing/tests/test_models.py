@@ -39,3 +39,42 @@ class TestLoan(TestCase):
             self.loan.__str__(),
             'GBP 20000 for Test Business -- 01234567'
         )
+
+
+class TestBusinessLoanCounters(TestCase):
+    """ the loan counters of Business follow the loans created, edited and deleted """
+
+    def setUp(self):
+        self.business = BusinessFactory()
+
+    def assertCounters(self, business, loans, active_loans):
+        business.refresh_from_db()
+        self.assertEqual((business.loan_count, business.active_loan_count), (loans, active_loans))
+
+    def test_creation(self):
+        LoanFactory(business=self.business, borrower=self.business.owner)
+        LoanFactory(business=self.business, borrower=self.business.owner, status=Loan.CANCELLED)
+        self.assertCounters(self.business, 2, 1)
+
+    def test_cancellation(self):
+        loan = LoanFactory(business=self.business, borrower=self.business.owner)
+        loan = Loan.objects.get(pk=loan.pk)
+        loan.status = Loan.CANCELLED
+        loan.save()
+        self.assertCounters(self.business, 1, 0)
+        # saving again without change does not shift the counters
+        loan.save()
+        self.assertCounters(self.business, 1, 0)
+
+    def test_business_change(self):
+        other_business = BusinessFactory(owner=self.business.owner)
+        loan = LoanFactory(business=self.business, borrower=self.business.owner)
+        loan.business = other_business
+        loan.save()
+        self.assertCounters(self.business, 0, 0)
+        self.assertCounters(other_business, 1, 1)
+
+    def test_deletion(self):
+        loan = LoanFactory(business=self.business, borrower=self.business.owner)
+        Loan.objects.filter(pk=loan.pk).delete()
+        self.assertCounters(self.business, 0, 0)
@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.test.utils import override_settings
+from test_plus.test import TestCase
+
+from test_bank.outbox.models import OutboundMessage
+from .. import otp
+
+
+class TestPhoneCodes(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.number = '+447123456789'
+
+    def test_check_code(self):
+        code = otp.issue_code(self.number)
+        self.assertEqual(otp.check_code(self.number, 'ABCDE'), otp.WRONG)
+        self.assertEqual(otp.check_code(self.number, code), otp.VALID)
+        self.assertEqual(otp.check_code('+447123456788', code), otp.EXPIRED)
+
+    def test_new_code_revokes_previous(self):
+        codes = {otp.issue_code(self.number) for i in range(5)}
+        self.assertGreater(len(codes), 1)
+        code = otp.issue_code(self.number)
+        for previous in codes - {code}:
+            self.assertEqual(otp.check_code(self.number, previous), otp.WRONG)
+
+    def test_expiry(self):
+        code = otp.issue_code(self.number)
+        cache.delete(otp.CODE_KEY.format(self.number))
+        self.assertEqual(otp.check_code(self.number, code), otp.EXPIRED)
+
+    @override_settings(PHONE_CODE_MAX_ATTEMPTS=3)
+    def test_attempts(self):
+        code = otp.issue_code(self.number)
+        for i in range(3):
+            self.assertEqual(otp.check_code(self.number, 'ABCDE'), otp.WRONG)
+        self.assertEqual(otp.check_code(self.number, code), otp.EXHAUSTED)
+        self.assertEqual(otp.check_code(self.number, code), otp.EXPIRED)
+
+    @override_settings(PHONE_CODE_RATE_LIMITS={'user': (10, 60), 'ip': (10, 60), 'phone': (2, 60)})
+    def test_send_code(self):
+        otp.send_code(self.number, 1, '127.0.0.1')
+        otp.send_code(self.number, 2, '127.0.0.2')
+        with self.assertRaises(otp.RateLimited) as context:
+            otp.send_code(self.number, 3, '127.0.0.3')
+        self.assertEqual(context.exception.scope, 'phone')
+        otp.send_code('+447123456788', 3, '127.0.0.3')
+        # the codes are queued in the outbox, only the last one sent to a number is valid
+        messages = OutboundMessage.objects.filter(channel=OutboundMessage.SMS).order_by('pk')
+        self.assertEqual([message.recipient for message in messages], [self.number] * 2 + ['+447123456788'])
+        code = messages[1].body[-5:]
+        self.assertEqual(otp.check_code(self.number, code), otp.VALID)
+
+
+class TestSlidingWindow(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hit(self):
+        hits = [otp.hit('test', 'a', 3, 60, now=600 + i) for i in range(4)]
+        self.assertEqual(hits, [False, False, False, True])
+        self.assertFalse(otp.hit('test', 'b', 3, 60, now=603))
+
+    def test_previous_window(self):
+        for i in range(3):
+            otp.hit('test', 'a', 3, 60, now=650)
+        # three quarters of the previous window are still within the last minute
+        self.assertTrue(otp.hit('test', 'a', 3, 60, now=675))
+        # one quarter only: 0.75 + 2 hits
+        self.assertFalse(otp.hit('test', 'a', 3, 60, now=705))
+        self.assertFalse(otp.hit('test', 'a', 3, 60, now=780))
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from test_plus.test import TestCase
+
+from ..models import Loan
+from ..pagination import encode_cursor, decode_cursor, keyset_page, InvalidCursor
+from .factories import LoanFactory
+
+
+class TestKeysetPagination(TestCase):
+
+    def test_cursor(self):
+        created_at = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, 42))
+        self.assertEqual(decode_cursor(encode_cursor(None, 42)), (None, 42))
+        for cursor in ('', '42', 'abc.42', '20170312094510123456.x', None):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_pages(self):
+        """ rows sharing the same created_at are neither skipped nor repeated """
+        now = timezone.now()
+        first = LoanFactory()
+        for days in (0, 0, 0, 1, 2):
+            LoanFactory(borrower=first.borrower, business=first.business, created_at=now - timedelta(days=days))
+        Loan.objects.filter(pk=first.pk).update(created_at=now - timedelta(days=1))
+        expected = list(
+            Loan.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)
+        )
+        pages, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(Loan.objects.values('pk', 'created_at'), cursor, size=2)
+            pages.append([row['pk'] for row in rows])
+            if cursor is None:
+                break
+        self.assertEqual([len(page) for page in pages], [2, 2, 2])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_pages_without_created_at(self):
+        """ rows without created_at are listed once, where the database sorts the NULLs """
+        now = timezone.now()
+        first = LoanFactory()
+        for days in (None, 0, None, 1, None):
+            LoanFactory(
+                borrower=first.borrower, business=first.business,
+                created_at=None if days is None else now - timedelta(days=days),
+            )
+        expected = list(
+            Loan.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)
+        )
+        pages, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(Loan.objects.values('pk', 'created_at'), cursor, size=2)
+            pages.append([row['pk'] for row in rows])
+            if cursor is None:
+                break
+        self.assertEqual([len(page) for page in pages], [2, 2, 2])
+        self.assertEqual(sum(pages, []), expected)
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+import numpy as np
+from test_plus.test import TestCase
+
+from ..helper_functions import calculate_interest_rate
+from ..pricing import price_loans, to_decimals, BASE_RATES
+
+
+class TestPriceLoans(TestCase):
+    """ test case for the vectorized pricing engine """
+
+    def test_grid_nodes(self):
+        """ on a grid node the rate is the base rate plus the sector spread """
+        rates = price_loans([10000, 100000], [365, 365], ['P', 'R'])
+        self.assertEqual(list(rates), [BASE_RATES[0, 4], round(BASE_RATES[4, 4] + 0.01, 5)])
+
+    def test_interpolation(self):
+        """ halfway between two amount nodes, the rate is halfway between their rates """
+        rate = price_loans([17500], [365], ['P'])[0]
+        self.assertAlmostEqual(rate, (BASE_RATES[0, 4] + BASE_RATES[1, 4]) / 2)
+
+    def test_monotonic_in_amount(self):
+        amounts = np.linspace(10000, 100000, 50)
+        rates = price_loans(amounts, np.full(50, 365), np.full(50, 'R', dtype=object))
+        self.assertTrue(np.all(np.diff(rates) <= 0))
+
+    def test_clamped_outside_grid(self):
+        """ values outside the grid are priced as the closest node """
+        self.assertEqual(
+            list(price_loans([5000, 200000], [0, 20000], ['F', 'F'])),
+            list(price_loans([10000, 100000], [1, 10000], ['F', 'F'])),
+        )
+
+    def test_unknown_sector_gets_highest_spread(self):
+        rates = price_loans([50000] * 5, [365] * 5, ['P', 'R', 'F', 'E', None])
+        self.assertEqual(rates[4], rates.max())
+
+    def test_batch(self):
+        """ a batch of thousands of loans is priced in one call """
+        size = 10000
+        rates = price_loans(
+            np.random.uniform(10000, 100000, size),
+            np.random.randint(1, 10001, size),
+            np.random.choice(['R', 'P', 'F', 'E'], size),
+        )
+        self.assertEqual(rates.shape, (size, ))
+        self.assertTrue(np.all((rates > 0) & (rates < 1)))
+
+
+class TestCalculateInterestRate(TestCase):
+
+    def test_matches_batch(self):
+        """ the scalar helper returns the Decimal equivalent of price_loans """
+        self.assertEqual(
+            calculate_interest_rate(Decimal('15000'), 5, 'R'),
+            to_decimals(price_loans([15000], [5], ['R']))[0],
+        )
+
+    def test_decimal_places(self):
+        rate = calculate_interest_rate(Decimal('23456.78'), 1234, 'E')
+        self.assertEqual(rate.as_tuple().exponent, -5)
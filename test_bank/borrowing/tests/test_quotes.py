@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from test_plus.test import TestCase
+
+from ..helper_functions import calculate_interest_rate
+from ..quotes import get_quote, clear_quote_memo, compute_quote, quantize_quote_inputs, get_quote_key
+
+
+class TestGetQuote(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        clear_quote_memo()
+
+    def test_quote(self):
+        quote = get_quote(Decimal('20000'), 30, 'R')
+        self.assertEqual(quote['interest_rate'], str(calculate_interest_rate(20000, 30, 'R')))
+        self.assertEqual(quote['installments'], 1)
+        self.assertEqual(
+            Decimal(quote['total_repayable']) - Decimal('20000'), Decimal(quote['total_interest'])
+        )
+
+    def test_quantized_inputs_share_entry(self):
+        self.assertEqual(
+            quantize_quote_inputs('15000', 10.0, None), quantize_quote_inputs(Decimal('15000.001'), 10, '')
+        )
+
+    def test_stored_in_shared_cache(self):
+        """ quotes computed by one process are available to the others """
+        get_quote(15000, 90, 'P')
+        self.assertEqual(
+            cache.get(get_quote_key(Decimal('15000.00'), 90, 'P')),
+            compute_quote(Decimal('15000.00'), 90, 'P'),
+        )
+
+    def test_memo_returns_copies(self):
+        quote = get_quote(15000, 90, 'P')
+        quote['interest_rate'] = 'tampered'
+        self.assertNotEqual(get_quote(15000, 90, 'P')['interest_rate'], 'tampered')
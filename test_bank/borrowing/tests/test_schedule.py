@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import numpy as np
+from test_plus.test import TestCase
+
+from ..models import Loan
+from ..schedule import amortize, amortization_schedule, schedule_summary, loan_book_summary, to_pence
+from .factories import LoanFactory
+
+
+class TestAmortizationSchedule(TestCase):
+
+    def test_one_year_loan(self):
+        rows = amortization_schedule(Decimal('20000'), 365, Decimal('0.05'))
+        self.assertEqual(len(rows), 13)
+        self.assertEqual(rows[-1]['due_day'], 365)
+        self.assertEqual(rows[-1]['balance'], Decimal('0'))
+        # exact to the penny: the principal parts add up to the amount borrowed
+        self.assertEqual(sum(row['principal'] for row in rows), Decimal('20000'))
+        for row in rows:
+            self.assertEqual(row['payment'], row['principal'] + row['interest'])
+            self.assertEqual(row['interest'].as_tuple().exponent, -2)
+
+    def test_short_loan_single_installment(self):
+        rows = amortization_schedule(Decimal('15000'), 5, Decimal('0.05'))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['principal'], Decimal('15000'))
+
+    def test_zero_rate(self):
+        summary = schedule_summary(Decimal('10000'), 90, Decimal('0'))
+        self.assertEqual(summary['total_interest'], Decimal('0'))
+        self.assertEqual(summary['payment'] * 2 + summary['last_payment'], Decimal('10000'))
+
+    def test_summary_matches_rows(self):
+        rows = amortization_schedule(Decimal('54321.09'), 1000, Decimal('0.07123'))
+        summary = schedule_summary(Decimal('54321.09'), 1000, Decimal('0.07123'))
+        self.assertEqual(summary['installments'], len(rows))
+        self.assertEqual(summary['total_interest'], sum(row['interest'] for row in rows))
+        self.assertEqual(summary['last_payment'], rows[-1]['payment'])
+
+
+class TestAmortizeBatch(TestCase):
+
+    def test_batch_matches_single_loans(self):
+        """ vectorizing over loans of different lengths does not change any figure """
+        amounts = np.round(np.random.uniform(10000, 100000, 200), 2)
+        durations = np.random.randint(0, 10001, 200)
+        rates = np.round(np.random.uniform(0.04, 0.12, 200), 5)
+        batch = amortize(amounts, durations, rates)
+        for index in range(0, 200, 20):
+            single = amortize([amounts[index]], [durations[index]], [rates[index]])
+            for name, values in single.items():
+                self.assertEqual(values[0], batch[name][index])
+        self.assertTrue(np.all(batch['total_repayable'] - batch['total_interest'] == to_pence(amounts)))
+
+    def test_loan_book_summary(self):
+        LoanFactory()
+        LoanFactory(amount=Decimal('50000'), duration=730)
+        totals = loan_book_summary(Loan.objects.all(), chunk_size=1)
+        self.assertEqual(totals['loans'], 2)
+        self.assertEqual(totals['principal'], Decimal('70000'))
+        self.assertEqual(
+            totals['total_interest'],
+            schedule_summary(Decimal('20000'), 365, Decimal('0.05'))['total_interest'] +
+            schedule_summary(Decimal('50000'), 730, Decimal('0.05'))['total_interest']
+        )
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from test_plus.test import TestCase
+
+from ..dashboard import get_dashboard, get_dashboard_key
+from ..models import Business, Loan
+from ..transitions import transition_loan, transition_loans, InvalidTransition
+from .factories import BusinessFactory, LoanFactory
+
+
+class TestTransitions(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.business = BusinessFactory()
+        self.borrower = self.business.owner
+        self.loan = LoanFactory(business=self.business, borrower=self.borrower)
+
+    def get_counters(self, business=None):
+        return Business.objects.values_list('loan_count', 'active_loan_count').get(
+            pk=(business or self.business).pk
+        )
+
+    def test_unknown_transition(self):
+        with self.assertRaises(InvalidTransition):
+            transition_loan(self.loan.pk, 'refund', self.borrower.pk)
+
+    def test_transition_loan(self):
+        get_dashboard(self.borrower.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(transition_loan(self.loan.pk, 'approve', self.borrower.pk))
+        self.loan.refresh_from_db()
+        self.assertEqual(self.loan.status, Loan.APPROVED)
+        self.assertIsNone(cache.get(get_dashboard_key(self.borrower.pk)))
+        # the loan is no longer pending
+        self.assertFalse(transition_loan(self.loan.pk, 'approve', self.borrower.pk))
+        self.assertFalse(transition_loan(self.loan.pk, 'cancel', self.borrower.pk))
+        self.assertTrue(transition_loan(self.loan.pk, 'process', self.borrower.pk))
+        self.assertTrue(transition_loan(self.loan.pk, 'repay', self.borrower.pk))
+        self.assertEqual(self.get_counters(), (1, 1))
+
+    def test_cancel_updates_counters(self):
+        self.assertTrue(transition_loan(self.loan.pk, 'cancel', self.borrower.pk))
+        self.assertEqual(self.get_counters(), (1, 0))
+        self.assertFalse(transition_loan(self.loan.pk, 'cancel', self.borrower.pk))
+        self.assertEqual(self.get_counters(), (1, 0))
+
+    def test_other_borrower(self):
+        other = LoanFactory()
+        self.assertFalse(transition_loan(other.pk, 'cancel', self.borrower.pk))
+        other.refresh_from_db()
+        self.assertEqual(other.status, Loan.PENDING)
+
+    def test_transition_loans(self):
+        other_business = BusinessFactory(owner=self.borrower)
+        for i in range(3):
+            LoanFactory(business=other_business, borrower=self.borrower)
+        LoanFactory(business=self.business, borrower=self.borrower, status=Loan.APPROVED)
+        get_dashboard(self.borrower.pk)
+        moved = transition_loans(Loan.objects.filter(borrower=self.borrower), 'cancel', chunk_size=2)
+        self.assertEqual(len(moved), 4)
+        self.assertEqual(Loan.objects.filter(status=Loan.CANCELLED).count(), 4)
+        self.assertEqual(self.get_counters(), (2, 1))
+        self.assertEqual(self.get_counters(other_business), (3, 0))
+        self.assertIsNone(cache.get(get_dashboard_key(self.borrower.pk)))
+        self.assertEqual(transition_loans(Loan.objects.all(), 'cancel'), [])
+        counters = Business.objects.with_actual_loan_counts().values_list(
+            'active_loan_count', 'actual_active_loan_count'
+        )
+        for stored, actual in counters:
+            self.assertEqual(stored, actual)
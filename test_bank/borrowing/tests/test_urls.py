@@ -98,6 +98,15 @@ class TestUserURLs(TestCase):
             '/borrowing/cancel-loan/42/'
         )
 
+    # Loan quote
+    def test_quote_resolve(self):
+        """ /borrowing/quote/ should resolve to borrowing:quote """
+        self.assertEqual(resolve('/borrowing/quote/').view_name, 'borrowing:quote')
+
+    def test_quote_reverse(self):
+        """ borrowing:quote should reverse to /borrowing/quote/ """
+        self.assertEqual(reverse('borrowing:quote', kwargs={}), '/borrowing/quote/')
+
     #-------------------------
     #    Verify Phone
     #-------------------------
@@ -113,3 +122,19 @@ class TestUserURLs(TestCase):
             reverse('borrowing:verify_phone', kwargs={}),
             '/borrowing/verify-phone/'
         )
+
+    #-------------------------
+    #    Transactions
+    #-------------------------
+
+    def test_non_atomic_requests(self):
+        """ the pages which only read run outside of ATOMIC_REQUESTS """
+        def is_atomic(url_name, **kwargs):
+            view = resolve(reverse(url_name, kwargs=kwargs)).func
+            return 'default' not in getattr(view, '_non_atomic_requests', set())
+
+        for url_name in ('borrowing:home', 'borrowing:loan_list', 'borrowing:api_v1:loan_list'):
+            self.assertFalse(is_atomic(url_name), url_name)
+        self.assertFalse(is_atomic('borrowing:loan_detail', pk=1))
+        self.assertTrue(is_atomic('borrowing:create_loan'))
+        self.assertTrue(is_atomic('borrowing:cancel_loan', pk=1))
@@ -1,7 +1,13 @@
+from datetime import timedelta
+
 from django.test import RequestFactory
 from test_plus.test import TestCase
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.utils import timezone
 
 from test_bank.users.tests.factories import UserFactory
 from .factories import BorrowerProfileFactory, BusinessFactory, LoanFactory
@@ -18,8 +24,10 @@ from ..views import (
     verify_phone,
 )
 
-from test_bank.borrowing.helper_functions import get_verification_code
+from test_bank.borrowing.helper_functions import calculate_interest_rate
+from test_bank.borrowing.otp import issue_code, check_code, EXPIRED
 from test_bank.borrowing.models import BorrowerProfile, Business, Loan
+from test_bank.borrowing.dashboard import CHANGED_AT_KEY, get_dashboard_key, invalidate_dashboard
 
 
 class BaseBorrowingTestCase(TestCase):
@@ -29,6 +37,7 @@ class BaseBorrowingTestCase(TestCase):
         creates a new user 'user-0' and attach it to a request
         """
         UserFactory.reset_sequence()
+        cache.clear()
         self.user = UserFactory()
         self.client = Client()
         self.client.login(username=self.user.username, password='password')
@@ -122,6 +131,72 @@ class TestHome(BaseBorrowingTestCase):
             'href="{0}"'.format(reverse("borrowing:loan_detail", kwargs={'pk': 2})),
         )
 
+    def test_warm_dashboard_skips_summary_queries(self):
+        """
+        once the dashboard is cached, no query should hit the business
+        or loan tables
+        """
+        borrower = BorrowerProfileFactory(user=self.user)
+        business = BusinessFactory(owner=borrower)
+        LoanFactory(business=business, borrower=borrower)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertContains(response, "Pending", status_code=200)
+        summary_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'borrowing_business' in query['sql'] or 'borrowing_loan' in query['sql']
+        ]
+        self.assertEqual(summary_queries, [])
+
+    def test_dashboard_invalidated_by_new_loan(self):
+        """ a new loan must show up even if the dashboard was cached """
+        borrower = BorrowerProfileFactory(user=self.user)
+        business = BusinessFactory(owner=borrower)
+        self.client.get(self.url)
+        loan = LoanFactory(business=business, borrower=borrower)
+        response = self.client.get(self.url)
+        self.assertContains(
+            response,
+            'href="{0}"'.format(reverse("borrowing:loan_detail", kwargs={'pk': loan.pk})),
+        )
+
+    def test_cached_tables(self):
+        """ the tables are rendered again once the data of the borrower changed """
+        borrower = BorrowerProfileFactory(user=self.user)
+        business = BusinessFactory(owner=borrower, name="Before")
+        self.client.get(self.url)
+        # updates skip the signals invalidating the cache
+        Business.objects.filter(pk=business.pk).update(name="After")
+        cache.delete(get_dashboard_key(borrower.pk))
+        response = self.client.get(self.url)
+        self.assertContains(response, "Before")
+        self.assertEqual(response.context['businesses'][0]['name'], "After")
+        invalidate_dashboard(borrower.pk)
+        self.assertContains(self.client.get(self.url), "After")
+
+    def test_cached_navbar(self):
+        """ anonymous and authenticated users get their own navbar """
+        self.assertContains(self.client.get(self.url), reverse('account_logout'))
+        response = Client().get(reverse('about'))
+        self.assertContains(response, reverse('account_login'))
+        self.assertNotContains(response, reverse('account_logout'))
+        self.assertContains(self.client.get(reverse('about')), reverse('account_logout'))
+
+    @override_settings(BORROWING_PAGE_SIZE=2)
+    def test_paginated_loans(self):
+        """ loans are listed newest first by pages, following the loans_after cursor """
+        borrower = BorrowerProfileFactory(user=self.user)
+        business = BusinessFactory(owner=borrower)
+        loans = [LoanFactory(business=business, borrower=borrower) for i in range(3)]
+        response = self.client.get(self.url)
+        self.assertEqual([loan['pk'] for loan in response.context['loans']], [loans[2].pk, loans[1].pk])
+        response = self.client.get(self.url, {'loans_after': response.context['loans_next']})
+        self.assertEqual([loan['pk'] for loan in response.context['loans']], [loans[0].pk])
+        self.assertIsNone(response.context['loans_next'])
+        self.assertContains(response, "Latest loans")
+        self.assertEqual(self.client.get(self.url, {'loans_after': 'nope'}).status_code, 400)
+
 
 #  ------------------------------------------------
 #                BORROWER VIEWS
@@ -160,7 +235,7 @@ class TestBorrowerCreateView(BaseBorrowingTestCase):
         """
         data = {
             'phone_number': "+447123567890",
-            'code': get_verification_code("+447123567890"),
+            'code': issue_code("+447123567890"),
             'has_signed': 'on',
             'first_name': 'Jane',
             'last_name': 'Doe',
@@ -171,6 +246,18 @@ class TestBorrowerCreateView(BaseBorrowingTestCase):
         self.assertEqual(self.user.first_name, 'Jane')
         borrower = BorrowerProfile.objects.get(user=self.user)
         self.assertEqual(borrower.phone_number, "+447123567890")
+        # the code cannot be used again
+        self.assertEqual(check_code("+447123567890", data['code']), EXPIRED)
+
+    @override_settings(ASSET_BUNDLES_ENABLED=True)
+    def test_phone_assets_loaded_on_demand(self):
+        """ intl-tel-input is loaded by the page script, no other page links it """
+        response = self.client.get(self.url)
+        self.assertContains(response, 'data-phone-assets="/static/bundles/phone.css /static/bundles/phone.js"')
+        self.assertNotContains(response, '<script src="/static/bundles/phone.js"')
+        self.assertNotContains(response, '<link rel="stylesheet" href="/static/bundles/phone.css"')
+        BorrowerProfileFactory(user=self.user)
+        self.assertNotContains(self.client.get(reverse('borrowing:home')), 'phone.js')
 
 
 #  ------------------------------------------------
@@ -338,6 +425,14 @@ class TestLoanCreateView(BaseBorrowingTestCase):
             reverse('borrowing:home')
         )
 
+    def test_quote_url_and_sectors(self):
+        """ the form page knows where to ask for quotes and the sector of each business """
+        borrower = BorrowerProfileFactory(user=self.user)
+        business = BusinessFactory(owner=borrower, sector='E')
+        response = self.client.get(self.url)
+        self.assertContains(response, 'data-url="{0}"'.format(reverse('borrowing:quote')))
+        self.assertContains(response, '{{"{0}": "E"}}'.format(business.pk))
+
     def test_legit_user_valid_data(self):
         """
         checks a new loan is created for a legit user inputting
@@ -349,13 +444,78 @@ class TestLoanCreateView(BaseBorrowingTestCase):
             'business': business.pk,
             'reason': "Test",
             'duration': 5,
-            'interest_rate': '0.05',
+            'interest_rate': calculate_interest_rate(15000, 5, business.sector),
             'amount': 15000
         }
         response = self.client.post(self.url, data)
         self.assertEqual(response.status_code, 302)
         new_loan = Loan.objects.last()
-        self.assertEqual(new_loan.interest_rate, Decimal('0.05'))
+        self.assertEqual(new_loan.interest_rate, calculate_interest_rate(15000, 5, business.sector))
+
+
+class TestQuoteView(BaseBorrowingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('borrowing:quote')
+        self.borrower = BorrowerProfileFactory(user=self.user)
+        self.business = BusinessFactory(owner=self.borrower, sector='F')
+
+    def test_login_required(self):
+        self.run_test_login_required()
+
+    def test_quote_by_sector(self):
+        response = self.client.get(self.url, {'amount': '15000', 'duration': 365, 'sector': 'F'})
+        self.assertEqual(response.status_code, 200)
+        quote = response.json()
+        self.assertEqual(Decimal(quote['interest_rate']), calculate_interest_rate(15000, 365, 'F'))
+        self.assertEqual(quote['installments'], 13)
+        self.assertGreater(Decimal(quote['total_repayable']), Decimal('15000'))
+
+    def test_quote_by_business(self):
+        """ the sector can be looked up from one of the user's businesses """
+        response = self.client.get(self.url, {'amount': '15000', 'duration': 365, 'business': self.business.pk})
+        self.assertEqual(Decimal(response.json()['interest_rate']), calculate_interest_rate(15000, 365, 'F'))
+        other_business = BusinessFactory()
+        response = self.client.get(self.url, {'amount': '15000', 'duration': 365, 'business': other_business.pk})
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_amount(self):
+        response = self.client.get(self.url, {'amount': '500', 'duration': 365})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('amount', response.json()['errors'])
+
+
+class TestLoanListView(BaseBorrowingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('borrowing:loan_list')
+
+    def test_login_required(self):
+        self.run_test_login_required()
+
+    def test_borrower_required(self):
+        self.run_test_borrower_required()
+
+    @override_settings(BORROWING_PAGE_SIZE=2)
+    def test_status_filter_and_pages(self):
+        borrower = BorrowerProfileFactory(user=self.user)
+        business = BusinessFactory(owner=borrower)
+        pending = [LoanFactory(business=business, borrower=borrower) for i in range(3)]
+        LoanFactory(business=business, borrower=borrower, status=Loan.APPROVED)
+        LoanFactory(business=business)
+        response = self.client.get(self.url, {'status': Loan.PENDING})
+        self.assertEqual([loan['pk'] for loan in response.context['loans']], [pending[2].pk, pending[1].pk])
+        response = self.client.get(self.url + '?' + response.context['next_page_query'])
+        self.assertEqual([loan['pk'] for loan in response.context['loans']], [pending[0].pk])
+        self.assertNotIn('next_page_query', response.context)
+        self.assertEqual(response.context['first_page_query'], 'status=0')
+
+    def test_invalid_filters(self):
+        BorrowerProfileFactory(user=self.user)
+        self.assertEqual(self.client.get(self.url, {'status': 42}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'after': 'nope'}).status_code, 400)
 
 
 class TestLoanDetailView(BaseBorrowingTestCase):
@@ -394,6 +554,12 @@ class TestLoanDetailView(BaseBorrowingTestCase):
             status_code=200
         )
 
+    def test_schedule_displayed(self):
+        """ the repayment schedule of the loan is listed, one row per installment """
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['schedule']), 13)
+        self.assertContains(response, "Repayment schedule")
+
     def test_deny_access_to_others_loans(self):
         """
         raise 404 if attempting access to other users' loan
@@ -442,6 +608,15 @@ class TestLoanCancelView(BaseBorrowingTestCase):
         loan = Loan.objects.get(pk=1)
         self.assertEqual(loan.status, 4)
 
+    def test_cancelling_approved_loan(self):
+        """
+        Only pending loans can be cancelled
+        """
+        Loan.objects.filter(pk=self.loan.pk).update(status=Loan.APPROVED)
+        response = self.client.post(self.url, {})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).status, Loan.APPROVED)
+
 
 #  ------------------------------------------------
 #                PHONE VIEWS
@@ -471,3 +646,171 @@ class TestPhoneView(BaseBorrowingTestCase):
         """
         response = self.client.post(self.url, {'phone_number': '+447189'})
         self.assertEqual(response.status_code, 400)
+
+    @override_settings(PHONE_CODE_RATE_LIMITS={'user': (2, 60), 'ip': (10, 60), 'phone': (10, 60)})
+    def test_rate_limited(self):
+        with self.settings(DEBUG=True):
+            for number in ('+447123456789', '+447123456788'):
+                self.assertEqual(self.client.post(self.url, {'phone_number': number}).status_code, 200)
+            response = self.client.post(self.url, {'phone_number': '+447123456787'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+
+    @override_settings(
+        NUM_PROXIES=1, PHONE_CODE_RATE_LIMITS={'user': (10, 60), 'ip': (1, 60), 'phone': (10, 60)}
+    )
+    def test_rate_limited_forwarded_address(self):
+        """ behind a proxy, the limit of the IP address applies to the client's """
+        with self.settings(DEBUG=True):
+            response = self.client.post(
+                self.url, {'phone_number': '+447123456789'}, HTTP_X_FORWARDED_FOR='10.0.0.1, 203.0.113.1'
+            )
+            self.assertEqual(response.status_code, 200)
+            # the first address is set by the client
+            response = self.client.post(
+                self.url, {'phone_number': '+447123456788'}, HTTP_X_FORWARDED_FOR='10.0.0.2, 203.0.113.2'
+            )
+            self.assertEqual(response.status_code, 200)
+            response = self.client.post(
+                self.url, {'phone_number': '+447123456787'}, HTTP_X_FORWARDED_FOR='10.0.0.3, 203.0.113.1'
+            )
+        self.assertEqual(response.status_code, 429)
+
+
+class TestValidatePhoneView(BaseBorrowingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("borrowing:validate_phone")
+
+    def test_login_required(self):
+        self.run_test_login_required()
+
+    def test_valid_phone_number(self):
+        response = self.client.get(self.url, {'phone_number': '+44 7123 456789'})
+        self.assertEqual(response.json(), {'valid': True, 'phone_number': '+447123456789'})
+
+    def test_invalid_phone_number(self):
+        response = self.client.get(self.url, {'phone_number': '+447189'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['valid'])
+        self.assertTrue(response.json()['error'])
+
+    def test_get_only(self):
+        self.assertEqual(self.client.post(self.url, {'phone_number': '+447123456789'}).status_code, 405)
+
+
+class TestConditionalGet(BaseBorrowingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.borrower = BorrowerProfileFactory(user=self.user)
+        self.loan = LoanFactory(borrower=self.borrower, business__owner=self.borrower)
+        self.url = reverse('borrowing:home')
+
+    def revalidate(self, response, url=None):
+        return self.client.get(
+            url or self.url, HTTP_IF_NONE_MATCH=response['ETag'], HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        with CaptureQueriesContext(connection) as context:
+            response = self.revalidate(response)
+        self.assertEqual(response.status_code, 304)
+        # the user only, the session is cached and the page is not rendered
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_modified(self):
+        response = self.client.get(self.url)
+        LoanFactory(borrower=self.borrower, business=self.loan.business)
+        response = self.revalidate(response)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['loans']), 2)
+        self.assertEqual(self.revalidate(response).status_code, 304)
+
+    def test_other_user(self):
+        response = self.client.get(self.url)
+        other = UserFactory()
+        BorrowerProfileFactory(user=other)
+        self.client.force_login(other)
+        self.assertEqual(self.revalidate(response).status_code, 200)
+
+    def test_pending_messages(self):
+        response = self.client.get(self.url)
+        self.client.post(reverse('borrowing:cancel_loan', kwargs={'pk': self.loan.pk}))
+        response = self.revalidate(response)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertEqual(self.revalidate(self.client.get(self.url)).status_code, 304)
+
+    def test_loan_pages(self):
+        for url in (reverse('borrowing:loan_detail', kwargs={'pk': self.loan.pk}), reverse('borrowing:loan_list')):
+            # the first page with a form sets the CSRF cookie, changing the ETag
+            self.client.get(url)
+            response = self.client.get(url)
+            self.assertEqual(self.revalidate(response, url).status_code, 304)
+            self.loan.save()
+            self.assertEqual(self.revalidate(response, url).status_code, 200)
+        response = self.client.get(reverse('borrowing:loan_detail', kwargs={'pk': LoanFactory().pk}))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+
+    def test_static_pages(self):
+        url = reverse('about')
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(response, url).status_code, 304)
+        self.client.logout()
+        self.assertEqual(self.revalidate(response, url).status_code, 200)
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class TestReplicaReads(BaseBorrowingTestCase):
+    """ the replica is a second database holding the borrower but not the loan """
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        self.borrower = BorrowerProfileFactory(user=self.user)
+        self.loan = LoanFactory(borrower=self.borrower, business__owner=self.borrower)
+        self.user.__class__.objects.using('replica').bulk_create([self.user])
+        BorrowerProfile.objects.using('replica').bulk_create([self.borrower])
+        self.url = reverse('borrowing:loan_detail', kwargs={'pk': self.loan.pk})
+
+    def settle(self):
+        """ the data of the borrower last changed long ago """
+        cache.set(CHANGED_AT_KEY.format(self.user.pk), timezone.now() - timedelta(hours=1))
+
+    def test_reads_from_replica(self):
+        self.settle()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        response = self.client.get(reverse('borrowing:loan_list'))
+        self.assertEqual(list(response.context['loans']), [])
+
+    def test_reads_own_writes(self):
+        # the loan was just created
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.settle()
+        self.client.post(reverse('borrowing:cancel_loan', kwargs={'pk': self.loan.pk}))
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['loan'].status, Loan.CANCELLED)
+        with self.settings(REPLICA_STICKY_SECONDS=0):
+            self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_cache_unavailable(self):
+        """ without the time of the last change, the pages read from the primary """
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        response = self.client.get(reverse('borrowing:loan_list'))
+        self.assertEqual([loan['pk'] for loan in response.context['loans']], [self.loan.pk])
+
+    def test_writes_go_to_primary(self):
+        self.settle()
+        response = self.client.post(reverse('borrowing:create_business'), {
+            'name': "Replica Ltd", 'address': "1 Lag Street", 'company_number': '12345678', 'sector': 'R',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Business.objects.filter(name="Replica Ltd").exists())
+        self.assertFalse(Business.objects.using('replica').filter(name="Replica Ltd").exists())
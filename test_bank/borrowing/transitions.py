@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+from collections import Counter, defaultdict
+
+from django.db import transaction, DEFAULT_DB_ALIAS
+from django.db.models import F, Case, When, Value
+from django.utils import timezone
+
+from .dashboard import invalidate_dashboards
+from .models import Business, Loan
+
+
+# name: (status the loan must be in, status it moves to)
+TRANSITIONS = {
+    'cancel': (Loan.PENDING, Loan.CANCELLED),
+    'approve': (Loan.PENDING, Loan.APPROVED),
+    'reject': (Loan.PENDING, Loan.REJECTED),
+    'process': (Loan.APPROVED, Loan.PROCESSED),
+    'repay': (Loan.PROCESSED, Loan.REPAID),
+}
+
+# Loans updated per statement by transition_loans, within the 999
+# variables allowed by SQLite
+TRANSITION_CHUNK_SIZE = 500
+# each loan repriced takes three variables: in the IN list and its WHEN
+REPRICE_CHUNK_SIZE = 300
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+def get_transition(name):
+    try:
+        return TRANSITIONS[name]
+    except KeyError:
+        raise InvalidTransition("Unknown loan transition {0!r}".format(name))
+
+
+def active_loan_delta(source, target):
+    """ change of Business.active_loan_count for a loan moving from source to target """
+    return (target in Loan.ACTIVE_STATUSES) - (source in Loan.ACTIVE_STATUSES)
+
+
+def transition_loan(loan_id, name, borrower_id):
+    """
+    applies a transition to a loan of a borrower as one guarded UPDATE
+    ... WHERE status = <source>, so that of concurrent requests only one
+    can move the loan. Returns True if this call moved it, False if the
+    loan does not belong to the borrower or is no longer in the source
+    status.
+    .update() bypasses Loan.save and the signals, the business counters
+    and the dashboard are kept in step here.
+    """
+    source, target = get_transition(name)
+    delta = active_loan_delta(source, target)
+    loans = Loan.objects.filter(pk=loan_id, borrower_id=borrower_id, status=source)
+    if not delta:
+        won = loans.update(status=target, modified_at=timezone.now()) == 1
+    else:
+        with transaction.atomic():
+            won = loans.update(status=target, modified_at=timezone.now()) == 1
+            if won:
+                Business.objects.filter(loan__pk=loan_id).update(
+                    active_loan_count=F('active_loan_count') + delta
+                )
+    if won:
+        invalidate_dashboards([borrower_id])
+    return won
+
+
+def transition_loans(queryset, name, chunk_size=TRANSITION_CHUNK_SIZE):
+    """
+    applies a transition to every loan of the queryset in the source
+    status, returns the (pk, business_id, borrower_id) of the loans moved.
+    The candidate rows are locked then updated by chunks of guarded
+    UPDATEs in a single transaction, a few statements whatever the number
+    of loans; loans moved concurrently by another request are left out.
+    """
+    source, target = get_transition(name)
+    delta = active_loan_delta(source, target)
+    using = queryset.db
+    loans = Loan.objects.using(using)
+    moved = []
+    with transaction.atomic(using=using):
+        # locking in primary key order keeps concurrent bulk transitions from deadlocking
+        rows = list(
+            queryset.filter(status=source).select_for_update().order_by('pk')
+            .values_list('pk', 'business_id', 'borrower_id')
+        )
+        now = timezone.now()
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            pks = [pk for pk, business_id, borrower_id in chunk]
+            count = loans.filter(pk__in=pks, status=source).update(status=target, modified_at=now)
+            if count != len(chunk):
+                # backends without row locks: keep the rows this call moved
+                won = set(loans.filter(pk__in=pks, status=target, modified_at=now).values_list('pk', flat=True))
+                chunk = [row for row in chunk if row[0] in won]
+            moved.extend(chunk)
+
+        if delta:
+            # one UPDATE per distinct number of loans moved within a business
+            businesses = defaultdict(list)
+            for business_id, count in Counter(row[1] for row in moved).items():
+                businesses[count].append(business_id)
+            businesses_manager = Business.objects.db_manager(using)
+            for count, business_ids in businesses.items():
+                for start in range(0, len(business_ids), chunk_size):
+                    businesses_manager.filter(pk__in=business_ids[start:start + chunk_size]).update(
+                        active_loan_count=F('active_loan_count') + delta * count
+                    )
+    invalidate_dashboards({row[2] for row in moved})
+    return moved
+
+
+def reprice_loans(loan_ids, using=DEFAULT_DB_ALIAS, chunk_size=REPRICE_CHUNK_SIZE):
+    """
+    sets the interest rate of the loans to the current pricing grid, with
+    a single call to price_loans and one UPDATE ... CASE per chunk of loans
+    """
+    from .pricing import price_loans, to_decimals
+    loans = Loan.objects.using(using)
+    rows = []
+    for start in range(0, len(loan_ids), TRANSITION_CHUNK_SIZE):
+        rows.extend(loans.filter(pk__in=loan_ids[start:start + TRANSITION_CHUNK_SIZE]).values_list(
+            'pk', 'amount', 'duration', 'business__sector'
+        ))
+    if not rows:
+        return
+    pks, amounts, durations, sectors = zip(*rows)
+    rates = to_decimals(price_loans(amounts, durations, sectors))
+    rate_field = Loan._meta.get_field('interest_rate')
+    for start in range(0, len(pks), chunk_size):
+        chunk = list(zip(pks[start:start + chunk_size], rates[start:start + chunk_size]))
+        loans.filter(pk__in=[pk for pk, rate in chunk]).update(interest_rate=Case(
+            *[When(pk=pk, then=Value(rate)) for pk, rate in chunk], output_field=rate_field
+        ))
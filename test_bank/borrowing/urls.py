@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from django.conf.urls import url
+from django.conf.urls import include, url
 
 from . import views
 
@@ -35,6 +35,11 @@ urlpatterns = [
         view=views.LoanCreateView.as_view(),
         name='create_loan'
     ),
+    url(
+        regex=r'^loans/$',
+        view=views.LoanListView.as_view(),
+        name='loan_list'
+    ),
     url(
         regex=r'^loan-detail/(?P<pk>[\d]+)/$',
         view=views.LoanDetailView.as_view(),
@@ -45,9 +50,20 @@ urlpatterns = [
         view=views.cancel_loan_request,
         name='cancel_loan'
     ),
+    url(
+        regex=r'^quote/$',
+        view=views.quote_view,
+        name='quote'
+    ),
     url(
         regex=r'^verify-phone/$',
         view=views.verify_phone,
         name='verify_phone'
     ),
+    url(
+        regex=r'^validate-phone/$',
+        view=views.validate_phone,
+        name='validate_phone'
+    ),
+    url(r'^api/v1/', include('test_bank.borrowing.api.urls')),
 ]
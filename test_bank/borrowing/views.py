@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import json
+
 from django.contrib import messages
 from django.core.exceptions import SuspiciousOperation
 from django.http import Http404
@@ -7,9 +9,11 @@ from django.views.generic import (
     DetailView,
     UpdateView,
     CreateView,
-    FormView
+    FormView,
+    TemplateView,
 )
 from django.http.response import (
+    HttpResponse,
     HttpResponseNotAllowed,
     HttpResponseRedirect,
     HttpResponseBadRequest,
@@ -22,51 +26,100 @@ from django.urls.base import reverse_lazy
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.utils import timezone
-from django.db.models import Count
-
-from .forms import UserBorrowerForm, VeriFyPhoneForm, LoanForm
+from django.db import transaction
+from django.utils.decorators import method_decorator
+
+from test_bank.contrib.conditional import conditional_page, page_validators
+from test_bank.contrib.db.routers import ReplicaReadsMixin, replica_reads
+from test_bank.contrib.db.transaction import NonAtomicRequestsMixin
+from test_bank.contrib.http import get_client_ip
+from .dashboard import get_dashboard, get_request_changed_at, changed_recently, business_page, loan_page
+from .forms import UserBorrowerForm, VeriFyPhoneForm, LoanForm, LoanQuoteForm, LoanListForm
+from .otp import RateLimited
 from .models import BorrowerProfile, Business, Loan
+from .pagination import InvalidCursor
+from .quotes import get_quote
+from .transitions import transition_loan
 
 
 @login_required
 def verify_phone(request):
     """
     returns status 200 if the verification number was sent to the user,
-    else returns 400
+    429 if too many codes were requested, else returns 400
     """
     if not request.method == "POST":
         return HttpResponseNotAllowed(['POST'])
     form = VeriFyPhoneForm(request.POST)
     if form.is_valid():
-        form.process()
+        try:
+            form.process(request.user.pk, get_client_ip(request))
+        except RateLimited as error:
+            response = HttpResponse(_("Too many codes were requested, please try again later."), status=429)
+            response['Retry-After'] = str(error.retry_after)
+            return response
         return JsonResponse({})
     else:
         return HttpResponseBadRequest(_("Your phone number is not valid. Try the format +447xxxxxxxxx"))
 
 
+@transaction.non_atomic_requests
+@login_required
+def validate_phone(request):
+    """
+    checks the phone number typed in the activation form before the
+    intl-tel-input assets are loaded, returns the number in E.164 format
+    or the error
+    """
+    if not request.method == "GET":
+        return HttpResponseNotAllowed(['GET'])
+    form = VeriFyPhoneForm(request.GET)
+    if form.is_valid():
+        return JsonResponse({'valid': True, 'phone_number': form.cleaned_data['phone_number'].as_e164})
+    return JsonResponse({'valid': False, 'error': form.errors['phone_number'][0]})
+
+
 #  ----------------------------------------------------
 #        Borrower Profile Views
 #  ----------------------------------------------------
 
 
+def borrower_page_validators(request, *args, **kwargs):
+    """ validators of the pages showing the data of the current borrower """
+    return page_validators(request, get_request_changed_at(request))
+
+
+@replica_reads(primary_if=changed_recently)
+@transaction.non_atomic_requests
 @login_required
+@conditional_page(borrower_page_validators)
 def home_view(request):
     """
     returns the home view of the borrowing section. Gives a summary of
     whether the borrower profile account has been properly set up and a
     summary of the business registered and loans subscribed
+    The first pages of the summary are cached per borrower and invalidated
+    by borrowing.signals, the next ones are fetched with the
+    businesses_after and loans_after cursors. Browsers revalidating the
+    page get a 304 until then, and the rendered tables are cached too.
     """
     try:
         borrower = BorrowerProfile.objects.get(user=request.user)
-        businesses = Business.objects.filter(owner=borrower).annotate(loan_nb=Count('loan', distinct=True))
-        loans = borrower.loan_set.all()
     except BorrowerProfile.DoesNotExist:
-        borrower, businesses, loans = None, None, None
-    return render(
-        request, "borrowing/home.html",
-        {"borrower": borrower, 'businesses': businesses, 'loans': loans}
-    )
+        return render(request, "borrowing/home.html", {"borrower": None})
+    businesses_after, loans_after = request.GET.get('businesses_after'), request.GET.get('loans_after')
+    # versions the cached fragments of the tables
+    context = {'borrower': borrower, 'borrower_version': get_request_changed_at(request)}
+    if not (businesses_after and loans_after):
+        context.update(get_dashboard(borrower.pk))
+    try:
+        if businesses_after:
+            context['businesses'], context['businesses_next'] = business_page(borrower.pk, businesses_after)
+        if loans_after:
+            context['loans'], context['loans_next'] = loan_page(borrower.pk, loans_after)
+    except InvalidCursor:
+        return HttpResponseBadRequest()
+    return render(request, "borrowing/home.html", context)
 
 
 class BorrowerCreateView(LoginRequiredMixin, FormView):
@@ -124,8 +177,8 @@ class BusinessCreateView(SuccessMessageMixin, BorrowerProfileRequiredMixin, Crea
     template_name = "borrowing/create_business_form.html"
 
     def form_valid(self, form):
+        # the CreateView saves the form, no need to save it beforehand
         form.instance.owner = self.borrower
-        form.save()
         return super().form_valid(form)
 
 
@@ -144,7 +197,7 @@ class BusinessUpdateView(SuccessMessageMixin, BorrowerProfileRequiredMixin, Upda
         and only if there is no related loans
         """
         business = get_object_or_404(Business, owner=self.borrower, pk=self.kwargs['pk'])
-        if business.loan_set.exists():
+        if business.loan_count:
             raise SuspiciousOperation(_('You cannot delete a business with existing loans'))
         return business
 
@@ -155,7 +208,7 @@ def delete_business(request, pk):
     if not request.method == "POST":
         return HttpResponseNotAllowed(['POST', ])
     business = get_object_or_404(Business, owner__user=request.user, pk=pk)
-    if business.loan_set.exists():
+    if business.loan_count:
         raise SuspiciousOperation(_('You cannot delete a business with existing loans'))
     business.delete()
     messages.success(request, _("The business {0} has been deleted").format(business.name))
@@ -187,41 +240,112 @@ class LoanCreateView(SuccessMessageMixin, BorrowerProfileRequiredMixin, CreateVi
         form = super().get_form()
         form.fields['business'].queryset = Business.objects.filter(owner=self.borrower)
         form.fields['interest_rate'].widget.attrs = {'readonly': True, }
-        form.fields['interest_rate'].initial = 0.05
         return form
 
+    def get_context_data(self, **kwargs):
+        """ the sector of each business lets the page ask for quotes without any lookup """
+        context = super().get_context_data(**kwargs)
+        context['business_sectors'] = json.dumps(
+            dict(Business.objects.filter(owner=self.borrower).values_list('pk', 'sector'))
+        )
+        return context
+
     def form_valid(self, form):
+        # the CreateView saves the form, no need to save it beforehand
         form.instance.borrower = self.borrower
-        form.save()
         return super().form_valid(form)
 
 
-class LoanDetailView(BorrowerProfileRequiredMixin, DetailView):
+@method_decorator(conditional_page(borrower_page_validators), name='get')
+class LoanDetailView(ReplicaReadsMixin, NonAtomicRequestsMixin, BorrowerProfileRequiredMixin, DetailView):
     """
     Simplistic CBV showing a loan and offering an option to cancel it
     if it is still pending
     """
     model = Loan
+    primary_if = staticmethod(changed_recently)
 
     def get_object(self):
         # Only get the Business record for the user making the request
-        loan = get_object_or_404(Loan, pk=self.kwargs['pk'], borrower=self.borrower)
+        loan = get_object_or_404(
+            Loan.objects.select_related('business'), pk=self.kwargs['pk'], borrower=self.borrower
+        )
         return loan
 
+    def get_context_data(self, **kwargs):
+        from .schedule import amortization_schedule
+        context = super().get_context_data(**kwargs)
+        context['schedule'] = amortization_schedule(
+            self.object.amount, self.object.duration, self.object.interest_rate
+        )
+        return context
+
+
+@method_decorator(conditional_page(borrower_page_validators), name='get')
+class LoanListView(ReplicaReadsMixin, NonAtomicRequestsMixin, BorrowerProfileRequiredMixin, TemplateView):
+    """ lists the loans of the borrower, newest first, by pages, filtered by status """
+    template_name = "borrowing/loan_list.html"
+    primary_if = staticmethod(changed_recently)
+
+    def get(self, request, *args, **kwargs):
+        self.form = LoanListForm(request.GET)
+        if not self.form.is_valid():
+            return HttpResponseBadRequest()
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        loans, next_cursor = loan_page(
+            self.borrower.pk, self.form.cleaned_data['after'], self.form.cleaned_data['status']
+        )
+        context.update({
+            'form': self.form,
+            'loans': loans,
+            'status_choices': Loan.STATUS_CHOICES,
+            'selected_statuses': self.form.cleaned_data['status'],
+        })
+        if next_cursor:
+            params = self.request.GET.copy()
+            params['after'] = next_cursor
+            context['next_page_query'] = params.urlencode()
+        if self.form.cleaned_data['after']:
+            params = self.request.GET.copy()
+            del params['after']
+            context['first_page_query'] = params.urlencode()
+        return context
+
 
 @login_required
 def cancel_loan_request(request, pk):
     """
-    cancels an existing loan by setting its status to 4
-    only if its status was already 0
+    cancels an existing loan of the user if it is still pending, in a
+    single guarded UPDATE so it cannot race with its approval
     """
     if not request.method == "POST":
         return HttpResponseNotAllowed(['POST', ])
-    loan = get_object_or_404(Loan, pk=pk, borrower__user=request.user)
-    if loan.status != 0:
+    if not transition_loan(pk, 'cancel', borrower_id=request.user.id):
+        get_object_or_404(Loan, pk=pk, borrower_id=request.user.id)
         raise SuspiciousOperation(_("Processed loans cannot be deleted"))
-    loan.status = 4  # status 4 means "cancelled"
-    loan.modified_at = timezone.now()
-    loan.save()
     messages.success(request, _("The loan request has been cancelled"))
     return HttpResponseRedirect(reverse('borrowing:home'))
+
+
+@login_required
+def quote_view(request):
+    """
+    GET only - returns as JSON the interest rate and repayment summary of
+    a loan, memoized by quotes.get_quote so that the loan form can ask for
+    a new quote on every keystroke
+    """
+    if not request.method == "GET":
+        return HttpResponseNotAllowed(['GET', ])
+    form = LoanQuoteForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    sector = form.cleaned_data['sector']
+    if not sector and form.cleaned_data['business']:
+        sector = get_object_or_404(
+            Business.objects.values_list('sector', flat=True),
+            owner__user=request.user, pk=form.cleaned_data['business']
+        )
+    return JsonResponse(get_quote(form.cleaned_data['amount'], form.cleaned_data['duration'], sector))
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+Admin changelists for tables too large to be counted or paginated with
+OFFSET: counts are estimated by PostgreSQL's planner and pages are
+fetched by seeking on the primary key.
+"""
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .db.routers import get_replica, route_request_reads
+
+
+CURSOR_VAR = 'cursor'
+# Below this estimated number of rows, counting exactly is cheap enough
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def estimate_count(queryset):
+    """
+    number of rows of the queryset estimated by PostgreSQL: the table
+    statistics of pg_class when it is not filtered, else the planner
+    estimate. None on other backends.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            return int(row[0]) if row else None
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        return int(cursor.fetchone()[0][0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """ Paginator counting exactly only the querysets estimated to be small """
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate > EXACT_COUNT_THRESHOLD:
+            return estimate
+        return super().count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList paginating on the primary key when the list is sorted by
+    it: each page is a `pk < cursor` range scan, whatever its depth.
+    Lists sorted on another column fall back on numbered pages.
+    result_list is a list on keyset pages, list_editable is not supported.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        super().__init__(request, *args, **kwargs)
+        # links to filters and sorts restart from the first page
+        self.params.pop(CURSOR_VAR, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        pk_name = self.lookup_opts.pk.name
+        # the admin may repeat the primary key in the ordering
+        ordering = {
+            'pk' if field == pk_name else '-pk' if field == '-' + pk_name else field
+            for field in self.queryset.query.order_by
+        }
+        self.keyset = not self.show_all and ordering in ({'pk'}, {'-pk'})
+        self.next_cursor = None
+        if not self.keyset:
+            return super().get_results(request)
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        queryset = self.queryset
+        if self.cursor:
+            try:
+                cursor = self.lookup_opts.pk.to_python(self.cursor)
+            except Exception:
+                raise IncorrectLookupParameters
+            queryset = queryset.filter(**{'pk__gt' if ordering == {'pk'} else 'pk__lt': cursor})
+        rows = list(queryset[:self.list_per_page + 1])
+        if len(rows) > self.list_per_page:
+            rows = rows[:self.list_per_page]
+            self.next_cursor = rows[-1].pk
+
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.next_cursor)
+        self.paginator = paginator
+
+    def get_next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+    def get_first_page_url(self):
+        return self.get_query_string()
+
+
+class HighScaleAdminMixin:
+    """
+    ModelAdmin mixin for very large tables: estimated counts, no count of
+    the unfiltered table and keyset pagination on the default -pk sort.
+    Filters should be set on indexed columns. date_hierarchy is not
+    supported: its drilldown reads the distinct dates of the whole table,
+    use the date ranges of a DateFieldListFilter instead.
+    Changelists are read from a replica, see test_bank.contrib.db.routers.
+    """
+    change_list_template = 'admin/keyset_change_list.html'
+    ordering = ('-pk', )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def changelist_view(self, request, extra_context=None):
+        # actions and list_editable are posted to the changelist
+        if request.method == 'GET':
+            route_request_reads(get_replica())
+        return super().changelist_view(request, extra_context)
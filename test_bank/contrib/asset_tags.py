@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""
+{% load assets %} then {% asset_bundle 'base.js' %}: the tag of a bundle
+built by ./manage.py build_assets, or the tags of its sources while
+ASSET_BUNDLES_ENABLED is off, in development. The vendored sources not
+downloaded yet are loaded from their CDN.
+
+{% asset_urls 'phone.css' 'phone.js' %} lists the same files for a
+script loading them on demand, see loadAssets in project.js.
+"""
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+
+register = template.Library()
+
+
+def get_tag(url, integrity=None):
+    attributes = format_html(' integrity="{0}" crossorigin="anonymous"', integrity) if integrity else ''
+    if url.split('?')[0].endswith('.css'):
+        return format_html('<link rel="stylesheet" href="{0}"{1}>', url, attributes)
+    return format_html('<script src="{0}"{1}></script>', url, attributes)
+
+
+def get_source_tag(path):
+    if path in settings.ASSET_VENDOR and finders.find(path) is None:
+        return get_tag(*settings.ASSET_VENDOR[path])
+    return get_tag(static(path))
+
+
+def get_source_url(path):
+    if path in settings.ASSET_VENDOR and finders.find(path) is None:
+        return settings.ASSET_VENDOR[path][0]
+    return static(path)
+
+
+def get_urls(name):
+    if settings.ASSET_BUNDLES_ENABLED:
+        return [static('bundles/' + name)]
+    return [get_source_url(path) for path in settings.ASSET_BUNDLES[name]]
+
+
+@register.simple_tag
+def asset_bundle(name):
+    if settings.ASSET_BUNDLES_ENABLED:
+        return get_tag(static('bundles/' + name))
+    return format_html_join('\n', '{0}', ((get_source_tag(path), ) for path in settings.ASSET_BUNDLES[name]))
+
+
+@register.simple_tag
+def asset_urls(*names):
+    """ the space separated URLs of the bundles, for a data- attribute """
+    return ' '.join(url for name in names for url in get_urls(name))
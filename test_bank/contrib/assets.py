@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+Static asset pipeline, run by ./manage.py build_assets before collectstatic.
+
+- The third party files of settings.ASSET_VENDOR are downloaded into
+  static/vendor/ and checked against their Subresource Integrity hash.
+- The sources of each of settings.ASSET_BUNDLES are minified, unless they
+  already are, and concatenated into static/bundles/. The relative URLs of
+  the stylesheets are rewritten for their new location.
+
+collectstatic then adds a hash of their content to their names and
+WhiteNoise precompresses them with gzip and Brotli.
+"""
+import base64
+import hashlib
+import os
+import posixpath
+import re
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from rcssmin import cssmin
+from rjsmin import jsmin
+
+
+BUNDLES_PREFIX = 'bundles/'
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+# the URLs which do not point to another static file
+ABSOLUTE_URL_RE = re.compile(r'^(?:[a-z][a-z0-9+.-]*:|/|#)', re.IGNORECASE)
+
+
+class AssetError(Exception):
+    pass
+
+
+def get_static_dir():
+    return settings.STATICFILES_DIRS[0]
+
+
+def get_integrity(data):
+    return 'sha384-' + base64.b64encode(hashlib.sha384(data).digest()).decode()
+
+
+def check_integrity(data, integrity):
+    """ whether data matches a Subresource Integrity hash like 'sha384-...' """
+    algorithm, digest = integrity.split('-', 1)
+    return base64.b64encode(hashlib.new(algorithm, data).digest()).decode() == digest
+
+
+def vendor(path, directory=None):
+    """
+    downloads the ASSET_VENDOR file stored at the static path `path`.
+    Raises AssetError when it does not match its pinned Subresource
+    Integrity hash, or when none is pinned, giving the sha384 hash of the
+    file downloaded.
+    """
+    url, integrity = settings.ASSET_VENDOR[path]
+    with urlopen(url, timeout=30) as response:
+        data = response.read()
+    if not integrity:
+        raise AssetError("{0} has no integrity hash in ASSET_VENDOR, pin {1} once checked".format(
+            path, get_integrity(data),
+        ))
+    if not check_integrity(data, integrity):
+        raise AssetError("{0} does not match its integrity hash {1}".format(url, integrity))
+    target = os.path.join(directory or get_static_dir(), *path.split('/'))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as output:
+        output.write(data)
+
+
+def rewrite_css_urls(css, source, target):
+    """ makes the relative URLs of the stylesheet at static path `source` relative to `target` """
+    source_dir, target_dir = posixpath.dirname(source), posixpath.dirname(target)
+
+    def rewrite(match):
+        quote, url = match.groups()
+        if ABSOLUTE_URL_RE.match(url) or url.startswith('data:'):
+            return match.group(0)
+        path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+        path = posixpath.relpath(posixpath.normpath(posixpath.join(source_dir, path)), target_dir)
+        return 'url({0}{1}{2}{0})'.format(quote, path, suffix)
+
+    return CSS_URL_RE.sub(rewrite, css)
+
+
+def minify(path, content):
+    if '.min.' in path:
+        return content
+    if path.endswith('.js'):
+        return jsmin(content)
+    return cssmin(content)
+
+
+def build_bundle(name, directory=None):
+    """
+    writes the bundle `name` of settings.ASSET_BUNDLES into `directory`,
+    static/bundles by default, returns (size of the sources, size of the bundle)
+    """
+    target = BUNDLES_PREFIX + name
+    parts, size = [], 0
+    for path in settings.ASSET_BUNDLES[name]:
+        source = finders.find(path)
+        if source is None:
+            hint = ", run ./manage.py build_assets --vendor" if path in settings.ASSET_VENDOR else ""
+            raise AssetError("{0} of the {1} bundle is missing{2}".format(path, name, hint))
+        with open(source, encoding='utf-8') as source_file:
+            content = source_file.read()
+        size += len(content.encode())
+        content = minify(path, content).strip()
+        if name.endswith('.css'):
+            content = rewrite_css_urls(content, path, target)
+        parts.append(content)
+    # a script missing its final semicolon must not run into the next one
+    bundle = (';\n' if name.endswith('.js') else '\n').join(parts) + '\n'
+    directory = directory or os.path.join(get_static_dir(), BUNDLES_PREFIX.rstrip('/'))
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), 'w', encoding='utf-8') as output:
+        output.write(bundle)
+    return size, len(bundle.encode())
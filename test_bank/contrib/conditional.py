@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+Conditional GET of the HTML pages: a browser revalidating a page it has
+cached gets a 304 Not Modified, without the page being rendered, while
+nothing it depends on has changed.
+The ETag is the strong validator: it covers the user, the data of the
+page, the CSRF cookie embedded in its forms, the language and the
+deployed code, settings.BUILD_ID. It must be the same in every worker,
+production requires it. Locally, without one, the start of the process
+stands for it. Last-Modified is only precise to the second, and only
+sent for the pages depending on dated data once BUILD_ID is set.
+"""
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+
+# stands for the build locally, see get_build_version
+STARTED_AT = timezone.now()
+
+
+def get_build_version():
+    """ identifies the deployed code, in validators and cache keys """
+    return settings.BUILD_ID or STARTED_AT.isoformat()
+
+
+def get_build_time():
+    """ the earliest Last-Modified of a page: the start of the process without BUILD_ID, else None """
+    return None if settings.BUILD_ID else STARTED_AT
+
+
+def page_validators(request, changed_at=None):
+    """
+    (etag, last_modified) of a page depending on the request user and
+    optionally on data last changed at changed_at. last_modified is None
+    for a page without any date
+    """
+    last_login = getattr(request.user, 'last_login', None)
+    last_modified = max(filter(None, (get_build_time(), changed_at, last_login)), default=None)
+    parts = (
+        get_build_version(), request.user.pk, changed_at and changed_at.isoformat(),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME), get_language(),
+    )
+    etag = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return etag, last_modified
+
+
+def conditional_page(validators=page_validators):
+    """
+    view decorator answering conditional GETs with a 304 when the
+    validators(request, *args, **kwargs) of the page, as returned by
+    page_validators, match the request headers.
+    Pages with pending messages are always rendered, so are the responses
+    other than 200, which get no validators.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or get_messages(request):
+                return view(request, *args, **kwargs)
+            etag, last_modified = validators(request, *args, **kwargs)
+            if last_modified is not None:
+                last_modified = timegm(last_modified.utctimetuple())
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                response['ETag'] = quote_etag(etag)
+                if last_modified is not None:
+                    response['Last-Modified'] = http_date(last_modified)
+            # the page may be stored by the browser but must be revalidated
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+
+from django.conf import settings
+
+from .conditional import get_build_version
+
+
+def fragment_cache(request):
+    """
+    timeout and version of the {% cache %} fragments of the templates:
+    settings.BUILD_ID, so that the workers of a deploy share the fragments
+    and those cached by the previous deploy are not used anymore
+    """
+    return {
+        'FRAGMENT_CACHE_TIMEOUT': settings.FRAGMENT_CACHE_TIMEOUT,
+        'TEMPLATE_VERSION': get_build_version(),
+    }
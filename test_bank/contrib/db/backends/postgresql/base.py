@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""
+PostgreSQL backend checking the persistent connections and optionally
+pooling them per process. It reads two extra keys of the DATABASES entry:
+
+- HEALTH_CHECK_AFTER: a connection idle for that many seconds is checked
+  with SELECT 1 before it is used again, and reopened if the server closed
+  it meanwhile. None never checks them.
+- POOL: {'MAX_SIZE': ..., 'TIMEOUT': ...} to hand the connections back to
+  a pool shared by the threads, or greenlets, of the process when Django
+  closes them, see test_bank.contrib.db.pool. Use it with CONN_MAX_AGE 0.
+  It is required in processes patched by gevent, where each greenlet
+  would keep its own persistent connection.
+"""
+import sys
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from ...pool import ConnectionPool
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.seen_at = None
+        if not self.settings_dict.get('POOL') and self.settings_dict['CONN_MAX_AGE'] != 0 and is_gevent_patched():
+            raise ImproperlyConfigured(
+                "The connections of the {0} database would pile up under gevent, set its POOL "
+                "(DATABASE_POOL_SIZE in production) or a CONN_MAX_AGE of 0".format(self.alias)
+            )
+
+    def get_pool(self):
+        if not self.settings_dict.get('POOL'):
+            return None
+        with pools_lock:
+            if self.alias not in pools:
+                options = self.settings_dict['POOL']
+                pools[self.alias] = ConnectionPool(
+                    options['MAX_SIZE'], options.get('TIMEOUT', 10),
+                    self.settings_dict.get('HEALTH_CHECK_AFTER'), is_connection_usable,
+                )
+            return pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        # the server default for a pooled connection, set again when a new one is opened
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', extensions.ISOLATION_LEVEL_READ_COMMITTED
+        )
+        return pool.get(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+
+    def connect(self):
+        super().connect()
+        self.seen_at = time.monotonic()
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+        if self.is_reusable():
+            pool.put(self.connection)
+        else:
+            pool.discard(self.connection)
+
+    def is_reusable(self):
+        """ whether the connection can be handed to another request, rolling back its transaction """
+        connection = self.connection
+        if connection.closed or self.in_atomic_block or self.get_autocommit() != self.settings_dict['AUTOCOMMIT']:
+            return False
+        status = connection.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_IDLE:
+            return not self.errors_occurred or self.is_usable()
+        if status in (extensions.TRANSACTION_STATUS_INTRANS, extensions.TRANSACTION_STATUS_INERROR):
+            try:
+                connection.rollback()
+            except Exception:
+                return False
+            return True
+        return False
+
+    def close_if_unusable_or_obsolete(self):
+        """
+        called at the start and the end of each request: also checks the
+        connections idle since the previous request for HEALTH_CHECK_AFTER
+        """
+        super().close_if_unusable_or_obsolete()
+        check_after = self.settings_dict.get('HEALTH_CHECK_AFTER')
+        if self.connection is None or check_after is None or self.in_atomic_block:
+            return
+        now = time.monotonic()
+        if now - self.seen_at >= check_after and not self.is_usable():
+            self.close()
+        else:
+            self.seen_at = now
+
+
+def is_gevent_patched():
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('socket')
+
+
+def is_connection_usable(connection):
+    try:
+        connection.cursor().execute("SELECT 1")
+    except Exception:
+        return False
+    return True
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""
+Indexes that cannot be expressed with index_together / db_index, created
+on PostgreSQL by the post_migrate receivers of the apps owning the tables,
+see borrowing.indexes and users.indexes. The tables not migrated yet are
+skipped.
+"""
+
+
+def create_partial_indexes(connection, indexes):
+    """ creates the missing (name, table, columns, condition) partial indexes """
+    table_names = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        for name, table, columns, condition in indexes:
+            if table not in table_names:
+                continue
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS {0} ON {1} ({2}) WHERE {3}".format(
+                    connection.ops.quote_name(name), connection.ops.quote_name(table), columns, condition
+                )
+            )
+
+
+def create_search_indexes(connection, indexes):
+    """
+    creates the missing (name, table, column) indexes of the admin
+    searches with iexact (=field) and istartswith (^field), which compare
+    UPPER(column::text): these expressions are indexed in text_pattern_ops
+    so that prefix LIKEs use the index too
+    """
+    table_names = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        for name, table, column in indexes:
+            if table not in table_names:
+                continue
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS {0} ON {1} ((UPPER({2}::text)) text_pattern_ops)".format(
+                    connection.ops.quote_name(name), connection.ops.quote_name(table),
+                    connection.ops.quote_name(column),
+                )
+            )
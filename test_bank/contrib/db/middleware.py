@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .routers import get_replica, get_stack, route_request_reads
+
+
+class ReplicaReadsMiddleware:
+    """
+    sends the reads of the GET requests to views marked with
+    routers.replica_reads to a replica, until their response is rendered.
+    It must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            del get_stack()[:]
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        primary_if = getattr(view_func, 'replica_reads', None)
+        if primary_if is None or request.method not in ('GET', 'HEAD'):
+            return None
+        route_request_reads(DEFAULT_DB_ALIAS if primary_if(request) else get_replica())
+        return None
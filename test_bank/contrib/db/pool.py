@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+A bounded pool of DB-API connections shared by the threads of a process.
+
+It only relies on threading, so once gevent has patched it the greenlets
+of a gunicorn gevent worker wait on the pool cooperatively rather than
+each opening its own connection.
+"""
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Hands out at most `max_size` connections, waiting up to `timeout`
+    seconds for one to be returned. A connection idle for `check_after`
+    seconds or more is checked with `is_usable` before being handed out
+    again, None never checks them.
+    """
+
+    def __init__(self, max_size, timeout=10, check_after=None, is_usable=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.is_usable = is_usable
+        # (connection, returned at), the last returned is handed out first
+        self.idle = deque()
+        self.size = 0
+        self.condition = threading.Condition()
+
+    def get(self, connect):
+        """ returns an idle connection, or a new one from `connect()` while the pool is not full """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout("No database connection returned within {0}s".format(self.timeout))
+                    self.condition.wait(remaining)
+                if self.idle:
+                    connection, returned_at = self.idle.pop()
+                else:
+                    connection, returned_at = None, None
+                    self.size += 1
+            if connection is None:
+                try:
+                    return connect()
+                except Exception:
+                    self.discard(None)
+                    raise
+            if self.is_healthy(connection, returned_at):
+                return connection
+            self.discard(connection)
+
+    def is_healthy(self, connection, returned_at):
+        if self.check_after is None or self.is_usable is None:
+            return True
+        return time.monotonic() - returned_at < self.check_after or self.is_usable(connection)
+
+    def put(self, connection):
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, connection):
+        """ closes a connection taken from the pool, making room for a new one """
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def close(self):
+        """ closes the idle connections """
+        with self.condition:
+            idle, self.idle = self.idle, deque()
+        for connection, returned_at in idle:
+            self.discard(connection)
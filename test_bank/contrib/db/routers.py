@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""
+Reads from the replicas listed in settings.REPLICA_DATABASES, only where
+asked to: writes, and reads anywhere else, go to the primary.
+
+- read_only() and use_primary(), as context managers or decorators, route
+  the reads of a block of code.
+- replica_reads, or ReplicaReadsMixin, marks views whose GET requests
+  read from a replica; its primary_if(request) option keeps a request on
+  the primary, e.g. so that users read their own recent writes.
+  ReplicaReadsMiddleware applies it.
+
+The routing of a request lasts until its response is rendered, a replica
+is chosen once per block so that its reads are consistent.
+"""
+import random
+import threading
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+_local = threading.local()
+
+
+def get_stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def get_replica():
+    """ one of the replicas, or the primary when there is none """
+    replicas = settings.REPLICA_DATABASES
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+class ReadsFrom(ContextDecorator):
+
+    def __init__(self, get_alias):
+        self.get_alias = get_alias
+
+    def __enter__(self):
+        get_stack().append(self.get_alias())
+
+    def __exit__(self, *exc_info):
+        get_stack().pop()
+
+
+def read_only():
+    """ the reads of the block go to a replica """
+    return ReadsFrom(get_replica)
+
+
+def use_primary():
+    """ the reads of the block go to the primary, within read_only() too """
+    return ReadsFrom(lambda: DEFAULT_DB_ALIAS)
+
+
+def replica_reads(view=None, primary_if=None):
+    """
+    view decorator, used as @replica_reads or
+    @replica_reads(primary_if=callable): the GET requests of the view read
+    from a replica unless primary_if(request) is true
+    """
+    def decorator(view):
+        view.replica_reads = primary_if or (lambda request: False)
+        return view
+    return decorator if view is None else decorator(view)
+
+
+class ReplicaReadsMixin:
+    """ class based views counterpart of replica_reads, primary_if is a staticmethod """
+    primary_if = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return replica_reads(super().as_view(**initkwargs), primary_if=cls.primary_if)
+
+
+def route_request_reads(alias):
+    """ reads go to `alias` until the end of the request, see ReplicaReadsMiddleware """
+    get_stack().append(alias)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        # related objects are read from where the instance was
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        stack = get_stack()
+        return stack[-1] if stack else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same rows as the primary
+        return True
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+from django.db import transaction
+
+
+class NonAtomicRequestsMixin:
+    """
+    class based views counterpart of transaction.non_atomic_requests: the
+    view runs outside of the transaction ATOMIC_REQUESTS wraps requests in,
+    for pages which only read
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return transaction.non_atomic_requests(super().as_view(**initkwargs))
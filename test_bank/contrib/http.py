@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+from django.conf import settings
+
+
+def get_client_ip(request):
+    """
+    the address of the client, as seen by the first of the
+    settings.NUM_PROXIES trusted proxies in front of the app, which each
+    append the address they received the request from to X-Forwarded-For.
+    The entries before are set by the client and cannot be trusted.
+    Returns None when the request did not come through the proxies.
+    """
+    if not settings.NUM_PROXIES:
+        return request.META.get('REMOTE_ADDR')
+    forwarded_for = [
+        address.strip() for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if address.strip()
+    ]
+    if len(forwarded_for) < settings.NUM_PROXIES:
+        return None
+    return forwarded_for[-settings.NUM_PROXIES]
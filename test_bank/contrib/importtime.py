@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""
+Time spent importing the modules loaded by a process, for
+./manage.py importtime.
+
+The command runs this module in a fresh interpreter, which sets Django up
+then imports the module given, under `python -X importtime`:
+
+    python -X importtime -m test_bank.contrib.importtime config.wsgi
+
+Python < 3.7 has no -X importtime, the module then times the function of
+the import system that option instruments and prints the same lines to
+stderr. parse() reads them and aggregate() sums them per installed app.
+"""
+import importlib
+import sys
+import time
+from collections import OrderedDict, namedtuple
+
+
+# times in microseconds, depth is the nesting level of the import
+Import = namedtuple('Import', 'name depth self cumulative')
+
+PREFIX = 'import time:'
+HEADER = PREFIX + ' self [us] | cumulative | imported package'
+LINE = PREFIX + ' {0:>9} | {1:>10} | {2}{3}'
+
+
+def parse(lines):
+    """ returns the Import of each -X importtime line, in the order they were printed """
+    imports = []
+    for line in lines:
+        if not line.startswith(PREFIX) or line.rstrip() == HEADER:
+            continue
+        self_time, cumulative, name = line[len(PREFIX):].split('|', 2)
+        # names are indented by two spaces per level
+        name = name[1:].rstrip()
+        stripped = name.lstrip()
+        imports.append(Import(stripped, (len(name) - len(stripped)) // 2, int(self_time), int(cumulative)))
+    return imports
+
+
+def get_group(name, apps):
+    """ the installed app of the module, the longest match first, else its top level package """
+    for app in apps:
+        if name == app or name.startswith(app + '.'):
+            return app
+    return name.split('.')[0]
+
+
+def aggregate(imports, apps=()):
+    """
+    returns (group, modules, self, cumulative) rows sorted by decreasing
+    cumulative time, a group being an installed app or else a top level
+    package. The cumulative time of a group counts the imports it triggers
+    in other groups, but not twice its own nested imports.
+    """
+    apps = sorted(apps, key=len, reverse=True)
+    groups = OrderedDict()
+    ancestors = []
+    # children are printed before their parent, reversed each import
+    # comes after its ancestors
+    for imported in reversed(imports):
+        del ancestors[imported.depth:]
+        group = get_group(imported.name, apps)
+        modules, self_time, cumulative = groups.get(group, (0, 0, 0))
+        if group not in ancestors:
+            cumulative += imported.cumulative
+        groups[group] = (modules + 1, self_time + imported.self, cumulative)
+        ancestors.append(group)
+    rows = [(group, ) + totals for group, totals in groups.items()]
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def install_timer(stream=sys.stderr):
+    """ prints -X importtime lines by timing importlib._bootstrap._find_and_load """
+    import _frozen_importlib as bootstrap
+    find_and_load = bootstrap._find_and_load
+    # time spent in the imports nested in each import in progress
+    nested = []
+
+    def timed_find_and_load(name, import_):
+        nested.append(0)
+        start = time.perf_counter()
+        try:
+            return find_and_load(name, import_)
+        finally:
+            cumulative = int((time.perf_counter() - start) * 1e6)
+            self_time = cumulative - nested.pop()
+            if nested:
+                nested[-1] += cumulative
+            stream.write(LINE.format(self_time, cumulative, '  ' * len(nested), name) + '\n')
+
+    bootstrap._find_and_load = timed_find_and_load
+    stream.write(HEADER + '\n')
+
+
+def main(module):
+    if 'importtime' not in sys._xoptions:
+        install_timer()
+    import django
+    django.setup()
+    importlib.import_module(module)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
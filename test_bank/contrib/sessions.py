@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from django.conf import settings
+
+
+TOUCHED_KEY = '_touched_at'
+
+
+class SessionTouchMiddleware:
+    """
+    Sessions are only saved when they are modified, so they would expire
+    SESSION_COOKIE_AGE after the login however active the user is, while
+    SESSION_SAVE_EVERY_REQUEST writes them on every request.
+    This middleware extends the active sessions by saving them at most once
+    every SESSION_TOUCH_INTERVAL seconds. It must come after
+    SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        session = getattr(request, 'session', None)
+        if session is None or session.is_empty():
+            return response
+        now = int(time.time())
+        if session.modified:
+            # the session is saved anyway
+            session[TOUCHED_KEY] = now
+        elif session.session_key and now - session.get(TOUCHED_KEY, 0) >= settings.SESSION_TOUCH_INTERVAL:
+            session[TOUCHED_KEY] = now
+        return response
+
+
+def mark_touched(sender, request, user, **kwargs):
+    """ user_logged_in receiver, the login saves the session without going through the middleware in tests """
+    request.session[TOUCHED_KEY] = int(time.time())
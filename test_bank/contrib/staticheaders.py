@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+from whitenoise.base import WhiteNoise
+
+
+CACHED_FOREVER = 'public, max-age={0}'.format(WhiteNoise.FOREVER)
+
+
+def add_immutable_header(headers, path, url):
+    """
+    WHITENOISE_ADD_HEADERS_FUNCTION: the files WhiteNoise caches forever
+    have a hash of their content in their name, browsers need not
+    revalidate them on reload either
+    """
+    if headers.get('Cache-Control') == CACHED_FOREVER:
+        headers['Cache-Control'] = CACHED_FOREVER + ', immutable'
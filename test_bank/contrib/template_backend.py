@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+Django template backend timing the rendering of templates, whether by
+TemplateResponse or by render() within a view, for the query budget
+middleware. Templates rendered while another one is, such as the forms
+of crispy_forms, are counted in the time of the outer one.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from django.template import TemplateDoesNotExist
+from django.template.backends import django
+
+
+_state = threading.local()
+
+
+def reset_render_time():
+    _state.total = 0
+    _state.depth = 0
+
+
+def get_render_time():
+    """ seconds spent rendering templates by the current thread since reset_render_time """
+    return getattr(_state, 'total', 0)
+
+
+@contextmanager
+def timed_render():
+    depth = getattr(_state, 'depth', 0)
+    _state.depth = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _state.depth = depth
+        if not depth:
+            _state.total = get_render_time() + time.perf_counter() - start
+
+
+class Template(django.Template):
+
+    def render(self, context=None, request=None):
+        with timed_render():
+            return super().render(context, request)
+
+
+class DjangoTemplates(django.DjangoTemplates):
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django.reraise(exc, self)
@@ -0,0 +1,128 @@
+import base64
+import hashlib
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.template import Context, Template
+from django.test.utils import override_settings
+from test_plus.test import TestCase
+
+from ..assets import AssetError, build_bundle, check_integrity, get_integrity, rewrite_css_urls, vendor
+from ..staticheaders import CACHED_FOREVER, add_immutable_header
+
+
+BUNDLES = {
+    'test.js': ['js/csrf_ajax.js', 'js/intlTelInput.min.js'],
+    'test.css': ['css/font-awesome.min.css', 'css/project.css'],
+}
+VENDOR = {'vendor/lib.min.js': ('https://cdn.example.com/lib.min.js', 'sha384-abc')}
+
+
+class TestAssets(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def read(self, name):
+        with open(os.path.join(self.directory, name), encoding='utf-8') as bundle:
+            return bundle.read()
+
+    def test_check_integrity(self):
+        integrity = 'sha384-' + base64.b64encode(hashlib.sha384(b'data').digest()).decode()
+        self.assertTrue(check_integrity(b'data', integrity))
+        self.assertFalse(check_integrity(b'other', integrity))
+
+    @mock.patch('test_bank.contrib.assets.urlopen', side_effect=lambda url, timeout: BytesIO(b'data'))
+    def test_vendor(self, urlopen):
+        """ files are only vendored once their pinned hash matches """
+        target = os.path.join(self.directory, 'vendor', 'lib.min.js')
+        pinned = {'vendor/lib.min.js': ('https://cdn.example.com/lib.min.js', None)}
+        with override_settings(ASSET_VENDOR=pinned):
+            with self.assertRaisesMessage(AssetError, get_integrity(b'data')):
+                vendor('vendor/lib.min.js', self.directory)
+        self.assertFalse(os.path.exists(target))
+        with override_settings(ASSET_VENDOR=VENDOR):
+            with self.assertRaisesMessage(AssetError, "does not match"):
+                vendor('vendor/lib.min.js', self.directory)
+        pinned['vendor/lib.min.js'] = ('https://cdn.example.com/lib.min.js', get_integrity(b'data'))
+        with override_settings(ASSET_VENDOR=pinned):
+            vendor('vendor/lib.min.js', self.directory)
+        self.assertEqual(self.read('vendor/lib.min.js'), 'data')
+
+    def test_rewrite_css_urls(self):
+        css = (
+            "a{background:url('../images/flags.png')} b{src:url(../fonts/f.woff2?v=4#x)} "
+            "c{background:url(data:image/png;base64,AA==)} d{background:url(\"/static/x.png\")} "
+            "e{background:url(icons/i.svg)}"
+        )
+        self.assertEqual(rewrite_css_urls(css, 'css/project.css', 'bundles/base.css'), (
+            "a{background:url('../images/flags.png')} b{src:url(../fonts/f.woff2?v=4#x)} "
+            "c{background:url(data:image/png;base64,AA==)} d{background:url(\"/static/x.png\")} "
+            "e{background:url(../css/icons/i.svg)}"
+        ))
+
+    @override_settings(ASSET_BUNDLES=BUNDLES)
+    def test_build_bundle(self):
+        size, bundle_size = build_bundle('test.js', self.directory)
+        self.assertLess(bundle_size, size)
+        bundle = self.read('test.js')
+        self.assertNotIn('\n\n', bundle)
+        self.assertLess(bundle.index('csrftoken'), bundle.index('intlTelInput'))
+        build_bundle('test.css', self.directory)
+        self.assertIn("url('../fonts/fontawesome-webfont.woff2?v=4.7.0')", self.read('test.css'))
+
+    @override_settings(ASSET_BUNDLES={'test.js': ['vendor/lib.min.js']}, ASSET_VENDOR=VENDOR)
+    def test_missing_vendored_file(self):
+        with self.assertRaisesMessage(AssetError, "build_assets --vendor"):
+            build_bundle('test.js', self.directory)
+
+    @override_settings(ASSET_BUNDLES=BUNDLES)
+    def test_command(self):
+        stdout = StringIO()
+        call_command('build_assets', output=self.directory, stdout=stdout)
+        self.assertIn("bundles/test.js: 2 files", stdout.getvalue())
+        with self.settings(ASSET_BUNDLES={'test.js': ['js/nope.js']}):
+            with self.assertRaises(CommandError):
+                call_command('build_assets', output=self.directory, stdout=stdout)
+
+    def render(self, name):
+        return Template("{% load assets %}{% asset_bundle '" + name + "' %}").render(Context())
+
+    @override_settings(ASSET_BUNDLES=dict(BUNDLES, **{'vendor.js': ['vendor/lib.min.js', 'js/project.js']}))
+    def test_template_tag(self):
+        with self.settings(ASSET_BUNDLES_ENABLED=True):
+            self.assertEqual(self.render('test.css'), '<link rel="stylesheet" href="/static/bundles/test.css">')
+        with self.settings(ASSET_BUNDLES_ENABLED=False, ASSET_VENDOR=VENDOR):
+            self.assertEqual(self.render('test.js'), (
+                '<script src="/static/js/csrf_ajax.js"></script>\n'
+                '<script src="/static/js/intlTelInput.min.js"></script>'
+            ))
+            # not downloaded yet
+            self.assertEqual(self.render('vendor.js'), (
+                '<script src="https://cdn.example.com/lib.min.js" integrity="sha384-abc" crossorigin="anonymous">'
+                '</script>\n<script src="/static/js/project.js"></script>'
+            ))
+
+    @override_settings(ASSET_BUNDLES=dict(BUNDLES, **{'vendor.js': ['vendor/lib.min.js']}), ASSET_VENDOR=VENDOR)
+    def test_asset_urls(self):
+        template = Template("{% load assets %}{% asset_urls 'test.css' 'vendor.js' %}")
+        with self.settings(ASSET_BUNDLES_ENABLED=True):
+            self.assertEqual(template.render(Context()), '/static/bundles/test.css /static/bundles/vendor.js')
+        with self.settings(ASSET_BUNDLES_ENABLED=False):
+            self.assertEqual(template.render(Context()), (
+                '/static/css/font-awesome.min.css /static/css/project.css https://cdn.example.com/lib.min.js'
+            ))
+
+    def test_immutable_header(self):
+        headers = {'Cache-Control': CACHED_FOREVER}
+        add_immutable_header(headers, '/static/bundles/base.0123456789ab.js', '/static/bundles/base.0123456789ab.js')
+        self.assertEqual(headers['Cache-Control'], CACHED_FOREVER + ', immutable')
+        headers = {'Cache-Control': 'public, max-age=60'}
+        add_immutable_header(headers, '/static/favicon.png', '/static/favicon.png')
+        self.assertEqual(headers['Cache-Control'], 'public, max-age=60')
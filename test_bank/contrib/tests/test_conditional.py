@@ -0,0 +1,48 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+from test_plus.test import TestCase
+
+from .. import conditional
+
+
+class TestPageValidators(TestCase):
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.user = AnonymousUser()
+
+    def restarted(self):
+        """ the validators of a process started later, e.g. another worker """
+        return mock.patch.object(conditional, 'STARTED_AT', conditional.STARTED_AT + timedelta(seconds=5))
+
+    @override_settings(BUILD_ID='0123abc')
+    def test_shared_by_processes(self):
+        validators = conditional.page_validators(self.request)
+        with self.restarted():
+            self.assertEqual(conditional.page_validators(self.request), validators)
+        self.assertIsNone(validators[1])
+        changed_at = timezone.now()
+        self.assertEqual(conditional.page_validators(self.request, changed_at)[1], changed_at)
+
+    @override_settings(BUILD_ID='')
+    def test_local_process(self):
+        etag, last_modified = conditional.page_validators(self.request)
+        self.assertEqual(last_modified, conditional.STARTED_AT)
+        with self.restarted():
+            self.assertNotEqual(conditional.page_validators(self.request)[0], etag)
+
+    @override_settings(BUILD_ID='0123abc')
+    def test_without_last_modified(self):
+        view = conditional.conditional_page()(lambda request: HttpResponse("page"))
+        with mock.patch('test_bank.contrib.conditional.get_messages', return_value=[]):
+            response = view(self.request)
+            self.assertNotIn('Last-Modified', response)
+            revalidation = RequestFactory().get('/', HTTP_IF_NONE_MATCH=response['ETag'])
+            revalidation.user = self.request.user
+            self.assertEqual(view(revalidation).status_code, 304)
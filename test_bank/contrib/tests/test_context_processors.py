@@ -0,0 +1,19 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from test_plus.test import TestCase
+
+from .. import conditional
+from ..context_processors import fragment_cache
+
+
+class TestFragmentCache(TestCase):
+
+    @override_settings(BUILD_ID='0123abc')
+    def test_version_shared_by_processes(self):
+        request = RequestFactory().get('/')
+        self.assertEqual(fragment_cache(request)['TEMPLATE_VERSION'], '0123abc')
+        with mock.patch.object(conditional, 'STARTED_AT', conditional.STARTED_AT + timedelta(seconds=5)):
+            self.assertEqual(fragment_cache(request)['TEMPLATE_VERSION'], '0123abc')
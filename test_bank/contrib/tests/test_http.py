@@ -0,0 +1,21 @@
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from test_plus.test import TestCase
+
+from ..http import get_client_ip
+
+
+class TestGetClientIp(TestCase):
+
+    def get(self, **headers):
+        return RequestFactory().get('/', REMOTE_ADDR='10.1.1.1', **headers)
+
+    def test_no_proxy(self):
+        self.assertEqual(get_client_ip(self.get(HTTP_X_FORWARDED_FOR='203.0.113.1')), '10.1.1.1')
+
+    @override_settings(NUM_PROXIES=2)
+    def test_proxies(self):
+        request = self.get(HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.1, 10.0.0.1')
+        self.assertEqual(get_client_ip(request), '203.0.113.1')
+        self.assertIsNone(get_client_ip(self.get(HTTP_X_FORWARDED_FOR='10.0.0.1')))
+        self.assertIsNone(get_client_ip(self.get()))
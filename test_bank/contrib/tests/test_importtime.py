@@ -0,0 +1,53 @@
+from io import StringIO
+
+from django.core.management import call_command
+from test_plus.test import TestCase
+
+from ..importtime import Import, aggregate, parse
+
+
+OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     numpy.core
+import time:        50 |        150 |   numpy
+import time:        20 |        170 | test_bank.borrowing.pricing
+import time:        30 |         30 |   test_bank.borrowing.schedule
+import time:        10 |         40 | test_bank.borrowing.views
+some warning
+import time:        25 |         25 | numpy.testing
+"""
+
+
+class TestImportTime(TestCase):
+
+    def test_parse(self):
+        imports = parse(OUTPUT.splitlines())
+        self.assertEqual(len(imports), 6)
+        self.assertEqual(imports[0], Import('numpy.core', 2, 100, 100))
+        self.assertEqual(imports[2], Import('test_bank.borrowing.pricing', 0, 20, 170))
+
+    def test_aggregate(self):
+        rows = aggregate(parse(OUTPUT.splitlines()), ['test_bank.borrowing'])
+        self.assertEqual(rows, [
+            # nested imports of an app are not counted twice
+            ('test_bank.borrowing', 3, 60, 210),
+            ('numpy', 3, 175, 175),
+        ])
+
+    def test_command_groups_per_app(self):
+        """ the project apps are installed as AppConfig paths, e.g. test_bank.users.apps.UsersConfig """
+        stdout = StringIO()
+        call_command('importtime', module='config.urls', limit=10000, stdout=stdout)
+        groups = [line.split()[0] for line in stdout.getvalue().splitlines()[1:-1]]
+        self.assertIn('test_bank.users', groups)
+        self.assertIn('test_bank.borrowing', groups)
+        self.assertIn('test_bank.outbox', groups)
+
+    def test_command(self):
+        """ the views and admin only import numpy once a loan is priced """
+        stdout = StringIO()
+        call_command('importtime', module='config.urls', by_module=True, limit=10000, stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn('test_bank.borrowing.views', output)
+        self.assertIn('test_bank.borrowing.admin', output)
+        self.assertNotIn('numpy', output)
+        self.assertRegex(output.splitlines()[-1], r'^\d+ modules imported in [\d.]+ ms$')
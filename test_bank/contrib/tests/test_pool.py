@@ -0,0 +1,64 @@
+import threading
+
+from test_plus.test import TestCase
+
+from ..db.pool import ConnectionPool, PoolTimeout
+
+
+class Connection:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(TestCase):
+
+    def test_reuse(self):
+        pool = ConnectionPool(max_size=2)
+        connection = pool.get(Connection)
+        pool.put(connection)
+        self.assertIs(pool.get(Connection), connection)
+        self.assertIsNot(pool.get(Connection), connection)
+        self.assertEqual(pool.size, 2)
+
+    def test_timeout(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.get(Connection)
+        with self.assertRaises(PoolTimeout):
+            pool.get(Connection)
+
+    def test_wait_for_returned_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        connection = pool.get(Connection)
+        threading.Timer(0.01, pool.put, [connection]).start()
+        self.assertIs(pool.get(Connection), connection)
+
+    def test_health_check(self):
+        pool = ConnectionPool(max_size=1, check_after=0, is_usable=lambda connection: False)
+        connection = pool.get(Connection)
+        pool.put(connection)
+        self.assertIsNot(pool.get(Connection), connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_failed_connect(self):
+        pool = ConnectionPool(max_size=1)
+
+        def connect():
+            raise OSError("refused")
+
+        with self.assertRaises(OSError):
+            pool.get(connect)
+        self.assertEqual(pool.size, 0)
+        pool.get(Connection)
+
+    def test_close(self):
+        pool = ConnectionPool(max_size=2)
+        connection = pool.get(Connection)
+        pool.put(connection)
+        pool.close()
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.size, 0)
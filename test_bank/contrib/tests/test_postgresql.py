@@ -0,0 +1,87 @@
+from unittest import mock, skipIf
+
+from django.core.exceptions import ImproperlyConfigured
+from test_plus.test import TestCase
+
+try:
+    from psycopg2 import OperationalError, extensions
+    from ..db.backends.postgresql.base import DatabaseWrapper
+except ImportError:
+    DatabaseWrapper = None
+
+
+def get_wrapper(**settings):
+    settings_dict = {
+        'ENGINE': 'test_bank.contrib.db.backends.postgresql', 'NAME': 'test_bank', 'USER': '', 'PASSWORD': '',
+        'HOST': '', 'PORT': '', 'OPTIONS': {}, 'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False,
+        'CONN_MAX_AGE': 60, 'TIME_ZONE': None, 'HEALTH_CHECK_AFTER': 30,
+    }
+    settings_dict.update(settings)
+    wrapper = DatabaseWrapper(settings_dict, alias='mocked')
+    # an open connection, idle in autocommit mode
+    wrapper.connection = mock.Mock(closed=0)
+    wrapper.connection.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_IDLE
+    wrapper.autocommit = True
+    wrapper.seen_at = 0
+    return wrapper
+
+
+@skipIf(DatabaseWrapper is None, "psycopg2 is not installed")
+class TestDatabaseWrapper(TestCase):
+
+    def test_is_reusable(self):
+        wrapper = get_wrapper()
+        self.assertTrue(wrapper.is_reusable())
+        wrapper.errors_occurred = True
+        wrapper.connection.cursor.return_value.execute.side_effect = OperationalError
+        self.assertFalse(wrapper.is_reusable())
+        wrapper = get_wrapper()
+        wrapper.connection.closed = 1
+        self.assertFalse(wrapper.is_reusable())
+        wrapper = get_wrapper()
+        wrapper.autocommit = False
+        self.assertFalse(wrapper.is_reusable())
+
+    def test_is_reusable_rolls_back(self):
+        wrapper = get_wrapper()
+        wrapper.connection.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_INERROR
+        self.assertTrue(wrapper.is_reusable())
+        wrapper.connection.rollback.assert_called_once_with()
+        wrapper.connection.rollback.side_effect = OperationalError
+        self.assertFalse(wrapper.is_reusable())
+        # a query is running
+        wrapper.connection.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_ACTIVE
+        self.assertFalse(wrapper.is_reusable())
+
+    @mock.patch('time.monotonic', return_value=100)
+    def test_health_check(self, monotonic):
+        wrapper = get_wrapper()
+        cursor = wrapper.connection.cursor.return_value
+        # idle for less than HEALTH_CHECK_AFTER
+        wrapper.seen_at = 80
+        wrapper.close_if_unusable_or_obsolete()
+        cursor.execute.assert_not_called()
+        self.assertEqual(wrapper.seen_at, 100)
+        wrapper.seen_at = 60
+        wrapper.close_if_unusable_or_obsolete()
+        cursor.execute.assert_called_once_with("SELECT 1")
+        self.assertEqual(wrapper.seen_at, 100)
+        # the server closed the connection meanwhile
+        connection = wrapper.connection
+        connection.cursor.return_value.execute.side_effect = OperationalError
+        wrapper.seen_at = 60
+        wrapper.close_if_unusable_or_obsolete()
+        self.assertIsNone(wrapper.connection)
+        connection.close.assert_called_once_with()
+
+    def test_health_check_disabled(self):
+        wrapper = get_wrapper(HEALTH_CHECK_AFTER=None)
+        wrapper.close_if_unusable_or_obsolete()
+        wrapper.connection.cursor.assert_not_called()
+
+    @mock.patch('test_bank.contrib.db.backends.postgresql.base.is_gevent_patched', return_value=True)
+    def test_gevent_requires_pool(self, is_gevent_patched):
+        with self.assertRaises(ImproperlyConfigured):
+            get_wrapper()
+        get_wrapper(CONN_MAX_AGE=0)
+        get_wrapper(POOL={'MAX_SIZE': 2})
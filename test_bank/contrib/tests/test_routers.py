@@ -0,0 +1,50 @@
+from django.db import connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from test_plus.test import TestCase
+
+from test_bank.users.models import User
+from test_bank.users.tests.factories import UserFactory
+from ..db.routers import read_only, use_primary
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class TestReplicaRouter(TestCase):
+    multi_db = True
+
+    def setUp(self):
+        self.user = UserFactory()
+
+    def test_reads_go_to_primary(self):
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_read_only(self):
+        with read_only():
+            self.assertEqual(User.objects.count(), 0)
+            with use_primary():
+                self.assertEqual(User.objects.count(), 1)
+            # writes go to the primary
+            UserFactory()
+            self.assertEqual(User.objects.count(), 0)
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_decorator(self):
+        @read_only()
+        def count():
+            return User.objects.count()
+
+        self.assertEqual(count(), 0)
+        self.assertEqual(count(), 0)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_related_objects_read_with_instance(self):
+        User.objects.using('replica').bulk_create([UserFactory.build(username='replicated')])
+        with read_only():
+            user = User.objects.get(username='replicated')
+        with CaptureQueriesContext(connections['replica']) as context:
+            user.emailaddress_set.count()
+        self.assertEqual(len(context.captured_queries), 1)
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_without_replicas(self):
+        with read_only():
+            self.assertEqual(User.objects.count(), 1)
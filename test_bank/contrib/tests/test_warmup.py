@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.template import engines
+from django.test.utils import override_settings
+from django.urls import get_resolver
+from test_plus.test import TestCase
+
+from ..warmup import compile_templates, compile_urls
+
+
+# the test settings cache the templates, as production does
+UNCACHED_TEMPLATES = [dict(settings.TEMPLATES[0], OPTIONS=dict(settings.TEMPLATES[0]['OPTIONS'], loaders=[
+    'django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader',
+]))]
+
+
+class TestWarmUp(TestCase):
+
+    def test_compile_templates(self):
+        self.assertGreater(compile_templates(), 30)
+        cached = {key.split('-')[0] for key in engines['django'].engine.template_loaders[0].get_template_cache}
+        self.assertIn('borrowing/home.html', cached)
+        self.assertIn('borrowing/email/loan_status_message.txt', cached)
+
+    @override_settings(TEMPLATES=UNCACHED_TEMPLATES)
+    def test_without_cached_loader(self):
+        self.assertEqual(compile_templates(), 0)
+
+    def test_compile_urls(self):
+        self.assertGreater(compile_urls(), 20)
+        self.assertTrue(get_resolver()._populated)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""
+Warms a worker up before its first request: compiles the templates of the
+project into the cached template loader and the URL patterns, so that the
+first request of a worker is not slower than the next ones.
+config/wsgi.py calls warm_up() once the application is loaded, in every
+gunicorn worker, or once in the master with --preload.
+"""
+import logging
+import os
+import time
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+from django.urls import RegexURLResolver, get_resolver
+
+
+logger = logging.getLogger('test_bank.warmup')
+
+
+def get_template_names(directory):
+    for root, dirs, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith(('.html', '.txt')):
+                yield os.path.relpath(os.path.join(root, name), directory).replace(os.sep, '/')
+
+
+def compile_templates():
+    """
+    loads the templates of the DIRS of the engines caching their templates,
+    returns the number compiled
+    """
+    count = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        if not any(isinstance(loader, CachedLoader) for loader in backend.engine.template_loaders):
+            continue
+        for directory in backend.engine.dirs:
+            for name in get_template_names(directory):
+                try:
+                    backend.get_template(name)
+                except TemplateSyntaxError:
+                    logger.exception("Template %s does not compile", name)
+                else:
+                    count += 1
+    return count
+
+
+def compile_urls(resolver=None):
+    """ compiles the URL patterns and populates the reverse lookups, returns the number of patterns """
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict
+    count = 0
+    for pattern in resolver.url_patterns:
+        pattern.regex
+        if isinstance(pattern, RegexURLResolver):
+            count += compile_urls(pattern)
+        else:
+            count += 1
+    return count
+
+
+def warm_up():
+    start = time.perf_counter()
+    templates, urls = compile_templates(), compile_urls()
+    logger.info(
+        "Compiled %s templates and %s URL patterns in %.1fms", templates, urls, (time.perf_counter() - start) * 1000
+    )
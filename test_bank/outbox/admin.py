@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+from django.contrib import admin
+from django.utils import timezone
+
+from test_bank.contrib.admin import HighScaleAdminMixin
+from .models import OutboundMessage
+
+
+class OutboundMessageAdmin(HighScaleAdminMixin, admin.ModelAdmin):
+    list_display = ('pk', 'channel', 'recipient', 'subject', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'channel', 'created_at')
+    readonly_fields = ('claimed_at', 'claim_token', 'sent_at', 'last_error')
+    actions = ['retry_messages']
+
+    def retry_messages(self, request, queryset):
+        # expired messages, e.g. verification codes, must not be sent late;
+        # failed ones still expire at the same time
+        retried = queryset.filter(status=OutboundMessage.FAILED).update(
+            status=OutboundMessage.PENDING, next_attempt_at=timezone.now(), attempts=0,
+        )
+        self.message_user(request, "{0} messages queued again".format(retried))
+    retry_messages.short_description = "Send selected failed messages again"
+
+
+admin.site.register(OutboundMessage, OutboundMessageAdmin)
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+from django.apps import AppConfig
+
+
+class OutboxConfig(AppConfig):
+    name = 'test_bank.outbox'
+    verbose_name = "Outbox"
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""
+Workers sending the outbox.
+
+A worker claims a batch of due messages with a guarded UPDATE, so that
+concurrent workers never send the same message, hands them to the
+providers of their channels and records the outcome. A failed message is
+retried after OUTBOX_RETRY_DELAY seconds, doubled at each attempt, until
+OUTBOX_MAX_ATTEMPTS. The claim of a worker which died lapses after
+OUTBOX_LEASE seconds.
+"""
+import logging
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboundMessage
+
+
+logger = logging.getLogger('test_bank.outbox')
+
+
+def get_provider(channel):
+    return import_string(settings.OUTBOX_PROVIDERS[channel])()
+
+
+def claim_batch(size):
+    """ returns (claim token, messages) for up to `size` due messages, oldest first """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    pks = list(OutboundMessage.objects.due(now).order_by('next_attempt_at').values_list('pk', flat=True)[:size])
+    if not pks:
+        return token, []
+    # the rows claimed meanwhile by another worker are no longer due
+    OutboundMessage.objects.due(now).filter(pk__in=pks).update(
+        status=OutboundMessage.SENDING, claimed_at=now, claim_token=token,
+    )
+    return token, list(OutboundMessage.objects.filter(claim_token=token).order_by('pk'))
+
+
+def get_retry_delay(attempts):
+    return timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def deliver(token, messages):
+    """ sends claimed messages, batched by channel, returns the numbers of messages (sent, failed) """
+    now = timezone.now()
+    by_channel = defaultdict(list)
+    expired = []
+    for message in messages:
+        if message.expires_at and message.expires_at <= now:
+            expired.append(message.pk)
+        else:
+            by_channel[message.channel].append(message)
+
+    sent, failed = [], []
+    for channel, batch in sorted(by_channel.items()):
+        try:
+            errors = get_provider(channel).send_messages(batch)
+        except Exception as error:
+            logger.exception("Sending %s %s messages failed", len(batch), channel)
+            errors = [str(error) or error.__class__.__name__] * len(batch)
+        for message, error in zip(batch, errors):
+            if error is None:
+                sent.append(message.pk)
+            else:
+                failed.append((message, error))
+
+    # a worker whose claim lapsed must not overwrite the outcome of the next one
+    claimed = OutboundMessage.objects.filter(claim_token=token)
+    done = timezone.now()
+    if sent:
+        claimed.filter(pk__in=sent).update(
+            status=OutboundMessage.SENT, sent_at=done, attempts=F('attempts') + 1, claim_token='',
+        )
+    if expired:
+        claimed.filter(pk__in=expired).update(status=OutboundMessage.EXPIRED, claim_token='')
+    for message, error in failed:
+        attempts = message.attempts + 1
+        logger.warning("Sending message %s failed, attempt %s: %s", message.pk, attempts, error)
+        claimed.filter(pk=message.pk).update(
+            status=OutboundMessage.FAILED if attempts >= settings.OUTBOX_MAX_ATTEMPTS else OutboundMessage.PENDING,
+            attempts=attempts, next_attempt_at=done + get_retry_delay(attempts), last_error=error,
+            claim_token='',
+        )
+    return len(sent), len(failed)
+
+
+def drain_batches(batch_size):
+    """ claims and delivers batches until no message is due, returns (sent, failed) """
+    sent = failed = 0
+    while True:
+        token, messages = claim_batch(batch_size)
+        if not messages:
+            return sent, failed
+        batch_sent, batch_failed = deliver(token, messages)
+        sent, failed = sent + batch_sent, failed + batch_failed
+
+
+def drain_in_thread(batch_size):
+    try:
+        return drain_batches(batch_size)
+    finally:
+        # each thread opened its own database connection
+        connection.close()
+
+
+def drain(batch_size=None, workers=1):
+    """
+    sends every due message, with `workers` threads claiming batches of
+    `batch_size` messages concurrently -- providers mostly wait on the
+    network. Returns the numbers of messages (sent, failed).
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    if workers <= 1:
+        return drain_batches(batch_size)
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(drain_in_thread, [batch_size] * workers))
+    return sum(sent for sent, failed in results), sum(failed for sent, failed in results)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from test_bank.outbox.dispatch import drain
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends the messages waiting in the outbox in batches, with a pool of "
+        "threads, then exits -- or keeps polling the outbox with --loop"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', dest='batch_size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            '--workers', dest='workers', type=int, default=4,
+            help="Number of threads sending batches concurrently",
+        )
+        parser.add_argument(
+            '--loop', action='store_true', dest='loop', default=False,
+            help="Keep polling the outbox until interrupted",
+        )
+        parser.add_argument(
+            '--interval', dest='interval', type=float, default=2,
+            help="Seconds between two polls of an empty outbox with --loop",
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            raise CommandError("SQLite does not support concurrent writers, use --workers 1")
+        while True:
+            sent, failed = drain(options['batch_size'], workers)
+            if sent or failed or not options['loop']:
+                self.stdout.write("{0} messages sent, {1} failed".format(sent, failed))
+            if not options['loop']:
+                return
+            if not (sent or failed):
+                time.sleep(options['interval'])
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Model, QuerySet, CharField, TextField, DateTimeField, PositiveSmallIntegerField, Q,
+)
+from django.utils import timezone
+
+
+class OutboundMessageQuerySet(QuerySet):
+
+    def enqueue_sms(self, phone_number, body, expires_at=None):
+        """ queues a text message, dropped if it could not be sent before expires_at """
+        return self.enqueue(OutboundMessage(
+            channel=OutboundMessage.SMS, recipient=phone_number, body=body, expires_at=expires_at,
+        ))
+
+    def enqueue_email(self, subject, body, from_email, recipient, html_body=''):
+        return self.enqueue(OutboundMessage(
+            channel=OutboundMessage.EMAIL, recipient=recipient, subject=subject, body=body,
+            html_body=html_body, sender=from_email or '',
+        ))
+
+    def enqueue(self, *messages):
+        """
+        saves the messages in a single INSERT, they are sent by
+        ./manage.py drain_outbox once the transaction commits
+        """
+        messages = self.bulk_create(messages)
+        if settings.OUTBOX_SEND_ON_COMMIT:
+            from .dispatch import drain
+            transaction.on_commit(drain, using=self.db)
+        return messages
+
+    def due(self, now=None):
+        """ messages to be sent now, including those whose claim has lapsed """
+        now = now or timezone.now()
+        return self.filter(
+            Q(status=OutboundMessage.PENDING, next_attempt_at__lte=now) |
+            Q(status=OutboundMessage.SENDING, claimed_at__lte=now - timedelta(seconds=settings.OUTBOX_LEASE))
+        )
+
+
+class OutboundMessage(Model):
+    """
+    A text message or email waiting to be sent, or kept as a record once
+    it has been, by outbox.dispatch through the provider of its channel
+    """
+    SMS, EMAIL = 'sms', 'email'
+    CHANNEL_CHOICES = ((SMS, 'SMS'), (EMAIL, 'Email'))
+    PENDING, SENDING, SENT, FAILED, EXPIRED = range(5)
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'), (SENDING, 'Sending'), (SENT, 'Sent'),
+        (FAILED, 'Failed'), (EXPIRED, 'Expired'),
+    )
+
+    channel = CharField(max_length=8, choices=CHANNEL_CHOICES)
+    recipient = CharField(max_length=254)
+    sender = CharField(max_length=254, blank=True)
+    subject = CharField(max_length=255, blank=True)
+    body = TextField(blank=True)
+    html_body = TextField(blank=True)
+    status = PositiveSmallIntegerField(default=PENDING, choices=STATUS_CHOICES)
+    attempts = PositiveSmallIntegerField(default=0)
+    last_error = TextField(blank=True)
+    created_at = DateTimeField(default=timezone.now, db_index=True)
+    next_attempt_at = DateTimeField(default=timezone.now)
+    expires_at = DateTimeField(blank=True, null=True)
+    # set by the worker sending the message, see outbox.dispatch.claim_batch
+    claimed_at = DateTimeField(blank=True, null=True)
+    claim_token = CharField(max_length=32, blank=True, db_index=True)
+    sent_at = DateTimeField(blank=True, null=True)
+
+    objects = OutboundMessageQuerySet.as_manager()
+
+    def __str__(self):
+        return "{0} to {1}".format(self.get_channel_display(), self.recipient)
+
+    class Meta:
+        # workers look up the due messages
+        index_together = [
+            ('status', 'next_attempt_at'),
+            ('status', 'claimed_at'),
+        ]
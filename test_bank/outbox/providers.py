@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""
+Providers deliver the messages of a channel, as configured in
+settings.OUTBOX_PROVIDERS. send_messages receives a batch of
+OutboundMessage and returns, in the same order, None for each message
+sent or the error that prevented it. Exceptions fail the whole batch.
+"""
+import sys
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+
+# messages sent through LocmemProvider, the way django.core.mail.outbox works
+sent_messages = []
+
+
+class BaseProvider:
+
+    def send_messages(self, messages):
+        raise NotImplementedError
+
+
+class UnconfiguredProvider(BaseProvider):
+    """ fails every message, for channels without a gateway yet """
+
+    def send_messages(self, messages):
+        return ["No provider is configured for this channel"] * len(messages)
+
+
+class ConsoleProvider(BaseProvider):
+    """ writes the messages to stdout, for development """
+
+    def send_messages(self, messages):
+        for message in messages:
+            sys.stdout.write("{0} sent to {1}\n{2}{3}\n".format(
+                message.get_channel_display(), message.recipient,
+                message.subject + "\n" if message.subject else "", message.body,
+            ))
+        return [None] * len(messages)
+
+
+class LocmemProvider(BaseProvider):
+    """ appends the messages to providers.sent_messages, for tests """
+
+    def send_messages(self, messages):
+        sent_messages.extend(messages)
+        return [None] * len(messages)
+
+
+class EmailProvider(BaseProvider):
+    """ sends emails through the EMAIL_BACKEND, over a single connection per batch """
+
+    def send_messages(self, messages):
+        errors = []
+        with get_connection() as connection:
+            for message in messages:
+                email = EmailMultiAlternatives(
+                    message.subject, message.body, message.sender or settings.DEFAULT_FROM_EMAIL,
+                    [message.recipient], connection=connection,
+                )
+                if message.html_body:
+                    email.attach_alternative(message.html_body, 'text/html')
+                try:
+                    email.send()
+                except Exception as error:
+                    errors.append(str(error) or error.__class__.__name__)
+                else:
+                    errors.append(None)
+        return errors
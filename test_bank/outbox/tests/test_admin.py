@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.urlresolvers import reverse
+from django.utils import timezone
+from test_plus.test import TestCase
+
+from test_bank.users.tests.factories import UserFactory
+from ..models import OutboundMessage
+
+
+class TestOutboundMessageAdmin(TestCase):
+
+    def setUp(self):
+        admin = UserFactory(is_staff=True, is_superuser=True)
+        self.client.login(username=admin.username, password='password')
+
+    def test_retry_messages(self):
+        expires_at = timezone.now() + timedelta(minutes=5)
+        failed, expired, sent = [
+            OutboundMessage.objects.create(
+                channel=OutboundMessage.SMS, recipient='+447123456789', body="Your PIN number is ABCDE",
+                status=status, attempts=6, expires_at=expires_at,
+            )
+            for status in (OutboundMessage.FAILED, OutboundMessage.EXPIRED, OutboundMessage.SENT)
+        ]
+        self.client.post(reverse('admin:outbox_outboundmessage_changelist'), {
+            'action': 'retry_messages', ACTION_CHECKBOX_NAME: [failed.pk, expired.pk, sent.pk],
+        })
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.attempts, failed.expires_at), (OutboundMessage.PENDING, 0, expires_at))
+        self.assertEqual(OutboundMessage.objects.get(pk=expired.pk).status, OutboundMessage.EXPIRED)
+        self.assertEqual(OutboundMessage.objects.get(pk=sent.pk).status, OutboundMessage.SENT)
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test.utils import override_settings
+from django.utils import timezone
+from test_plus.test import TestCase
+
+from .. import providers
+from ..dispatch import claim_batch, deliver, drain, get_retry_delay
+from ..models import OutboundMessage
+
+
+class FailingProvider(providers.BaseProvider):
+
+    def send_messages(self, messages):
+        return ["Gateway unavailable"] * len(messages)
+
+
+FAILING_PROVIDERS = {
+    'sms': 'test_bank.outbox.tests.test_dispatch.FailingProvider',
+    'email': 'test_bank.outbox.providers.EmailProvider',
+}
+
+
+class TestOutbox(TestCase):
+
+    def setUp(self):
+        del providers.sent_messages[:]
+
+    def enqueue_sms(self, count=1, **kwargs):
+        return OutboundMessage.objects.enqueue(*[
+            OutboundMessage(channel=OutboundMessage.SMS, recipient='+4471234567{0:02}'.format(i), body="Hi", **kwargs)
+            for i in range(count)
+        ])
+
+    def test_drain(self):
+        self.enqueue_sms(3)
+        OutboundMessage.objects.enqueue_email(
+            "Subject", "Text", None, 'jane@example.com', html_body="<p>Text</p>"
+        )
+        self.assertEqual(drain(batch_size=2), (4, 0))
+        self.assertEqual(len(providers.sent_messages), 3)
+        self.assertEqual(mail.outbox[0].to, ['jane@example.com'])
+        self.assertEqual(mail.outbox[0].alternatives, [("<p>Text</p>", 'text/html')])
+        self.assertEqual(OutboundMessage.objects.filter(status=OutboundMessage.SENT, attempts=1).count(), 4)
+        self.assertEqual(drain(), (0, 0))
+
+    def test_claims_do_not_overlap(self):
+        self.enqueue_sms(3)
+        first_token, first = claim_batch(2)
+        second_token, second = claim_batch(2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({message.pk for message in first} & {message.pk for message in second})
+        self.assertEqual(claim_batch(2)[1], [])
+
+    @override_settings(OUTBOX_LEASE=60)
+    def test_lapsed_claim(self):
+        self.enqueue_sms()
+        stale_token, messages = claim_batch(10)
+        OutboundMessage.objects.update(claimed_at=timezone.now() - timedelta(seconds=61))
+        token, reclaimed = claim_batch(10)
+        self.assertEqual([message.pk for message in reclaimed], [messages[0].pk])
+        # the worker which lost its claim does not record its outcome
+        self.assertEqual(deliver(stale_token, messages), (1, 0))
+        self.assertEqual(OutboundMessage.objects.get().status, OutboundMessage.SENDING)
+        deliver(token, reclaimed)
+        self.assertEqual(OutboundMessage.objects.get().status, OutboundMessage.SENT)
+
+    @override_settings(OUTBOX_PROVIDERS=FAILING_PROVIDERS, OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_DELAY=30)
+    def test_retries(self):
+        self.enqueue_sms()
+        with self.assertLogs('test_bank.outbox', 'WARNING'):
+            self.assertEqual(drain(), (0, 1))
+        message = OutboundMessage.objects.get()
+        self.assertEqual(
+            (message.status, message.attempts, message.last_error), (OutboundMessage.PENDING, 1, "Gateway unavailable")
+        )
+        self.assertGreater(message.next_attempt_at, timezone.now() + timedelta(seconds=25))
+        # not due before its retry delay
+        self.assertEqual(drain(), (0, 0))
+        OutboundMessage.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs('test_bank.outbox', 'WARNING'):
+            self.assertEqual(drain(), (0, 1))
+        self.assertEqual(OutboundMessage.objects.get().status, OutboundMessage.FAILED)
+        self.assertEqual(get_retry_delay(3), timedelta(seconds=120))
+
+    def test_expired(self):
+        self.enqueue_sms(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(drain(), (0, 0))
+        self.assertEqual(OutboundMessage.objects.get().status, OutboundMessage.EXPIRED)
+        self.assertEqual(providers.sent_messages, [])
+
+    def test_drain_outbox_command(self):
+        self.enqueue_sms(2)
+        stdout = StringIO()
+        call_command('drain_outbox', workers=1, stdout=stdout)
+        self.assertIn("2 messages sent, 0 failed", stdout.getvalue())
@@ -19,3 +19,46 @@ Issues with the above approach:
 4. Undocumented: No mention in the documentation, or it's too hard for me to find
 */
 $('.form-group').removeClass('row');
+
+/*
+Loads stylesheets and scripts on demand, each once, for the pages whose
+heavy assets are only needed after an interaction:
+
+    loadAssets(['/static/bundles/phone.css', '/static/bundles/phone.js']).done(...)
+
+The scripts run in the order given, the stylesheets load meanwhile.
+*/
+var loadAssets = (function () {
+  var loading = {};
+
+  function isStylesheet(url) {
+    return /\.css(\?|#|$)/.test(url);
+  }
+
+  function load(url) {
+    if (!loading[url]) {
+      if (isStylesheet(url)) {
+        var loaded = $.Deferred();
+        $('<link rel="stylesheet">').on('load', loaded.resolve).on('error', loaded.reject)
+          .attr('href', url).appendTo('head');
+        loading[url] = loaded.promise();
+      } else {
+        loading[url] = $.ajax({url: url, dataType: 'script', cache: true});
+      }
+    }
+    return loading[url];
+  }
+
+  return function (urls) {
+    var stylesheets = [];
+    var scripts = $.when();
+    $.each(urls, function (i, url) {
+      if (isStylesheet(url)) {
+        stylesheets.push(load(url));
+      } else {
+        scripts = scripts.then(function () { return load(url); });
+      }
+    });
+    return $.when.apply($, stylesheets.concat([scripts]));
+  };
+})();
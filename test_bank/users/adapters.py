@@ -3,11 +3,24 @@ from django.conf import settings
 from allauth.account.adapter import DefaultAccountAdapter
 from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
 
+from test_bank.outbox.models import OutboundMessage
+
 
 class AccountAdapter(DefaultAccountAdapter):
     def is_open_for_signup(self, request):
         return getattr(settings, 'ACCOUNT_ALLOW_REGISTRATION', True)
 
+    def send_mail(self, template_prefix, email, context):
+        """ queues the email in the outbox rather than sending it within the request """
+        message = self.render_mail(template_prefix, email, context)
+        body, html_body = message.body, ''
+        if message.content_subtype == 'html':
+            body, html_body = '', message.body
+        for content, mimetype in getattr(message, 'alternatives', []):
+            if mimetype == 'text/html':
+                html_body = content
+        OutboundMessage.objects.enqueue_email(message.subject, body, message.from_email, email, html_body=html_body)
+
 
 class SocialAccountAdapter(DefaultSocialAccountAdapter):
     def is_open_for_signup(self, request, sociallogin):
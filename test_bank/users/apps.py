@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class UsersConfig(AppConfig):
@@ -10,4 +11,8 @@ class UsersConfig(AppConfig):
             Users system checks
             Users signal registration
         """
-        pass
+        from django.contrib.auth.signals import user_logged_in
+        from test_bank.contrib.sessions import mark_touched
+        user_logged_in.connect(mark_touched)
+        from .indexes import create_custom_indexes
+        post_migrate.connect(create_custom_indexes, sender=self)
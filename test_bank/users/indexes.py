@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""
+Indexes of the admin searches on users, created on PostgreSQL once the
+users table has been migrated. Other backends have none.
+"""
+from django.db import connections
+
+from test_bank.contrib.db.indexes import create_search_indexes
+
+
+# Prefix and exact searches of the admin
+SEARCH_INDEXES = (
+    ('users_user_username_search', 'users_user', 'username'),
+    ('users_user_name_search', 'users_user', 'name'),
+    ('users_user_email_search', 'users_user', 'email'),
+)
+
+
+def create_custom_indexes(sender, using, **kwargs):
+    """ post_migrate receiver creating the search indexes if missing """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    create_search_indexes(connection, SEARCH_INDEXES)
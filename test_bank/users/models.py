@@ -11,7 +11,7 @@ class User(AbstractUser):
     Django 1.10 introduced utf-8 support for first_name and last_name
     """
 
-    name = models.CharField(_('Name of User'), blank=True, max_length=255)
+    name = models.CharField(_('Name of User'), blank=True, max_length=255, db_index=True)
 
     def __str__(self):
         return self.username
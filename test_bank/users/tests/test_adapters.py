@@ -0,0 +1,19 @@
+from django.core import mail
+from test_plus.test import TestCase
+
+from test_bank.outbox.models import OutboundMessage
+from ..adapters import AccountAdapter
+
+
+class TestAccountAdapter(TestCase):
+
+    def test_send_mail_queues(self):
+        user = self.make_user()
+        AccountAdapter().send_mail('account/email/password_reset_key', 'jane@example.com', {
+            'user': user, 'password_reset_url': 'http://testserver/reset/', 'request': None,
+            'current_site': None,
+        })
+        self.assertEqual(len(mail.outbox), 0)
+        message = OutboundMessage.objects.get()
+        self.assertEqual((message.channel, message.recipient), (OutboundMessage.EMAIL, 'jane@example.com'))
+        self.assertIn('http://testserver/reset/', message.body)
@@ -38,3 +38,19 @@ class TestMyUserCreationForm(TestCase):
         # The form.errors dict should contain a single error called 'username'
         self.assertTrue(len(form.errors) == 1)
         self.assertTrue('username' in form.errors)
+
+
+class TestMyUserAdmin(TestCase):
+
+    def setUp(self):
+        self.user = self.make_user('admin', 'password')
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.login(username='admin', password='password')
+
+    def test_changelist(self):
+        self.make_user('alamode')
+        response = self.client.get(self.reverse('admin:users_user_changelist'), {'q': 'ala'})
+        self.assertEqual([user.username for user in response.context['cl'].result_list], ['alamode'])
+        self.assertTrue(response.context['cl'].keyset)
+        self.assertIsNone(response.context['cl'].full_result_count)